@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+from analytics.sampling import effective_counts, is_sample
+
+# Every value of these columns is one segment; labels are used in the insight text
+SEGMENT_DIMENSIONS = {
+    "state": "State",
+    "merchant_category": "Category",
+    "transaction_channel": "Channel",
+    "card_type": "Card",
+    "age_group": "Age",
+}
+
+# Weight of the newest day in the EWMA baseline
+EWMA_ALPHA = 0.1
+
+# CUSUM drift allowance and alarm level, in standard deviations
+CUSUM_SLACK = 0.5
+CUSUM_THRESHOLD = 4.0
+
+# Segments moving less than this (in standard deviations) are not reported
+MIN_ABS_Z = 2.0
+
+# Segments with fewer transactions in the week are too noisy to report
+MIN_WEEK_TX = 20
+
+_SECONDS_PER_DAY = 86_400
+
+
+def segment_day_matrix(df: pd.DataFrame, dimensions: dict = None) -> dict:
+    """Transaction and fraud counts as segments × days matrices.
+
+    Each dimension takes one `bincount` over (segment code, day) pairs, so
+    the matrices are built from the rows in a single pass per dimension.
+    Returns `labels` (dimension, value) per row, `days` and the `total` and
+    `fraud` matrices. Rows of a weighted sample count with their weight, and
+    `square` holds the summed squared weights (the totals themselves otherwise).
+    """
+    dimensions = dimensions or SEGMENT_DIMENSIONS
+    day = df["timestamp"].to_numpy(dtype="datetime64[s]").astype(np.int64) // _SECONDS_PER_DAY
+    first = int(day.min()) if len(day) else 0
+    n_days = int(day.max()) - first + 1 if len(day) else 0
+    day = day - first
+    weights = df["sample_weight"].to_numpy(dtype=float) if is_sample(df) else None
+    fraud_weights = df["is_fraud"].to_numpy(dtype=float) * (1.0 if weights is None else weights)
+
+    labels, totals, frauds, squares = [], [], [], []
+    for dim in dimensions:
+        codes, uniques = pd.factorize(df[dim])
+        cells = codes.astype(np.int64) * n_days + day
+        size = len(uniques) * n_days
+        totals.append(np.bincount(cells, weights=weights, minlength=size).reshape(len(uniques), n_days))
+        frauds.append(np.bincount(cells, weights=fraud_weights, minlength=size).reshape(len(uniques), n_days))
+        if weights is not None:
+            squares.append(np.bincount(cells, weights=weights ** 2, minlength=size).reshape(len(uniques), n_days))
+        labels.extend((dim, value) for value in uniques)
+
+    days = pd.to_datetime(first + np.arange(n_days), unit="D")
+    if not labels:
+        empty = np.zeros((0, n_days))
+        return {"labels": [], "days": days, "total": empty, "fraud": empty, "square": empty}
+    total = np.vstack(totals).astype(float)
+    square = np.vstack(squares) if squares else total
+    return {"labels": labels, "days": days, "total": total, "fraud": np.vstack(frauds), "square": square}
+
+
+def ewma_baseline(total: np.ndarray, fraud: np.ndarray, alpha: float = EWMA_ALPHA) -> np.ndarray:
+    """Expected fraud rate per segment and day from the EWMA of the days before it.
+
+    The recursion runs over days with every segment updated at once; day 0
+    starts from each segment's rate over the whole period.
+    """
+    n_days = total.shape[1]
+    ewma_total = np.empty_like(total)
+    ewma_fraud = np.empty_like(fraud)
+    ewma_total[:, 0] = total.mean(axis=1)
+    ewma_fraud[:, 0] = fraud.mean(axis=1)
+    for t in range(1, n_days):
+        ewma_total[:, t] = (1 - alpha) * ewma_total[:, t - 1] + alpha * total[:, t - 1]
+        ewma_fraud[:, t] = (1 - alpha) * ewma_fraud[:, t - 1] + alpha * fraud[:, t - 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ewma_total > 0, ewma_fraud / ewma_total, 0.0)
+
+
+def binomial_z(total: np.ndarray, fraud: np.ndarray, rate: np.ndarray) -> np.ndarray:
+    """Standardised excess of observed over expected fraud counts (0 where nothing is expected)."""
+    expected = rate * total
+    variance = expected * (1 - rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(variance > 0, (fraud - expected) / np.sqrt(variance), 0.0)
+
+
+def cusum(z: np.ndarray, slack: float = CUSUM_SLACK) -> np.ndarray:
+    """Upper and lower CUSUM statistics per segment and day, stacked as (2, segments, days)."""
+    upper = np.zeros_like(z)
+    lower = np.zeros_like(z)
+    for t in range(z.shape[1]):
+        prev_upper = upper[:, t - 1] if t else 0.0
+        prev_lower = lower[:, t - 1] if t else 0.0
+        upper[:, t] = np.maximum(0.0, prev_upper + z[:, t] - slack)
+        lower[:, t] = np.maximum(0.0, prev_lower - z[:, t] - slack)
+    return np.stack([upper, lower])
+
+
+def what_changed(df: pd.DataFrame, days: int = 7, dimensions: dict = None) -> pd.DataFrame:
+    """Segments whose fraud rate in the last `days` days departs from their EWMA baseline.
+
+    The week is scored as one binomial test against the baseline at its
+    start; CUSUM over the daily z-scores marks segments that drifted
+    persistently rather than on a single day. Rows are ranked by |z|.
+    On a weighted sample, counts are estimates and the tests use the
+    effective sample size (analytics.sampling.effective_counts).
+    """
+    dimensions = dimensions or SEGMENT_DIMENSIONS
+    columns = ["dimension", "segment", "week_tx", "week_fraud", "week_rate", "baseline_rate",
+               "z", "alarm", "alarm_since"]
+    matrix = segment_day_matrix(df, dimensions)
+    total, fraud, square = matrix["total"], matrix["fraud"], matrix["square"]
+    n_days = total.shape[1]
+    if n_days <= days or len(total) == 0:
+        return pd.DataFrame(columns=columns)
+
+    baseline = ewma_baseline(total, fraud)
+    week_total = total[:, -days:].sum(axis=1)
+    week_fraud = fraud[:, -days:].sum(axis=1)
+    week_square = square[:, -days:].sum(axis=1)
+    week_baseline = baseline[:, n_days - days]
+    z = binomial_z(*effective_counts(week_total, week_fraud, week_square), week_baseline)
+
+    drift = cusum(binomial_z(*effective_counts(total, fraud, square), baseline))
+    # The direction that matches the week's move
+    week_drift = np.where((z >= 0)[:, None], drift[0][:, -days:], drift[1][:, -days:])
+    alarmed = week_drift > CUSUM_THRESHOLD
+    first_alarm = np.where(alarmed.any(axis=1), alarmed.argmax(axis=1), -1)
+    week_days = matrix["days"][-days:]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        week_rate = np.where(week_total > 0, week_fraud / week_total, 0.0)
+    result = pd.DataFrame({
+        "dimension": [dimensions[dim] for dim, _ in matrix["labels"]],
+        "segment": [value for _, value in matrix["labels"]],
+        "week_tx": week_total.round().astype(int),
+        "week_fraud": week_fraud.round().astype(int),
+        "week_rate": week_rate,
+        "baseline_rate": week_baseline,
+        "z": z,
+        "alarm": first_alarm >= 0,
+        "alarm_since": [week_days[i] if i >= 0 else pd.NaT for i in first_alarm],
+    })
+    result = result[((result["z"].abs() >= MIN_ABS_Z) | result["alarm"]) & (result["week_tx"] >= MIN_WEEK_TX)]
+    return result.reindex(result["z"].abs().sort_values(ascending=False).index).reset_index(drop=True)
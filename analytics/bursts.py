@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from analytics.velocity import sort_by_card_time
+
+# A transaction joins a burst when it lands within this many seconds of the
+# previous one at the same city and merchant category
+BURST_WINDOW_SECONDS = 300
+
+# Members must be within this fraction of the burst's median amount
+AMOUNT_TOLERANCE = 0.10
+
+MIN_BURST_SIZE = 3
+
+BURST_COLUMNS = ["burst_id", "burst_size"]
+
+
+def detect_bursts(group: np.ndarray, epoch: np.ndarray, amount: np.ndarray,
+                  window: int = BURST_WINDOW_SECONDS, tolerance: float = AMOUNT_TOLERANCE,
+                  min_size: int = MIN_BURST_SIZE) -> np.ndarray:
+    """Burst id per row (-1 outside any burst), in input order.
+
+    Rows are sorted once by (group, time), where `group` is an integer code
+    for city and merchant category. Neighbouring rows of a group closer than
+    `window` seconds chain into runs, and a run's members are its rows
+    within `tolerance` of the run's median amount. Runs keeping at least
+    `min_size` members are bursts, numbered from largest to smallest.
+    Everything after the sort is a linear pass or touches only candidate runs.
+    """
+    order, _ = sort_by_card_time(group, epoch)
+    n = len(order)
+    burst_id = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return burst_id
+    g = np.asarray(group)[order]
+    t = np.asarray(epoch, dtype=np.int64)[order]
+    a = np.asarray(amount, dtype=float)[order]
+
+    linked = np.zeros(n, dtype=bool)
+    linked[1:] = (g[1:] == g[:-1]) & (t[1:] - t[:-1] <= window)
+    run = np.cumsum(~linked) - 1
+    candidates = np.flatnonzero(np.bincount(run)[run] >= min_size)
+    if len(candidates) == 0:
+        return burst_id
+
+    # Lower median per candidate run from one sort by (run, amount)
+    run_c, amount_c = run[candidates], a[candidates]
+    by_amount = np.lexsort((amount_c, run_c))
+    runs, first, size = np.unique(run_c[by_amount], return_index=True, return_counts=True)
+    median = amount_c[by_amount][first + (size - 1) // 2]
+    slot = np.searchsorted(runs, run_c)
+    member = np.abs(amount_c - median[slot]) <= tolerance * median[slot]
+
+    members = np.bincount(slot[member], minlength=len(runs))
+    kept = members >= min_size
+    # Rank kept runs by member count, largest first
+    rank = np.full(len(runs), -1, dtype=np.int64)
+    rank[np.flatnonzero(kept)[np.argsort(-members[kept], kind="stable")]] = np.arange(kept.sum())
+    sorted_ids = np.full(n, -1, dtype=np.int64)
+    sorted_ids[candidates[member]] = rank[slot[member]]
+    burst_id[order] = sorted_ids
+    return burst_id
+
+
+def add_burst_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Return `df` with the BURST_COLUMNS added (-1 / 0 outside bursts)."""
+    group, _ = pd.factorize(df["state"].astype(str) + "|" + df["city"].astype(str)
+                            + "|" + df["merchant_category"].astype(str))
+    epoch = df["timestamp"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    burst_id = detect_bursts(group, epoch, df["amount"].to_numpy(dtype=float))
+    in_burst = burst_id >= 0
+    sizes = np.bincount(burst_id[in_burst]) if in_burst.any() else np.zeros(0, dtype=np.int64)
+    burst_size = np.zeros(len(df), dtype=np.int64)
+    burst_size[in_burst] = sizes[burst_id[in_burst]]
+    return df.assign(burst_id=burst_id, burst_size=burst_size)
+
+
+def burst_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Ranked bursts among the rows of `df`, one row per burst with its member transaction IDs.
+
+    Needs the columns from add_burst_features; only burst members are grouped.
+    """
+    members = df[df["burst_id"].to_numpy() >= 0].sort_values(["burst_id", "timestamp"])
+    if len(members) == 0:
+        return pd.DataFrame(columns=[
+            "burst_id", "city", "state", "merchant_category", "start", "span_minutes",
+            "size", "cards", "median_amount", "total_amount", "fraud", "transaction_ids",
+        ])
+    grouped = members.groupby("burst_id", sort=True)
+    table = grouped.agg(
+        city=("city", "first"),
+        state=("state", "first"),
+        merchant_category=("merchant_category", "first"),
+        start=("timestamp", "min"),
+        end=("timestamp", "max"),
+        size=("transaction_id", "size"),
+        cards=("card_id", "nunique"),
+        median_amount=("amount", "median"),
+        total_amount=("amount", "sum"),
+        fraud=("is_fraud", "sum"),
+        transaction_ids=("transaction_id", list),
+    ).reset_index()
+    table["span_minutes"] = (table.pop("end") - table["start"]).dt.total_seconds() / 60
+    return table.sort_values(["size", "start"], ascending=[False, True], ignore_index=True)
@@ -0,0 +1,148 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from analytics.sampling import effective_counts, is_sample
+
+# Dimensions combined by the driver analysis; hour enters as a 6-hour bucket
+DRIVER_DIMENSIONS = {
+    "state": "State",
+    "merchant_category": "Category",
+    "transaction_channel": "Channel",
+    "card_type": "Card",
+    "age_group": "Age",
+    "hour_bucket": "Hour",
+}
+
+HOUR_BUCKETS = ["00–05h", "06–11h", "12–17h", "18–23h"]
+
+# Segments with fewer transactions are pruned before ranking
+MIN_SUPPORT = 100
+
+# Two-sided 95% Wilson interval
+_Z = 1.96
+
+
+def wilson_interval(fraud: np.ndarray, total: np.ndarray, z: float = _Z) -> tuple:
+    """Wilson score interval (low, high) for fraud / total; (0, 1) where total is 0."""
+    total = np.asarray(total, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(total > 0, fraud / total, 0.0)
+        denom = 1 + z ** 2 / total
+        center = (p + z ** 2 / (2 * total)) / denom
+        half = z * np.sqrt(p * (1 - p) / total + z ** 2 / (4 * total ** 2)) / denom
+    empty = total == 0
+    return np.where(empty, 0.0, center - half), np.where(empty, 1.0, center + half)
+
+
+def count_cube(df: pd.DataFrame, dimensions: dict = None, squares: bool = False) -> tuple:
+    """(values per dimension, total cube, fraud cube): counts over every dimension at once.
+
+    One `bincount` over the combined codes gives a dense array with an axis
+    per dimension; every 2- and 3-way table is then a sum over the other axes.
+    Rows of a weighted sample count with their weight; with `squares`, a
+    cube of summed squared weights (the total cube itself when unweighted) is appended.
+    """
+    dimensions = dimensions or DRIVER_DIMENSIONS
+    codes, values = [], []
+    for dim in dimensions:
+        if dim == "hour_bucket":
+            codes.append(df["hour"].to_numpy() // 6)
+            values.append(HOUR_BUCKETS)
+        else:
+            c, u = pd.factorize(df[dim])
+            codes.append(c)
+            values.append(list(u))
+    shape = tuple(len(v) for v in values)
+    cell = np.ravel_multi_index(codes, shape) if len(df) else np.zeros(0, dtype=np.int64)
+    size = int(np.prod(shape))
+    weights = df["sample_weight"].to_numpy(dtype=float) if is_sample(df) else None
+    fraud_weights = df["is_fraud"].to_numpy(dtype=float) * (1.0 if weights is None else weights)
+    total = np.bincount(cell, weights=weights, minlength=size).reshape(shape)
+    fraud = np.bincount(cell, weights=fraud_weights, minlength=size).reshape(shape)
+    if not squares:
+        return values, total, fraud
+    square = total if weights is None else np.bincount(cell, weights=weights ** 2, minlength=size).reshape(shape)
+    return values, total, fraud, square
+
+
+def find_drivers(df: pd.DataFrame, orders: tuple = (2, 3), min_support: int = MIN_SUPPORT,
+                 dimensions: dict = None) -> pd.DataFrame:
+    """Riskiest combinations of `orders` dimensions, ranked by the lower bound of their lift.
+
+    Lift is the segment's fraud rate over the overall rate; `lift_low` uses
+    the Wilson lower bound so small segments need stronger evidence.
+    `gain` compares the rate with the riskiest of its one-smaller parent
+    segments, separating real interactions from a single strong dimension.
+    On a weighted sample, counts are estimates and the intervals use the
+    effective sample size (analytics.sampling.effective_counts).
+    """
+    dimensions = dimensions or DRIVER_DIMENSIONS
+    columns = ["dimensions", "segment", "order", "transactions", "fraud", "rate",
+               "ci_low", "ci_high", "lift", "lift_low", "gain"]
+    values, total, fraud, square = count_cube(df, dimensions, squares=True)
+    n_total = total.sum()
+    if n_total == 0:
+        return pd.DataFrame(columns=columns)
+    overall = fraud.sum() / n_total
+    names = list(dimensions.values())
+    axes = range(total.ndim)
+    tables = {tuple(axes): (total, fraud, square)}
+
+    def marginal(keep: tuple) -> tuple:
+        """Counts over the `keep` axes, summed from the smallest table already computed."""
+        if keep not in tables:
+            source = min((k for k in tables if set(keep) <= set(k)), key=lambda k: tables[k][0].size)
+            drop = tuple(i for i, a in enumerate(source) if a not in keep)
+            counts, frauds, squares = tables[source]
+            summed = counts.sum(axis=drop)
+            # Unweighted counts share the total as their square, so it is summed once
+            tables[keep] = (summed, frauds.sum(axis=drop), summed if squares is counts else squares.sum(axis=drop))
+        return tables[keep]
+
+    frames = []
+    # Larger combinations first, so smaller tables are summed from them rather than the cube
+    for order in sorted(orders, reverse=True):
+        for keep in combinations(axes, order):
+            t, f, sq = marginal(keep)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rate = np.where(t > 0, f / t, 0.0)
+            # Best parent rate, broadcast back to this table's shape
+            parent = np.zeros_like(rate)
+            for sub in combinations(keep, order - 1):
+                pt, pf, _ = marginal(sub)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    parent_rate = np.where(pt > 0, pf / pt, 0.0)
+                missing = next(a for a in keep if a not in sub)
+                parent = np.maximum(parent, np.expand_dims(parent_rate, keep.index(missing)))
+
+            cells = np.flatnonzero(t.ravel() >= min_support)
+            if len(cells) == 0:
+                continue
+            index = np.unravel_index(cells, t.shape)
+            t_c, f_c, rate_c = t.ravel()[cells], f.ravel()[cells], rate.ravel()[cells]
+            effective_t, effective_f = effective_counts(t_c, f_c, sq.ravel()[cells])
+            low, high = wilson_interval(effective_f, effective_t)
+            labels = [" · ".join(str(values[a][i]) for a, i in zip(keep, cell)) for cell in zip(*index)]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                gain = np.where(parent.ravel()[cells] > 0, rate_c / parent.ravel()[cells], np.nan)
+            frames.append(pd.DataFrame({
+                "dimensions": " × ".join(names[a] for a in keep),
+                "segment": labels,
+                "order": order,
+                "transactions": t_c.round().astype(int),
+                "fraud": f_c.round().astype(int),
+                "rate": rate_c,
+                "ci_low": low,
+                "ci_high": high,
+                "lift": rate_c / overall if overall else np.nan,
+                "lift_low": low / overall if overall else np.nan,
+                "gain": gain,
+            }))
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True).sort_values(
+        ["lift_low", "lift"], ascending=False, ignore_index=True,
+    )
@@ -0,0 +1,200 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# One-hot features: each distinct value gets its own weight
+ONE_HOT_FEATURES = ["merchant_category", "transaction_channel", "card_type", "age_group", "hour"]
+
+# Target-encoded features: replaced by their smoothed fraud rate
+TARGET_FEATURES = ["state"]
+
+_SMOOTHING = 50.0
+
+# Pseudo-counts of fraud and legitimate rows behind the prior, so it is never 0 or 1
+_PRIOR_PSEUDO = 1.0
+
+# Share of the history, the latest by timestamp, kept out of training for evaluation
+HOLDOUT_FRACTION = 0.2
+
+
+def _codes(column: pd.Series, vocab: dict) -> np.ndarray:
+    """Integer codes under `vocab`; unseen values map to the extra last slot."""
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    table = np.array([vocab.get(u, len(vocab)) for u in uniques] + [len(vocab)], dtype=np.int32)
+    return table[codes]
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+
+def iter_chunks(df: pd.DataFrame, chunk_rows: int):
+    """Yield consecutive row chunks of `df`."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def roc_auc(scores: np.ndarray, labels: np.ndarray) -> float:
+    """Area under the ROC curve via the rank-sum formulation (ties broken by order)."""
+    labels = np.asarray(labels).astype(bool)
+    n_pos = int(labels.sum())
+    n_neg = len(labels) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return float("nan")
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return float((ranks[labels].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+class LogisticFraudModel:
+    """Logistic regression trained with mini-batch gradient descent in NumPy.
+
+    One-hot features never become a dense design matrix: every feature is
+    kept as a small integer code, its weights are looked up per row and its
+    gradient is a `bincount` of the residuals. Training streams over row
+    chunks, so only one chunk's codes are materialised at a time.
+
+    The latest `holdout` share of rows by timestamp is left out of the
+    encoders and training; `holdout_mask` picks those rows for evaluation.
+    """
+
+    def __init__(self, learning_rate: float = 5.0, batch_size: int = 2048, epochs: int = 8,
+                 l2: float = 1e-4, chunk_rows: int = 250_000, seed: int = 0,
+                 holdout: float = HOLDOUT_FRACTION):
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.l2 = l2
+        self.chunk_rows = chunk_rows
+        self.seed = seed
+        self.holdout = holdout
+        # Rows at or after this timestamp were held out; None when nothing was
+        self.holdout_start = None
+        self.vocab = {}
+        self.target_rates = {}
+        self.weights = {}
+        self.bias = 0.0
+        self.prior = 0.0
+        self.amount_mean = 0.0
+        self.amount_std = 1.0
+        self.train_seconds = 0.0
+        self.train_rows = 0
+        self.train_fraud = 0
+
+    # ── Encoding
+
+    def _train_chunks(self, df: pd.DataFrame):
+        """Row chunks of `df` without the held-out rows."""
+        for chunk in iter_chunks(df, self.chunk_rows):
+            yield chunk if self.holdout_start is None else chunk[chunk["timestamp"] < self.holdout_start]
+
+    def _fit_encoders(self, df: pd.DataFrame):
+        """One pass over the chunks: vocabularies, target-encoding counts, amount scaling."""
+        counts = {f: {} for f in ONE_HOT_FEATURES}
+        target = {f: {} for f in TARGET_FEATURES}
+        n = 0
+        log_sum = log_sq = fraud_sum = 0.0
+
+        for chunk in self._train_chunks(df):
+            for f in ONE_HOT_FEATURES:
+                for value, count in chunk[f].value_counts().items():
+                    counts[f][value] = counts[f].get(value, 0) + count
+            for f in TARGET_FEATURES:
+                grouped = chunk.groupby(f)["is_fraud"].agg(["sum", "count"])
+                for value, (fraud, total) in grouped.iterrows():
+                    prev = target[f].get(value, (0, 0))
+                    target[f][value] = (prev[0] + fraud, prev[1] + total)
+            log_amount = np.log1p(chunk["amount"].to_numpy(dtype=float))
+            log_sum += log_amount.sum()
+            log_sq += (log_amount ** 2).sum()
+            fraud_sum += chunk["is_fraud"].sum()
+            n += len(chunk)
+
+        # Smoothed, so data without fraud (a replay's first batches) still gives finite logits
+        prior = (fraud_sum + _PRIOR_PSEUDO) / (n + 2 * _PRIOR_PSEUDO)
+        self.vocab = {f: {v: i for i, v in enumerate(sorted(counts[f]))} for f in ONE_HOT_FEATURES}
+        self.target_rates = {
+            f: {v: (fraud + _SMOOTHING * prior) / (total + _SMOOTHING) for v, (fraud, total) in target[f].items()}
+            for f in TARGET_FEATURES
+        }
+        self.prior = prior
+        self.amount_mean = log_sum / max(n, 1)
+        self.amount_std = max(np.sqrt(max(log_sq / max(n, 1) - self.amount_mean ** 2, 0.0)), 1e-9)
+        self.train_rows = n
+        self.train_fraud = int(fraud_sum)
+
+    def _encode(self, df: pd.DataFrame) -> tuple:
+        """(one-hot codes per feature, dense numeric matrix) for a chunk of rows."""
+        codes = {f: _codes(df[f], self.vocab[f]) for f in ONE_HOT_FEATURES}
+        numeric = [(np.log1p(df["amount"].to_numpy(dtype=float)) - self.amount_mean) / self.amount_std]
+        for f in TARGET_FEATURES:
+            rates = df[f].map(self.target_rates[f]).to_numpy(dtype=float, na_value=self.prior)
+            numeric.append((rates - self.prior) / self.prior)
+        return codes, np.column_stack(numeric)
+
+    def _logit(self, codes: dict, numeric: np.ndarray) -> np.ndarray:
+        z = numeric @ self.weights["numeric"] + self.bias
+        for f, c in codes.items():
+            z += self.weights[f][c]
+        return z
+
+    # ── Training and scoring
+
+    def fit(self, df: pd.DataFrame) -> "LogisticFraudModel":
+        """Fit on `df` minus its held-out rows, streaming over row chunks and shuffled mini-batches within each."""
+        start = time.perf_counter()
+        rng = np.random.default_rng(self.seed)
+        self.holdout_start = None
+        if self.holdout > 0 and len(df):
+            cutoff = df["timestamp"].quantile(1 - self.holdout)
+            # A history too short (or too bunched in time) to split trains on everything
+            if (df["timestamp"] < cutoff).any():
+                self.holdout_start = cutoff
+        self._fit_encoders(df)
+        # One extra slot per feature for values unseen during training
+        self.weights = {f: np.zeros(len(self.vocab[f]) + 1) for f in ONE_HOT_FEATURES}
+        self.weights["numeric"] = np.zeros(1 + len(TARGET_FEATURES))
+        self.bias = float(np.log(self.prior / (1 - self.prior)))
+
+        for _ in range(self.epochs):
+            for chunk in self._train_chunks(df):
+                codes, numeric = self._encode(chunk)
+                y = chunk["is_fraud"].to_numpy(dtype=float)
+                order = rng.permutation(len(chunk))
+                for lo in range(0, len(order), self.batch_size):
+                    idx = order[lo:lo + self.batch_size]
+                    self._step({f: c[idx] for f, c in codes.items()}, numeric[idx], y[idx])
+
+        self.train_seconds = time.perf_counter() - start
+        return self
+
+    def _step(self, codes: dict, numeric: np.ndarray, y: np.ndarray):
+        err = _sigmoid(self._logit(codes, numeric)) - y
+        scale = self.learning_rate / len(y)
+        for f, c in codes.items():
+            w = self.weights[f]
+            w -= scale * np.bincount(c, weights=err, minlength=len(w)) + self.learning_rate * self.l2 * w
+        self.weights["numeric"] -= scale * (numeric.T @ err) + self.learning_rate * self.l2 * self.weights["numeric"]
+        self.bias -= scale * err.sum()
+
+    def holdout_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Which rows of `df` fall in the held-out period (none when nothing was held out)."""
+        if self.holdout_start is None:
+            return np.zeros(len(df), dtype=bool)
+        return (df["timestamp"] >= self.holdout_start).to_numpy()
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """Fraud probability per row, scored chunk by chunk."""
+        out = np.empty(len(df))
+        for start in range(0, len(df), self.chunk_rows):
+            codes, numeric = self._encode(df.iloc[start:start + self.chunk_rows])
+            out[start:start + self.chunk_rows] = _sigmoid(self._logit(codes, numeric))
+        return out
+
+    def score(self, df: pd.DataFrame) -> tuple:
+        """Return (`df` with a `fraud_score` column, scored rows per second)."""
+        start = time.perf_counter()
+        scores = self.predict_proba(df)
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        return df.assign(fraud_score=scores), len(df) / elapsed
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+# Strata: fraud label × state, so every state keeps its rare fraud rows
+STRATA = ["is_fraud", "state"]
+
+# Share of legitimate rows kept; fraud rows are kept FRAUD_OVERSAMPLE times as often
+SAMPLE_FRACTION = 0.05
+FRAUD_OVERSAMPLE = 10
+
+# Columns added to sampled rows: the stratum's weight N_h / n_h and its sample size n_h
+SAMPLE_COLUMNS = ["sample_weight", "stratum_size"]
+
+# Two-sided 95% normal interval
+_Z = 1.96
+
+
+def sample_rates(is_fraud: np.ndarray, fraction: float = SAMPLE_FRACTION) -> np.ndarray:
+    """Inclusion probability per row: `fraction` for legitimate rows, oversampled for fraud."""
+    return np.where(np.asarray(is_fraud) == 1, min(1.0, fraction * FRAUD_OVERSAMPLE), fraction)
+
+
+def sample_mask(df: pd.DataFrame, rng: np.random.Generator, fraction: float = SAMPLE_FRACTION) -> np.ndarray:
+    """Bernoulli draw per row at its stratum's rate; appended batches are sampled the same way."""
+    return rng.random(len(df)) < sample_rates(df["is_fraud"].to_numpy(), fraction)
+
+
+def strata_counts(df: pd.DataFrame) -> pd.Series:
+    """Rows per (fraud label, state) stratum."""
+    return df.groupby(STRATA).size()
+
+
+def weight_sample(sample: pd.DataFrame, population: pd.Series) -> pd.DataFrame:
+    """Attach SAMPLE_COLUMNS from the population and sample sizes of each stratum.
+
+    Weights are post-stratified: N_h / n_h with the realised sample size, so
+    every stratum's weighted count equals its population count exactly.
+    """
+    sampled = strata_counts(sample)
+    index = pd.MultiIndex.from_frame(sample[STRATA])
+    n_h = sampled.reindex(index).to_numpy(dtype=float)
+    big_n = population.reindex(index).to_numpy(dtype=float)
+    return sample.assign(sample_weight=big_n / n_h, stratum_size=n_h)
+
+
+def stratified_sample(df: pd.DataFrame, fraction: float = SAMPLE_FRACTION, seed: int = None) -> pd.DataFrame:
+    """One-shot weighted stratified sample of `df`."""
+    rng = np.random.default_rng(seed)
+    return weight_sample(df[sample_mask(df, rng, fraction)], strata_counts(df))
+
+
+def is_sample(df: pd.DataFrame) -> bool:
+    return "sample_weight" in df.columns
+
+
+def effective_counts(total: np.ndarray, fraud: np.ndarray, square: np.ndarray) -> tuple:
+    """Weighted (total, fraud) counts scaled to Kish's effective sample size (Σw)² / Σw².
+
+    `square` holds Σw² per cell; binomial tests and intervals on the scaled
+    counts carry the sample's uncertainty rather than the population's.
+    Unweighted counts (square == total) come back unchanged.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(square > 0, total / square, 0.0)
+    return total * scale, fraud * scale
+
+
+def group_estimates(df: pd.DataFrame, keys) -> pd.DataFrame:
+    """Transactions, fraud, fraud amount and fraud rate (%) per `keys` group, with 95% error.
+
+    On a full frame these are exact counts and `rate_err` is 0. On a weighted
+    sample, counts are Horvitz-Thompson totals. Strata split on the fraud
+    label, so the fraud and legitimate totals come from independent strata:
+    each is a sum over strata of N_h · p̂_hg, with variance
+    N_h² (1 - n_h/N_h) p̂(1 - p̂) / (n_h - 1), and the rate F / (F + L) gets
+    its variance by the delta method. `rate_err` is the 95% half-width.
+    """
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    fraud = df["is_fraud"].to_numpy() == 1
+    amount = df["amount"].to_numpy(dtype=float)
+    if not is_sample(df):
+        values = pd.DataFrame({"total": 1, "fraud": fraud.astype(np.int64),
+                               "fraud_amount": np.where(fraud, amount, 0.0)}, index=df.index)
+        table = values.groupby([df[k] for k in keys], observed=True).sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table["rate"] = table["fraud"] / table["total"] * 100
+        table["rate_err"] = 0.0
+        return table
+
+    weight = df["sample_weight"].to_numpy(dtype=float)
+    cells = pd.DataFrame({
+        "m": 1.0,
+        "weighted_amount": np.where(fraud, amount * weight, 0.0),
+        "weight": weight,
+        "n_h": df["stratum_size"].to_numpy(dtype=float),
+    }, index=df.index)
+    strata = [df[column].rename(f"_stratum_{column}") for column in STRATA]
+    by_cell = cells.groupby([df[k] for k in keys] + strata, observed=True).agg(
+        m=("m", "sum"), weighted_amount=("weighted_amount", "sum"), weight=("weight", "first"), n_h=("n_h", "first"),
+    )
+    p = by_cell["m"] / by_cell["n_h"]
+    big_n = by_cell["weight"] * by_cell["n_h"]
+    by_cell["estimate"] = big_n * p
+    by_cell["variance"] = big_n ** 2 * (1 - 1 / by_cell["weight"]) * p * (1 - p) / np.maximum(by_cell["n_h"] - 1, 1)
+
+    is_fraud_cell = by_cell.index.get_level_values("_stratum_is_fraud") == 1
+    group_levels = list(range(len(keys)))
+    fraud_part = by_cell[is_fraud_cell].groupby(level=group_levels).sum()
+    legit_part = by_cell[~is_fraud_cell].groupby(level=group_levels).sum()
+    index = fraud_part.index.union(legit_part.index)
+    f = fraud_part["estimate"].reindex(index, fill_value=0.0)
+    legit = legit_part["estimate"].reindex(index, fill_value=0.0)
+    var_f = fraud_part["variance"].reindex(index, fill_value=0.0)
+    var_l = legit_part["variance"].reindex(index, fill_value=0.0)
+    total = f + legit
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = f / total
+        rate_var = (legit ** 2 * var_f + f ** 2 * var_l) / total ** 4
+
+    table = pd.DataFrame({
+        "total": total.round(),
+        "fraud": f.round(),
+        "fraud_amount": fraud_part["weighted_amount"].reindex(index, fill_value=0.0),
+        "rate": rate * 100,
+        "rate_err": _Z * np.sqrt(rate_var) * 100,
+    }, index=index)
+    table.index.names = keys
+    return table
+
+
+def estimate_stats(df: pd.DataFrame) -> dict:
+    """KPI totals in the shape of `compute_stats`, estimated from a weighted sample."""
+    weight = df["sample_weight"].to_numpy(dtype=float) if is_sample(df) else np.ones(len(df))
+    fraud = df["is_fraud"].to_numpy() == 1
+    amount = df["amount"].to_numpy(dtype=float)
+    total = float(weight.sum())
+    fraud_count = float(weight[fraud].sum())
+    fraud_amount = float((weight * amount)[fraud].sum())
+    return {
+        "total_transactions": int(round(total)),
+        "fraud_count": int(round(fraud_count)),
+        "fraud_rate": fraud_count / total * 100 if total else 0.0,
+        "fraud_amount": fraud_amount,
+        "avg_fraud_amount": fraud_amount / fraud_count if fraud_count else float("nan"),
+        "total_amount": float((weight * amount).sum()),
+        "legitimate_count": int(round(total - fraud_count)),
+    }
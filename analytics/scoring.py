@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from data.generate_data import (
+    CATEGORY_FRAUD_RATES,
+    CHANNEL_FRAUD_RATES,
+    HOUR_FRAUD_WEIGHTS,
+    STATE_FRAUD_MULTIPLIERS,
+)
+
+# Rule set mirroring the generator's fraud model. The score is the mean of the
+# "base_rate" lookups times every "multiplier" lookup and band, i.e. an
+# estimated fraud probability per transaction. The velocity bands need the
+# columns from analytics.velocity.add_velocity_features.
+DEFAULT_RULES = {
+    "base_rate": [
+        {"column": "merchant_category", "values": CATEGORY_FRAUD_RATES, "default": 0.015},
+        {"column": "transaction_channel", "values": CHANNEL_FRAUD_RATES, "default": 0.015},
+    ],
+    "multiplier": [
+        {"column": "hour", "values": HOUR_FRAUD_WEIGHTS, "default": 1.0},
+        {"column": "state", "values": STATE_FRAUD_MULTIPLIERS, "default": 1.0},
+    ],
+    # Values at or above each threshold get the matching multiplier
+    "bands": [
+        {"column": "amount", "thresholds": [500.0, 2_000.0], "multipliers": [1.25, 1.6]},
+        {"column": "card_tx_1h", "thresholds": [3, 6], "multipliers": [1.3, 1.8]},
+        {"column": "card_cities_24h", "thresholds": [3], "multipliers": [1.5]},
+    ],
+    "flag_threshold": 0.06,
+}
+
+
+def _lookup(column: pd.Series, values: dict, default: float) -> np.ndarray:
+    """Map a column through `values` with one dict lookup per distinct value, not per row."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        uniques = column.cat.categories
+    else:
+        codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    # The extra trailing slot catches the -1 code used for missing values
+    table = np.array([values.get(u, default) for u in uniques] + [default], dtype=float)
+    return table[codes]
+
+
+def score_transactions(df: pd.DataFrame, rules: dict = None) -> np.ndarray:
+    """Risk score per row of `df` under `rules` (defaults to DEFAULT_RULES)."""
+    rules = rules or DEFAULT_RULES
+
+    base = rules["base_rate"]
+    score = np.zeros(len(df))
+    for rule in base:
+        score += _lookup(df[rule["column"]], rule["values"], rule["default"])
+    if base:
+        score /= len(base)
+    else:
+        score += 1.0
+
+    for rule in rules.get("multiplier", []):
+        score *= _lookup(df[rule["column"]], rule["values"], rule["default"])
+
+    for rule in rules.get("bands", []):
+        band_mult = np.concatenate([[1.0], rule["multipliers"]])
+        band = np.searchsorted(rule["thresholds"], df[rule["column"]].to_numpy(dtype=float), side="right")
+        score *= band_mult[band]
+
+    return score
+
+
+def apply_rules(df: pd.DataFrame, rules: dict = None) -> pd.DataFrame:
+    """Return `df` with a `risk_score` column and a boolean `flagged` column."""
+    rules = rules or DEFAULT_RULES
+    score = score_transactions(df, rules)
+    return df.assign(risk_score=score, flagged=score >= rules["flag_threshold"])
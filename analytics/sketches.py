@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+
+# Quantile sketch: log-spaced amount buckets (DDSketch). Any quantile read
+# from the buckets is within this relative error of the exact value.
+QUANTILE_ACCURACY = 0.01
+
+# HyperLogLog: 2**HLL_PRECISION registers, standard error 1.04 / sqrt(2**p) ≈ 1.6%
+HLL_PRECISION = 12
+
+# Quantiles reported by `SegmentSketches.summary`
+SUMMARY_QUANTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+_GAMMA = (1 + QUANTILE_ACCURACY) / (1 - QUANTILE_ACCURACY)
+_LOG_GAMMA = np.log(_GAMMA)
+_MIN_AMOUNT = 0.01
+_BIN_BITS = 12
+_REGISTERS = 1 << HLL_PRECISION
+
+# A cell is one day × card type × channel × fraud type; the fraud slot is
+# "" for legitimate rows so the Fraud Type filter can keep them
+_CELL_DIMENSIONS = ["card_type", "transaction_channel", "fraud_slot"]
+_DIM_BITS = 8
+_SECONDS_PER_DAY = 86_400
+
+
+# ── Quantiles
+def amount_bins(amount: np.ndarray) -> np.ndarray:
+    """Bucket index per amount; bucket i holds (m·γ^(i-1), m·γ^i] with m = $0.01."""
+    x = np.maximum(np.asarray(amount, dtype=float), _MIN_AMOUNT)
+    bins = np.ceil(np.log(x / _MIN_AMOUNT) / _LOG_GAMMA - 1e-9)
+    return np.clip(bins, 0, (1 << _BIN_BITS) - 1).astype(np.int64)
+
+
+def bin_values(bins: np.ndarray) -> np.ndarray:
+    """Representative amount of each bucket, within QUANTILE_ACCURACY of anything in it."""
+    return _MIN_AMOUNT * 2 * _GAMMA ** np.asarray(bins, dtype=float) / (_GAMMA + 1)
+
+
+def bin_quantiles(counts: np.ndarray, quantiles: list) -> np.ndarray:
+    """Quantiles from dense bucket counts, matching `np.quantile(..., method="lower")`."""
+    cum = np.cumsum(counts)
+    if len(cum) == 0 or cum[-1] == 0:
+        return np.full(len(quantiles), np.nan)
+    ranks = np.floor(np.asarray(quantiles) * (cum[-1] - 1))
+    return bin_values(np.searchsorted(cum, ranks, side="right"))
+
+
+# ── Distinct counts
+def _leading_zeros(x: np.ndarray) -> np.ndarray:
+    """Leading zero bits of each uint64, by a six-step binary search."""
+    x = x.copy()
+    zeros = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty = (x >> np.uint64(64 - shift)) == 0
+        zeros += empty * shift
+        x = np.where(empty, x << np.uint64(shift), x)
+    return zeros + (x == 0)
+
+
+def hll_registers(values) -> tuple:
+    """(register, rank) per value: the top HLL_PRECISION hash bits pick the register,
+    the rank is one more than the leading zeros of the remaining bits."""
+    h = pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+    register = (h >> np.uint64(64 - HLL_PRECISION)).astype(np.int64)
+    rest = h << np.uint64(HLL_PRECISION)
+    rank = np.minimum(_leading_zeros(rest), 64 - HLL_PRECISION) + 1
+    return register, rank
+
+
+def hll_estimate(registers: np.ndarray) -> float:
+    """Distinct-count estimate from dense registers, with the small-range correction."""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    empty = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and empty:
+        estimate = m * np.log(m / empty)
+    return float(estimate)
+
+
+# ── Sparse merges
+def _merge_sum(keys: np.ndarray, counts: np.ndarray) -> tuple:
+    codes, uniques = pd.factorize(keys, sort=True)
+    return uniques.astype(np.int64), np.bincount(codes, weights=counts, minlength=len(uniques)).astype(np.int64)
+
+
+def _merge_max(keys: np.ndarray, ranks: np.ndarray) -> tuple:
+    codes, uniques = pd.factorize(keys, sort=True)
+    best = np.zeros(len(uniques), dtype=np.int8)
+    np.maximum.at(best, codes, ranks.astype(np.int8))
+    return uniques.astype(np.int64), best
+
+
+def _fold(table: tuple, keys: np.ndarray, values: np.ndarray, combine: np.ufunc) -> tuple:
+    """`table` (sorted keys, values) with a batch's unique sorted `keys` folded in.
+
+    Keys already present are combined in place; only keys new to the table
+    are inserted at their sorted positions, so the work follows the batch.
+    """
+    old_keys, old_values = table
+    pos = np.searchsorted(old_keys, keys)
+    found = pos < len(old_keys)
+    found[found] = old_keys[pos[found]] == keys[found]
+    combine.at(old_values, pos[found], values[found].astype(old_values.dtype))
+    new = ~found
+    if not new.any():
+        return old_keys, old_values
+    return np.insert(old_keys, pos[new], keys[new]), np.insert(old_values, pos[new], values[new])
+
+
+class SegmentSketches:
+    """Amount quantiles and distinct cards/cities, mergeable per cell.
+
+    Every (day, card type, channel, fraud type) cell keeps bucket counts for
+    amounts and HyperLogLog registers for cards and cities, stored sparsely
+    as sorted (cell, bucket) keys. Adding a batch sketches it on its own and
+    folds it in (counts add, registers take the max): keys already present
+    are updated in place and only new ones are inserted. The tables hold one
+    entry per occupied (cell, bucket) or (cell, register), at most 4,096 per
+    cell, so they stop growing once cells fill up. A filter selection is answered by merging the
+    cells it covers, which never touches the transactions.
+
+    Error bounds: quantiles are within QUANTILE_ACCURACY (1%) relative error
+    of the exact lower quantile; distinct counts have a standard error of
+    1.04 / sqrt(2**HLL_PRECISION) ≈ 1.6%.
+    """
+
+    def __init__(self):
+        self._codes = {dim: {} for dim in _CELL_DIMENSIONS}
+        self._amounts = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        self._cards = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8))
+        self._cities = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8))
+
+    def _cells(self, df: pd.DataFrame) -> np.ndarray:
+        """Packed cell key per row: day, then one byte per cell dimension."""
+        day = df["timestamp"].to_numpy(dtype="datetime64[s]").astype(np.int64) // _SECONDS_PER_DAY
+        cell = day
+        for dim in _CELL_DIMENSIONS:
+            if dim == "fraud_slot":
+                column = df["fraud_type"].fillna("Unknown").where(df["is_fraud"] == 1, "")
+            else:
+                column = df[dim]
+            codes, uniques = pd.factorize(column)
+            lookup = self._codes[dim]
+            for value in uniques:
+                lookup.setdefault(value, len(lookup))
+            mapped = np.array([lookup[v] for v in uniques], dtype=np.int64)
+            cell = cell << _DIM_BITS | mapped[codes]
+        return cell
+
+    def add(self, df: pd.DataFrame):
+        """Sketch `df` and merge it into the running sketches."""
+        if len(df) == 0:
+            return
+        cell = self._cells(df)
+        amount_key = cell << _BIN_BITS | amount_bins(df["amount"].to_numpy())
+        self._amounts = _fold(self._amounts, *_merge_sum(amount_key, np.ones(len(df), dtype=np.int64)), np.add)
+
+        # City names repeat across states, so cities are counted as state|city
+        locations = df["state"].astype(str) + "|" + df["city"].astype(str)
+        for attr, values in (("_cards", df["card_id"]), ("_cities", locations)):
+            register, rank = hll_registers(values)
+            batch = _merge_max(cell << HLL_PRECISION | register, rank)
+            setattr(self, attr, _fold(getattr(self, attr), *batch, np.maximum))
+
+    def merge(self, other: "SegmentSketches") -> "SegmentSketches":
+        """A new sketch holding both; cell codes of `other` are translated to this one's."""
+        merged = SegmentSketches()
+        for sketches in (self, other):
+            translated = sketches._translate(merged)
+            merged._amounts = _merge_sum(*[np.concatenate(p) for p in zip(merged._amounts, translated[0])])
+            merged._cards = _merge_max(*[np.concatenate(p) for p in zip(merged._cards, translated[1])])
+            merged._cities = _merge_max(*[np.concatenate(p) for p in zip(merged._cities, translated[2])])
+        return merged
+
+    def _translate(self, target: "SegmentSketches") -> tuple:
+        """This sketch's (amounts, cards, cities) with cell codes re-mapped into `target`'s."""
+        tables = []
+        for dim in _CELL_DIMENSIONS:
+            lookup = target._codes[dim]
+            table = np.zeros(max(len(self._codes[dim]), 1), dtype=np.int64)
+            for value, code in self._codes[dim].items():
+                table[code] = lookup.setdefault(value, len(lookup))
+            tables.append(table)
+
+        def remap(keys: np.ndarray, low_bits: int) -> np.ndarray:
+            cell, low = keys >> low_bits, keys & ((1 << low_bits) - 1)
+            out = cell >> (_DIM_BITS * len(_CELL_DIMENSIONS))
+            for i, table in enumerate(tables):
+                shift = _DIM_BITS * (len(_CELL_DIMENSIONS) - 1 - i)
+                out = out << _DIM_BITS | table[(cell >> shift) & ((1 << _DIM_BITS) - 1)]
+            return out << low_bits | low
+
+        return tuple((remap(keys, bits), values) for (keys, values), bits in (
+            (self._amounts, _BIN_BITS), (self._cards, HLL_PRECISION), (self._cities, HLL_PRECISION),
+        ))
+
+    def _selected(self, keys: np.ndarray, low_bits: int, filters: dict, fraud_only: bool = False) -> np.ndarray:
+        """Mask of the sparse entries whose cell matches the filter bar selection."""
+        cell = keys >> low_bits
+        fields = {}
+        for i, dim in enumerate(reversed(_CELL_DIMENSIONS)):
+            fields[dim] = (cell >> (_DIM_BITS * i)) & ((1 << _DIM_BITS) - 1)
+        day = cell >> (_DIM_BITS * len(_CELL_DIMENSIONS))
+        mask = np.ones(len(keys), dtype=bool)
+
+        def code(dim: str, value) -> int:
+            return self._codes[dim].get(value, -1)
+
+        if filters.get("start_date") is not None:
+            mask &= day >= pd.Timestamp(filters["start_date"]).value // 10 ** 9 // _SECONDS_PER_DAY
+        if filters.get("end_date") is not None:
+            mask &= day <= pd.Timestamp(filters["end_date"]).value // 10 ** 9 // _SECONDS_PER_DAY
+        if filters.get("card_type", "All Cards") != "All Cards":
+            mask &= fields["card_type"] == code("card_type", filters["card_type"])
+        if filters.get("channel", "All Channels") != "All Channels":
+            mask &= fields["transaction_channel"] == code("transaction_channel", filters["channel"])
+        legit = fields["fraud_slot"] == code("fraud_slot", "")
+        if filters.get("fraud_type", "All Types") != "All Types":
+            mask &= legit | (fields["fraud_slot"] == code("fraud_slot", filters["fraud_type"]))
+        if fraud_only:
+            mask &= ~legit
+        return mask
+
+    def _quantiles(self, filters: dict, fraud_only: bool = False) -> tuple:
+        keys, counts = self._amounts
+        sel = self._selected(keys, _BIN_BITS, filters, fraud_only)
+        dense = np.bincount(keys[sel] & ((1 << _BIN_BITS) - 1), weights=counts[sel], minlength=1 << _BIN_BITS)
+        return int(dense.sum()), bin_quantiles(dense, list(SUMMARY_QUANTILES.values()))
+
+    def _distinct(self, attr: str, filters: dict) -> int:
+        keys, ranks = getattr(self, attr)
+        sel = self._selected(keys, HLL_PRECISION, filters)
+        registers = np.zeros(_REGISTERS, dtype=np.int8)
+        np.maximum.at(registers, keys[sel] & (_REGISTERS - 1), ranks[sel])
+        return int(round(hll_estimate(registers))) if sel.any() else 0
+
+    def summary(self, filters: dict = None) -> dict:
+        """Amount percentiles (all and fraud) and distinct cards/cities for a filter selection.
+
+        `filters` uses the filter bar keys (start_date, end_date, fraud_type,
+        card_type, channel); missing keys mean no restriction.
+        """
+        filters = filters or {}
+        result = {}
+        for prefix, fraud_only in (("amount", False), ("fraud_amount", True)):
+            _, values = self._quantiles(filters, fraud_only)
+            result.update({f"{prefix}_{name}": float(v) for name, v in zip(SUMMARY_QUANTILES, values)})
+        result["distinct_cards"] = self._distinct("_cards", filters)
+        result["distinct_cities"] = self._distinct("_cities", filters)
+        return result
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from analytics.velocity import sort_by_card_time
+from data.geo import city_coordinates
+
+# Faster than a commercial flight between two transactions of one card
+MAX_SPEED_KMH = 900.0
+
+# Shorter hops (same metro area, neighbouring cities) are never flagged
+MIN_DISTANCE_KM = 150.0
+
+# Gaps are floored at a minute so same-second pairs get a finite speed
+_MIN_GAP_SECONDS = 60
+
+_EARTH_RADIUS_KM = 6371.0
+
+TRAVEL_COLUMNS = ["travel_km", "travel_kmh", "impossible_travel"]
+
+
+def haversine_km(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km between aligned coordinate arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def travel_legs(card: np.ndarray, epoch: np.ndarray, lat: np.ndarray, lon: np.ndarray) -> dict:
+    """Distance and speed from each transaction's previous one on the same card.
+
+    Returns arrays in the input row order: `prev` (input position of the
+    previous transaction, -1 for a card's first), `km`, `seconds` and `kmh`.
+    After one sort by (card, time), every leg is a pair of neighbouring rows.
+    """
+    order, _ = sort_by_card_time(card, epoch)
+    n = len(order)
+    card_sorted = np.asarray(card)[order]
+    lat = np.asarray(lat, dtype=float)[order]
+    lon = np.asarray(lon, dtype=float)[order]
+    time_sorted = np.asarray(epoch, dtype=np.int64)[order]
+
+    same_card = np.zeros(n, dtype=bool)
+    same_card[1:] = card_sorted[1:] == card_sorted[:-1]
+    km = np.zeros(n)
+    seconds = np.zeros(n, dtype=np.int64)
+    km[1:] = haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    seconds[1:] = np.diff(time_sorted)
+    km[~same_card] = 0.0
+    seconds[~same_card] = 0
+    kmh = km / (np.maximum(seconds, _MIN_GAP_SECONDS) / 3600)
+
+    prev = np.full(n, -1, dtype=np.int64)
+    prev[1:] = order[:-1]
+    prev[~same_card] = -1
+
+    legs = {}
+    for name, values in (("prev", prev), ("km", km), ("seconds", seconds), ("kmh", kmh)):
+        out = np.empty_like(values)
+        out[order] = values
+        legs[name] = out
+    return legs
+
+
+def is_impossible(km: np.ndarray, kmh: np.ndarray) -> np.ndarray:
+    """Legs long enough to leave the metro area and faster than MAX_SPEED_KMH."""
+    return (km >= MIN_DISTANCE_KM) & (kmh > MAX_SPEED_KMH)
+
+
+def _legs_for(df: pd.DataFrame) -> dict:
+    card, _ = pd.factorize(df["card_id"])
+    lat, lon = city_coordinates(df["state"], df["city"])
+    epoch = df["timestamp"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    legs = travel_legs(card, epoch, lat, lon)
+    legs["lat"], legs["lon"] = lat, lon
+    return legs
+
+
+def add_travel_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Return `df` with the TRAVEL_COLUMNS added (leg from the card's previous transaction)."""
+    legs = _legs_for(df)
+    return df.assign(
+        travel_km=legs["km"],
+        travel_kmh=legs["kmh"],
+        impossible_travel=is_impossible(legs["km"], legs["kmh"]),
+    )
+
+
+def impossible_travel_pairs(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per impossible leg, indexed by the arriving transaction's row label.
+
+    Needs the `impossible_travel` column from add_travel_features. Only the
+    cards with at least one flagged leg are re-sorted to find the departures.
+    """
+    flagged_cards = df.loc[df["impossible_travel"].to_numpy(), "card_id"].unique()
+    cards = df[df["card_id"].isin(flagged_cards)]
+    legs = _legs_for(cards)
+    arrive = np.flatnonzero(is_impossible(legs["km"], legs["kmh"]))
+    depart = legs["prev"][arrive]
+
+    pairs = pd.DataFrame({
+        "card_id": cards["card_id"].to_numpy()[arrive],
+        "from_city": cards["city"].to_numpy()[depart],
+        "from_state": cards["state"].to_numpy()[depart],
+        "from_lat": legs["lat"][depart],
+        "from_lon": legs["lon"][depart],
+        "from_time": cards["timestamp"].to_numpy()[depart],
+        "to_city": cards["city"].to_numpy()[arrive],
+        "to_state": cards["state"].to_numpy()[arrive],
+        "to_lat": legs["lat"][arrive],
+        "to_lon": legs["lon"][arrive],
+        "to_time": cards["timestamp"].to_numpy()[arrive],
+        "km": legs["km"][arrive],
+        "hours": legs["seconds"][arrive] / 3600,
+        "kmh": legs["kmh"][arrive],
+        "is_fraud": np.maximum(cards["is_fraud"].to_numpy()[arrive], cards["is_fraud"].to_numpy()[depart]),
+        "amount": cards["amount"].to_numpy()[arrive],
+    }, index=cards.index[arrive])
+    return pairs.sort_values("kmh", ascending=False)
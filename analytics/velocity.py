@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# Trailing windows for per-card counts and amounts, in seconds
+VELOCITY_WINDOWS = {"1h": 3_600, "24h": 86_400}
+
+# Window used for the distinct merchant/city counts
+DISTINCT_WINDOW = "24h"
+
+VELOCITY_COLUMNS = (
+    [f"card_tx_{w}" for w in VELOCITY_WINDOWS]
+    + [f"card_amount_{w}" for w in VELOCITY_WINDOWS]
+    + [f"card_merchants_{DISTINCT_WINDOW}", f"card_cities_{DISTINCT_WINDOW}"]
+)
+
+# Time offsets live in the low bits of the (card, time) sort key
+_TIME_BITS = 36
+
+
+def radix_argsort(keys: np.ndarray) -> np.ndarray:
+    """Stable argsort of non-negative integer keys, 16 bits per pass.
+
+    NumPy's stable sort only uses radix sort for 16-bit types, so wider
+    keys are sorted digit by digit (LSD), which beats a comparison sort on
+    card codes by 2-3x at tens of millions of rows.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    order = np.arange(len(keys))
+    top = int(keys.max()) if len(keys) else 0
+    shift = 0
+    while True:
+        digit = ((keys[order] >> shift) & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digit, kind="stable")]
+        shift += 16
+        if top >> shift == 0:
+            return order
+
+
+def sort_by_card_time(card: np.ndarray, epoch: np.ndarray) -> tuple:
+    """Row order sorted by (card, time) and the matching packed int64 sort keys.
+
+    Time-sorted input (the usual case) only needs a stable radix sort on the
+    card code; anything else falls back to a two-key lexsort.
+    """
+    card = np.asarray(card, dtype=np.int64)
+    epoch = np.asarray(epoch, dtype=np.int64)
+    if len(epoch) and np.all(epoch[1:] >= epoch[:-1]):
+        order = radix_argsort(card)
+    else:
+        order = np.lexsort((epoch, card))
+    offset = epoch[order] - (epoch.min() if len(epoch) else 0)
+    return order, (card[order] << _TIME_BITS) | offset
+
+
+def window_starts(keys: np.ndarray, seconds: int) -> np.ndarray:
+    """Index of the first row of the same card within `seconds` before each row.
+
+    This is the left pointer of a two-pointer sweep, found for every row at
+    once with a binary search over the packed keys. Subtracting the window
+    can only move the key into the previous card's range when the time
+    offset is below `seconds`, and then the search still stops at the first
+    row of the current card.
+    """
+    return np.searchsorted(keys, keys - seconds, side="left")
+
+
+def windowed_distinct(keys: np.ndarray, starts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Distinct `values` per card within [starts[i], i] for every row of the sorted order.
+
+    A row k counts towards window i when the next row with the same card and
+    value comes after i. The sweep walks back one lag at a time over the rows
+    whose window is still that long, so the total work is the sum of window
+    sizes rather than rows × max window.
+    """
+    n = len(keys)
+    card = keys >> _TIME_BITS
+    values = np.asarray(values, dtype=np.int64)
+
+    # Next position with the same (card, value); positions stay ascending within a group
+    value_bits = max(int(values.max()).bit_length(), 1) if n else 1
+    group_order = radix_argsort((card << value_bits) | values)
+    same_next = np.r_[
+        (card[group_order][1:] == card[group_order][:-1]) & (values[group_order][1:] == values[group_order][:-1]),
+        False,
+    ]
+    next_same = np.full(n, n, dtype=np.int64)
+    next_same[group_order[:-1][same_next[:-1]]] = group_order[1:][same_next[:-1]]
+
+    rows = np.arange(n)
+    sizes = rows - starts + 1
+    distinct = np.zeros(n, dtype=np.int64)
+    active = rows
+    lag = 0
+    while len(active):
+        k = active - lag
+        distinct[active] += next_same[k] > active
+        lag += 1
+        active = active[sizes[active] > lag]
+    return distinct
+
+
+def velocity_features(card: np.ndarray, epoch: np.ndarray, amount: np.ndarray,
+                      merchant: np.ndarray, city: np.ndarray) -> dict:
+    """Per-row velocity features as arrays in the input row order.
+
+    All inputs are aligned arrays; `card`, `merchant` and `city` are integer
+    codes. Windows include the current transaction.
+    """
+    order, keys = sort_by_card_time(card, epoch)
+    amount_sorted = np.asarray(amount, dtype=float)[order]
+    cum_amount = np.r_[0.0, np.cumsum(amount_sorted)]
+    rows = np.arange(len(keys))
+
+    def restore(sorted_values: np.ndarray) -> np.ndarray:
+        out = np.empty_like(sorted_values)
+        out[order] = sorted_values
+        return out
+
+    features = {}
+    for label, seconds in VELOCITY_WINDOWS.items():
+        starts = window_starts(keys, seconds)
+        features[f"card_tx_{label}"] = restore(rows - starts + 1)
+        features[f"card_amount_{label}"] = restore(cum_amount[rows + 1] - cum_amount[starts])
+        if label == DISTINCT_WINDOW:
+            features[f"card_merchants_{label}"] = restore(windowed_distinct(keys, starts, np.asarray(merchant)[order]))
+            features[f"card_cities_{label}"] = restore(windowed_distinct(keys, starts, np.asarray(city)[order]))
+    return features
+
+
+def add_velocity_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Return `df` with the VELOCITY_COLUMNS added.
+
+    The generator has no merchant identifier, so merchant category stands in
+    for the merchant. Cities are keyed together with their state because
+    names such as Columbus occur in several states.
+    """
+    card, _ = pd.factorize(df["card_id"])
+    merchant, _ = pd.factorize(df["merchant_category"])
+    city, _ = pd.factorize(df["state"].astype(str) + "|" + df["city"].astype(str))
+    epoch = df["timestamp"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    features = velocity_features(card, epoch, df["amount"].to_numpy(dtype=float), merchant, city)
+    return df.assign(**features)
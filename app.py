@@ -1,14 +1,29 @@
+from __future__ import annotations
+
+import importlib
+import inspect
+import uuid
+from typing import TYPE_CHECKING
+
 import streamlit as st
-import pandas as pd
-from datetime import datetime
 
-from data.generate_data import generate_fraud_dataset
 from components.styles import inject_css, COLORS
-from tabs.overview import render_overview
-from tabs.trends import render_trends
-from tabs.geography import render_geography
-from tabs.segments import render_segments
-from tabs.transactions import render_transactions
+
+# Everything else is imported where it is first used, so the page starts
+# drawing before pandas and the analytics modules have loaded
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from analytics.model import LogisticFraudModel
+    from data.incremental import IncrementalAggregates
+    from data.parallel import PartitionedAggregator
+    from data.persist import DiskAggregateStore
+    from data.prefetch import Prefetcher
+    from data.query import AggregateCache, BitmapIndex, QueryPlanner, RollupCube
+    from data.replay import StreamReplayer
+    from data.warmup import UsageLog, WarmUp
+    from components.memory import MemoryLedger
+    from components.profiler import RerunMetrics
 
 # ─── Page Config ─────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -21,13 +36,174 @@ st.set_page_config(
 # ─── Inject CSS ───────────────────────────────────────────────────────────────
 inject_css()
 
+# Seconds between checks for newly appended transaction batches
+LIVE_REFRESH_SECONDS = 2
+
+# Structures built over the whole history (enriched frame, index, cube, model)
+# catch up with appended batches at most this often; meanwhile the unfiltered
+# view's KPIs and single-dimension groupings come from the live rollups
+SETTLE_SECONDS = 30
+
+# Datasets at least this large open in approximate (sampled) mode
+APPROX_DEFAULT_ROWS = 1_000_000
+
+# Datasets at least this large are also aggregated by worker processes, given several cores
+PARALLEL_MIN_ROWS = 2_000_000
+
+# Filter bar column widths: from, to, fraud type, card, channel, reset
+_FILTER_WIDTHS = [1.1, 1.1, 1.6, 1.4, 1.4, 0.6]
+_FILTER_LABEL = (
+    "font-size:0.62rem;font-weight:700;text-transform:uppercase;"
+    f"letter-spacing:0.08em;color:{COLORS['text_secondary']};margin-bottom:3px;"
+)
+
+# Tab labels by tabs/ module; each module is imported the first time its tab renders
+_TABS = {
+    "overview": "  Executive Overview  ",
+    "trends": "  Temporal Trends  ",
+    "geography": "  Geographic Analysis  ",
+    "segments": "  Customer Segments  ",
+    "transactions": "  Transaction Explorer  ",
+    "model": "  Model Scores  ",
+}
+# Streamlit versions with stateful tabs can run only the selected tab's body
+_LAZY_TABS = "on_change" in inspect.signature(st.tabs).parameters
+# Tabs whose module has a prefetch_<name>; the others render from rows alone
+_PREFETCH_TABS = ("overview", "trends", "geography", "segments")
+
 
 # ─── Data Loading ─────────────────────────────────────────────────────────────
 @st.cache_data(show_spinner=False)
 def load_data():
+    from data.generate_data import generate_fraud_dataset
+
     return generate_fraud_dataset(n_transactions=50_000)
 
 
+@st.cache_resource(show_spinner=False)
+def get_live_store() -> IncrementalAggregates:
+    """Process-wide transaction store; append new batches with `get_live_store().append(batch)`."""
+    from data.incremental import IncrementalAggregates
+
+    return IncrementalAggregates(load_data())
+
+
+@st.cache_resource(show_spinner=False)
+def get_rerun_metrics() -> RerunMetrics:
+    """Process-wide rerun timings, exported per $DASHBOARD_PROFILE_DIR / $DASHBOARD_METRICS_PORT."""
+    from components.profiler import RerunMetrics
+
+    return RerunMetrics.from_env()
+
+
+@st.cache_resource(show_spinner=False)
+def get_memory_ledger() -> MemoryLedger:
+    """Process-wide cache sizes over time, for memory accounting."""
+    from components.memory import MemoryLedger
+
+    return MemoryLedger()
+
+
+@st.cache_resource(show_spinner=False)
+def get_aggregate_cache() -> AggregateCache:
+    """Process-wide groupings and figures per view, shared by every session."""
+    from data.query import AggregateCache
+
+    return AggregateCache()
+
+
+@st.cache_resource(show_spinner=False)
+def get_aggregate_store() -> DiskAggregateStore:
+    """On-disk aggregates shared with other and later processes, or None when disabled."""
+    from data.persist import DiskAggregateStore
+
+    return DiskAggregateStore.from_env()
+
+
+@st.cache_resource(show_spinner=False)
+def get_usage_log() -> UsageLog:
+    """Process-wide log of the filter selections sessions use, per $DASHBOARD_USAGE_LOG."""
+    from data.warmup import UsageLog
+
+    return UsageLog.from_env()
+
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher() -> Prefetcher:
+    """Process-wide thread pool computing unopened tabs' figures ahead of a tab switch."""
+    from data.prefetch import Prefetcher
+
+    return Prefetcher()
+
+
+@st.cache_resource(show_spinner=False)
+def get_replayer() -> StreamReplayer:
+    """Process-wide stream replayer feeding the live store."""
+    from data.replay import StreamReplayer
+
+    return StreamReplayer(get_live_store())
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_enriched_frame(version: int, _df: pd.DataFrame) -> pd.DataFrame:
+    """Full frame with velocity, travel and burst features, computed once per settled version."""
+    from analytics.bursts import add_burst_features
+    from analytics.travel import add_travel_features
+    from analytics.velocity import add_velocity_features
+
+    return add_burst_features(add_travel_features(add_velocity_features(_df)))
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_travel_pairs(version: int, _df: pd.DataFrame) -> pd.DataFrame:
+    """Impossible-travel legs of the enriched frame, cached per settled version."""
+    from analytics.travel import impossible_travel_pairs
+
+    return impossible_travel_pairs(_df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_sample(version: int, _store: IncrementalAggregates) -> pd.DataFrame:
+    """Weighted stratified sample of the live store, cached per settled version."""
+    return _store.sample()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_bitmap_index(version: int, _df: pd.DataFrame) -> BitmapIndex:
+    """Filter-column bitmaps over the enriched frame, built once per settled version."""
+    from data.query import BitmapIndex
+
+    return BitmapIndex(_df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_rollup_cube(version: int, _df: pd.DataFrame) -> RollupCube:
+    """Pre-aggregated rollup cubes, built once per settled version."""
+    from data.query import RollupCube
+
+    return RollupCube(_df)
+
+
+@st.cache_resource(show_spinner=False)
+def get_parallel_aggregator() -> PartitionedAggregator:
+    """Worker-process aggregation over memory-mapped columns, one pool for the process.
+
+    Callers `follow` it to the enriched frame of their settled version, which
+    appends new rows to the column store rather than rewriting it.
+    """
+    from data.parallel import PartitionedAggregator
+
+    return PartitionedAggregator()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_fraud_model(version: int, _df: pd.DataFrame) -> LogisticFraudModel:
+    """Fraud model trained on the full dataset, cached per settled version."""
+    from analytics.model import LogisticFraudModel
+
+    return LogisticFraudModel().fit(_df)
+
+
 @st.cache_data(show_spinner=False)
 def compute_stats(df: pd.DataFrame) -> dict:
     total = len(df)
@@ -46,8 +222,15 @@ def compute_stats(df: pd.DataFrame) -> dict:
     }
 
 
+def exact_stats(planner: QueryPlanner) -> dict:
+    """KPI totals of an exact planner's selection, shared by sessions through its caches and persisted."""
+    if planner.parallel is not None:
+        return planner.memo(("stats",), lambda: planner.parallel.stats(planner.filters), persist=True)
+    return planner.memo(("stats",), lambda: compute_stats(planner.rows()), persist=True)
+
+
 # ─── Top Header + Filter Bar ─────────────────────────────────────────────────
-def render_filter_bar(df: pd.DataFrame) -> pd.DataFrame:
+def render_filter_bar(df: pd.DataFrame) -> dict:
     """Render the dashboard header and a clean horizontal filter bar."""
 
     # ── Brand header
@@ -75,138 +258,443 @@ def render_filter_bar(df: pd.DataFrame) -> pd.DataFrame:
     )
 
     # ── Filter row — all dropdowns (selectbox), no multiselect tags
+    f0, f1, f2, f3, f4, f5 = st.columns(_FILTER_WIDTHS, gap="small")
+    filters = _filter_controls(df, [f0, f1, f2, f3, f4], "filter")
+
+    with f5:
+        st.markdown(f'<div style="{_FILTER_LABEL}">Reset</div>', unsafe_allow_html=True)
+        if st.button("Reset", key="reset_filters", use_container_width=True):
+            st.rerun()
+
+    st.markdown(
+        f"<hr style='border:none;border-top:1px solid {COLORS['border']};margin:0.9rem 0 0 0;'/>",
+        unsafe_allow_html=True,
+    )
+
+    return filters
+
+
+def render_comparison_bar(df: pd.DataFrame, baseline: dict) -> dict:
+    """Second filter row for the comparison selection, starting from the baseline's values."""
+    f0, f1, f2, f3, f4, f5 = st.columns(_FILTER_WIDTHS, gap="small")
+    comparison = _filter_controls(df, [f0, f1, f2, f3, f4], "compare", defaults=baseline)
+    with f5:
+        st.markdown(
+            f'<div style="{_FILTER_LABEL}">&nbsp;</div>'
+            f'<div style="font-size:0.72rem;font-weight:800;color:{COLORS["accent_blue"]};'
+            f'text-transform:uppercase;letter-spacing:0.06em;padding-top:0.55rem;">vs Baseline</div>',
+            unsafe_allow_html=True,
+        )
+    return comparison
+
+
+def _filter_controls(df: pd.DataFrame, columns: list, key_prefix: str, defaults: dict = None) -> dict:
+    """Date range and dropdown filters in `columns`, with widget keys under `key_prefix`."""
     fraud_types = sorted(df["fraud_type"].dropna().unique().tolist())
     card_types = sorted(df["card_type"].unique().tolist())
     channels = sorted(df["transaction_channel"].unique().tolist())
+    data_start = df["timestamp"].min().date()
+    data_end = df["timestamp"].max().date()
+    defaults = defaults or {}
+    f0, f1, f2, f3, f4 = columns
 
-    _lbl = (
-        "font-size:0.62rem;font-weight:700;text-transform:uppercase;"
-        f"letter-spacing:0.08em;color:{COLORS['text_secondary']};margin-bottom:3px;"
-    )
-
-    f0, f1, f2, f3, f4, f5 = st.columns([1.1, 1.1, 1.6, 1.4, 1.4, 0.6], gap="small")
+    def _default_index(options: list, key: str) -> int:
+        return options.index(defaults[key]) if defaults.get(key) in options else 0
 
     with f0:
-        st.markdown(f'<div style="{_lbl}">From</div>', unsafe_allow_html=True)
+        st.markdown(f'<div style="{_FILTER_LABEL}">From</div>', unsafe_allow_html=True)
         start_date = st.date_input(
             "from_date",
-            value=datetime(2023, 1, 1),
-            min_value=datetime(2023, 1, 1),
-            max_value=datetime(2023, 12, 31),
+            value=defaults.get("start_date", data_start),
+            min_value=data_start,
+            max_value=data_end,
             label_visibility="collapsed",
-            key="filter_start",
+            key=f"{key_prefix}_start",
         )
 
     with f1:
-        st.markdown(f'<div style="{_lbl}">To</div>', unsafe_allow_html=True)
+        st.markdown(f'<div style="{_FILTER_LABEL}">To</div>', unsafe_allow_html=True)
         end_date = st.date_input(
             "to_date",
-            value=datetime(2023, 12, 31),
-            min_value=datetime(2023, 1, 1),
-            max_value=datetime(2023, 12, 31),
+            value=defaults.get("end_date", data_end),
+            min_value=data_start,
+            max_value=data_end,
             label_visibility="collapsed",
-            key="filter_end",
+            key=f"{key_prefix}_end",
         )
 
     with f2:
-        st.markdown(f'<div style="{_lbl}">Fraud Type</div>', unsafe_allow_html=True)
+        st.markdown(f'<div style="{_FILTER_LABEL}">Fraud Type</div>', unsafe_allow_html=True)
         fraud_type_options = ["All Types"] + fraud_types
         selected_fraud_type = st.selectbox(
             "Fraud Type",
             options=fraud_type_options,
-            index=0,
+            index=_default_index(fraud_type_options, "fraud_type"),
             label_visibility="collapsed",
-            key="filter_fraud_type",
+            key=f"{key_prefix}_fraud_type",
         )
 
     with f3:
-        st.markdown(f'<div style="{_lbl}">Card Type</div>', unsafe_allow_html=True)
+        st.markdown(f'<div style="{_FILTER_LABEL}">Card Type</div>', unsafe_allow_html=True)
         card_type_options = ["All Cards"] + card_types
         selected_card = st.selectbox(
             "Card Type",
             options=card_type_options,
-            index=0,
+            index=_default_index(card_type_options, "card_type"),
             label_visibility="collapsed",
-            key="filter_card_type",
+            key=f"{key_prefix}_card_type",
         )
 
     with f4:
-        st.markdown(f'<div style="{_lbl}">Channel</div>', unsafe_allow_html=True)
+        st.markdown(f'<div style="{_FILTER_LABEL}">Channel</div>', unsafe_allow_html=True)
         channel_options = ["All Channels"] + channels
         selected_channel = st.selectbox(
             "Channel",
             options=channel_options,
-            index=0,
+            index=_default_index(channel_options, "channel"),
             label_visibility="collapsed",
-            key="filter_channel",
+            key=f"{key_prefix}_channel",
         )
 
-    with f5:
-        st.markdown(f'<div style="{_lbl}">Reset</div>', unsafe_allow_html=True)
-        if st.button("Reset", key="reset_filters", use_container_width=True):
-            st.rerun()
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "fraud_type": selected_fraud_type,
+        "card_type": selected_card,
+        "channel": selected_channel,
+    }
 
+
+def render_mode_badge(sample: pd.DataFrame, total_rows: int, pending: int = 0):
+    """State which mode produced the numbers on screen.
+
+    `pending` counts transactions that landed after the frame was last
+    stitched; only the live KPIs and rollup-backed charts include them yet.
+    """
+    from analytics.sampling import FRAUD_OVERSAMPLE, SAMPLE_FRACTION
+
+    if sample is None:
+        label, color = "Exact", COLORS["safe_green"]
+        detail = f"Every chart and KPI computed from all {total_rows:,} matching transactions"
+        if pending:
+            detail = (
+                f"KPIs and single-dimension charts include {pending:,} new transactions · "
+                f"the rest is computed from {total_rows:,} transactions and catches up within {SETTLE_SECONDS} s"
+            )
+    else:
+        label, color = "Approximate", COLORS["warning_amber"]
+        detail = (
+            f"Charts and KPIs estimated from a {len(sample):,}-row sample stratified by fraud label × state "
+            f"({SAMPLE_FRACTION:.0%} of legitimate, {min(1.0, SAMPLE_FRACTION * FRAUD_OVERSAMPLE):.0%} of fraud rows) "
+            "· error bars are 95% intervals · movers and risk drivers are estimated too · "
+            "the transaction explorer, model and fraud rings stay exact"
+        )
     st.markdown(
-        f"<hr style='border:none;border-top:1px solid {COLORS['border']};margin:0.9rem 0 0 0;'/>",
+        f'<div style="font-size:0.75rem;color:{COLORS["text_secondary"]};padding-top:0.45rem;">'
+        f'<span style="font-weight:800;color:{color};text-transform:uppercase;letter-spacing:0.06em;">'
+        f'{label}</span> · {detail}</div>',
         unsafe_allow_html=True,
     )
 
-    # ── Apply filters
-    filtered = df.copy()
-    start_ts = pd.Timestamp(start_date)
-    end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
-    filtered = filtered[(filtered["timestamp"] >= start_ts) & (filtered["timestamp"] < end_ts)]
 
-    if selected_fraud_type != "All Types":
-        fraud_mask = (filtered["is_fraud"] == 0) | (filtered["fraud_type"] == selected_fraud_type)
-        filtered = filtered[fraud_mask]
+def tab_renderer(name: str):
+    """`tabs.<name>.render_<name>`, importing the tab's module (and its charts) on first use."""
+    return getattr(importlib.import_module(f"tabs.{name}"), f"render_{name}")
+
+
+def tab_prefetcher(name: str):
+    """`tabs.<name>.prefetch_<name>`, which fills the shared cache with the tab's figures, or None."""
+    return getattr(importlib.import_module(f"tabs.{name}"), f"prefetch_{name}", None)
+
+
+def filter_key(filters: dict) -> str:
+    """Stable string identifying a filter selection, for cache keys."""
+    return "|".join(f"{name}={value}" for name, value in sorted(filters.items()))
+
+
+def rows_key(version: int, filters: dict, sample: pd.DataFrame = None) -> str:
+    """Cache key of the rows behind a view; estimates from the sample never share an entry with exact results."""
+    return f"{version}|{filter_key(filters)}" + ("|sample" if sample is not None else "")
+
+
+def default_filters(df: pd.DataFrame) -> dict:
+    """The filter bar's selection before anyone touches it: the whole date range, no restrictions."""
+    return {
+        "start_date": df["timestamp"].min().date(),
+        "end_date": df["timestamp"].max().date(),
+        "fraud_type": "All Types",
+        "card_type": "All Cards",
+        "channel": "All Channels",
+    }
+
+
+def view_planner(version: int, raw_df: pd.DataFrame, store: IncrementalAggregates, filters: dict,
+                 approximate: bool) -> QueryPlanner:
+    """Planner for one selection over the settled frame's shared index, cube and aggregate cache, plus
+    worker processes for datasets of PARALLEL_MIN_ROWS or more.
+
+    Approximate mode falls back to exact when the sample has no matching rows.
+    Exact planners also persist groupings to the disk store; the sample is
+    drawn afresh by each process, so its estimates are never persisted. An
+    exact planner of the unfiltered view also answers from the store's live
+    rollups while batches newer than the settled frame are pending, and its
+    view key carries the live version.
+    """
+    from data.query import QueryPlanner, apply_filters
+
+    sample = None
+    if approximate:
+        sample = apply_filters(get_sample(version, store), filters)
+        sample = sample if len(sample) else None
+    mode = "exact" if sample is None else "sample"
+    live_version = store.version
+    live = None
+    if sample is None and live_version != version and filters == default_filters(raw_df):
+        live, mode = store, f"live {live_version}"
+    parallel = None
+    if len(raw_df) >= PARALLEL_MIN_ROWS:
+        from data.parallel import default_workers
+
+        if default_workers() > 1:
+            parallel = get_parallel_aggregator()
+            parallel.follow(raw_df, store.history(version))
+    return QueryPlanner(
+        raw_df, filters, get_bitmap_index(version, raw_df), get_rollup_cube(version, raw_df),
+        sample=sample, approximate=sample is not None,
+        cache=get_aggregate_cache(), view=f"{version}|{filter_key(filters)}|{mode}", parallel=parallel,
+        disk=get_aggregate_store() if sample is None else None, dataset=store.fingerprint(version), live=live,
+    )
+
+
+# ─── Cache Warm-up ────────────────────────────────────────────────────────────
+def warm_dataset():
+    """Load the live store and build its enriched frame, bitmap index and rollup cube."""
+    version, raw_df = get_live_store().settled(SETTLE_SECONDS)
+    raw_df = get_enriched_frame(version, raw_df)
+    get_bitmap_index(version, raw_df)
+    get_rollup_cube(version, raw_df)
+
+
+def warm_view(filters: dict = None):
+    """Compute what a session opening on `filters` (default: the untouched filter bar) needs first."""
+    store = get_live_store()
+    version, raw_df = store.settled(SETTLE_SECONDS)
+    if len(raw_df) == 0:
+        return
+    raw_df = get_enriched_frame(version, raw_df)
+    planner = view_planner(version, raw_df, store, filters or default_filters(raw_df),
+                           approximate=len(raw_df) >= APPROX_DEFAULT_ROWS)
+    filtered = planner.rows()
+    if len(filtered) == 0:
+        return
+    if planner.sample is None and len(filtered) < len(raw_df):
+        exact_stats(planner)
+    tab_prefetcher(next(iter(_TABS)))(planner)
+
+
+def prefetch_tab(name: str, version: int, raw_df: pd.DataFrame, store: IncrementalAggregates, filters: dict,
+                 approximate: bool):
+    """Fill the shared caches with tab `name`'s figures for one view, off the session's thread."""
+    planner = view_planner(version, raw_df, store, filters, approximate)
+    extra = {
+        "geography": lambda: (get_travel_pairs(version, raw_df),),
+        "trends": lambda: (rows_key(version, filters, planner.sample),),
+        "segments": lambda: (rows_key(version, filters, planner.sample),),
+    }
+    tab_prefetcher(name)(planner, *extra.get(name, tuple)())
+
+
+def warm_version(getter):
+    """Call a per-version cached getter for the live store's settled enriched frame."""
+    version, raw_df = get_live_store().settled(SETTLE_SECONDS)
+    getter(version, get_enriched_frame(version, raw_df))
 
-    if selected_card != "All Cards":
-        filtered = filtered[filtered["card_type"] == selected_card]
 
-    if selected_channel != "All Channels":
-        filtered = filtered[filtered["transaction_channel"] == selected_channel]
+@st.cache_resource(show_spinner=False)
+def get_warmup() -> WarmUp:
+    """Process-wide warm-up, started by the process's first script run.
 
-    return filtered
+    Loads the dataset, then the default view and the most used logged
+    selections, then the geography tab's travel pairs and the fraud model,
+    while the budget per $DASHBOARD_WARMUP_SECONDS / $DASHBOARD_WARMUP_MB lasts.
+    """
+    from data.warmup import WarmUp
+
+    steps = [
+        ("dataset", warm_dataset),
+        ("default view", warm_view),
+        *[(f"view {filter_key(f)}", lambda f=f: warm_view(f)) for f in get_usage_log().popular()],
+        ("travel pairs", lambda: warm_version(get_travel_pairs)),
+        ("fraud model", lambda: warm_version(get_fraud_model)),
+    ]
+    return WarmUp.from_env().start(steps)
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def watch_live_store(store: IncrementalAggregates, live_version: int, settled_version: int):
+    """Rerun the whole app once a new batch has landed in the live store, and once its frame settles."""
+    if store.version != live_version or store.settled(SETTLE_SECONDS)[0] != settled_version:
+        st.rerun()
 
 
 # ─── Main App ─────────────────────────────────────────────────────────────────
 def main():
-    with st.spinner("Loading fraud intelligence data..."):
-        raw_df = load_data()
+    import pandas as pd
 
-    filtered_df = render_filter_bar(raw_df)
+    from analytics.sampling import estimate_stats
+    from components.memory import render_memory_panel
+    from components.profiler import note, render_profiler_panel, span
+    from data.query import ComparisonQuery
 
-    if len(filtered_df) == 0:
-        st.warning("No transactions match the current filters. Please adjust your selection.")
-        return
+    # Timings of the rerun before this one; this rerun's land when it finishes
+    previous_profile = st.session_state.get("last_profile")
 
-    stats = compute_stats(filtered_df)
+    # The first run of the process starts the background warm-up; later runs reuse it
+    get_warmup()
 
-    # ── Tab Navigation
-    tabs = st.tabs([
-        "  Executive Overview  ",
-        "  Temporal Trends  ",
-        "  Geographic Analysis  ",
-        "  Customer Segments  ",
-        "  Transaction Explorer  ",
-    ])
+    with st.spinner("Loading fraud intelligence data..."), span("load data"):
+        store = get_live_store()
+        version, raw_df = store.settled(SETTLE_SECONDS)
+        live_version, live_stats, live_state_data = store.snapshot()
+
+    watch_live_store(store, live_version, version)
 
-    with tabs[0]:
-        render_overview(filtered_df, stats)
+    if len(raw_df) == 0:
+        st.info("Waiting for the first transactions to arrive...")
+        return
 
-    with tabs[1]:
-        render_trends(filtered_df, stats)
+    # Velocity windows and bursts need the full history, so enrich before filtering
+    with span("enrich features"):
+        raw_df = get_enriched_frame(version, raw_df)
+
+    with span("filter bar"):
+        filters = render_filter_bar(raw_df)
+    mode_toggle, compare_toggle, mode_badge = st.columns([1, 1, 4], gap="small")
+    with mode_toggle:
+        approximate = st.toggle(
+            "Approximate mode",
+            value=len(raw_df) >= APPROX_DEFAULT_ROWS,
+            key="approx_mode",
+            help="Estimate charts from a stratified sample instead of scanning every row.",
+        )
+    with compare_toggle:
+        comparing = st.toggle(
+            "Compare",
+            value=False,
+            key="compare_mode",
+            help="Compare the filter bar's selection (baseline) with a second selection.",
+        )
 
-    with tabs[2]:
-        render_geography(filtered_df, stats)
+    # Both selections are answered together, one aggregation pass per chart
+    compare = None
+    if comparing:
+        comparison = render_comparison_bar(raw_df, filters)
+        compare = ComparisonQuery(raw_df, filters, comparison, get_rollup_cube(version, raw_df))
+        st.caption(
+            "Comparison sections lead each analysis tab and are always exact; "
+            "the rest of each tab shows the baseline selection."
+        )
 
-    with tabs[3]:
-        render_segments(filtered_df, stats)
+    # Every chart aggregation goes through the planner, which picks its access path
+    planner = view_planner(version, raw_df, store, filters, approximate)
+    sample = planner.sample
+    # Approximate views read the sample; the exact rows are only built for
+    # the explorer, the model and fraud rings, when those are shown
+    with span("filter rows"):
+        filtered_df = sample if sample is not None else planner.rows()
 
-    with tabs[4]:
-        render_transactions(filtered_df, stats)
+    if len(filtered_df) == 0:
+        st.warning("No transactions match the current filters. Please adjust your selection.")
+        return
+
+    # Filters only ever drop rows, so an unchanged row count means the full
+    # view, which the live store already keeps aggregated (batches that landed
+    # after the frame was stitched included).
+    state_data = None
+    if sample is not None:
+        stats = estimate_stats(sample)
+    elif len(filtered_df) == len(raw_df):
+        stats = live_stats
+        state_data = live_state_data
+    else:
+        with span("compute_stats"):
+            stats = exact_stats(planner)
+    with mode_badge:
+        pending = live_stats["total_transactions"] - len(raw_df) if planner.live is not None else 0
+        render_mode_badge(sample, len(filtered_df), pending)
+
+    # Percentiles and distinct counts come from merged sketches, not the rows
+    with span("sketch summary"):
+        stats = {**stats, **store.sketch_summary(filters)}
+
+    # Identifies this dataset version and filter state for per-view caches
+    view_key = f"{version}|{filter_key(filters)}"
+    rows_view = rows_key(version, filters, sample)
+
+    # Selections are logged as sessions move to them; warm-up learns the popular ones
+    if st.session_state.get("logged_filters") != filter_key(filters):
+        st.session_state["logged_filters"] = filter_key(filters)
+        get_usage_log().record(filters)
+
+    # ── Tab Navigation
+    # Stateful tabs rerun on switch and run only the selected tab, so a hidden
+    # tab's module, charts, travel pairs or model load when it is first opened
+    if _LAZY_TABS:
+        tabs = st.tabs(list(_TABS.values()), key="main_tab", on_change="rerun")
+    else:
+        tabs = st.tabs(list(_TABS.values()))
+    tab_args = {
+        "overview": lambda: (filtered_df, stats, get_replayer(), planner, compare),
+        "trends": lambda: (filtered_df, stats, rows_view, planner, compare),
+        "geography": lambda: (filtered_df, stats, state_data, get_travel_pairs(version, raw_df), planner, compare),
+        "segments": lambda: (filtered_df, stats, rows_view, planner, compare),
+        "transactions": lambda: (planner.rows(), stats),
+        "model": lambda: (planner.rows(), stats, get_fraud_model(version, raw_df), view_key),
+    }
+    opened = [name for name, tab in zip(_TABS, tabs) if getattr(tab, "open", None) is not False]
+    for name, tab in zip(_TABS, tabs):
+        if name in opened:
+            with tab, span(f"tab · {name}"):
+                tab_renderer(name)(*tab_args[name]())
+
+    # While this tab is read, the other tabs' figures for this view compute in the
+    # background; moving to another view cancels what has not started yet
+    if _LAZY_TABS:
+        get_prefetcher().submit(st.session_state.setdefault("session_token", uuid.uuid4().hex), planner.view, [
+            (name, lambda name=name: prefetch_tab(name, version, raw_df, store, filters, approximate))
+            for name in _PREFETCH_TABS if name not in opened
+        ])
+
+    with st.expander("Query Plans"):
+        plans = planner.plan_table()
+        if compare is not None:
+            plans = pd.concat([plans, compare.plan_table()], ignore_index=True)
+        st.dataframe(plans.round({"cost": 0, "ms": 1}), use_container_width=True, hide_index=True)
+
+    # Cached objects behind this view, sized by memory accounting after the rerun
+    note(view=view_key, resources={
+        "live store": store,
+        "enriched frame": raw_df,
+        "bitmap index": get_bitmap_index(version, raw_df),
+        "rollup cube": get_rollup_cube(version, raw_df),
+        "aggregate cache": get_aggregate_cache(),
+        **({"travel pairs": get_travel_pairs(version, raw_df)} if "geography" in opened else {}),
+        **({"fraud model": get_fraud_model(version, raw_df)} if "model" in opened else {}),
+        **({"sample": get_sample(version, store)} if approximate else {}),
+    })
+
+    # Opt-in debug panel: open the dashboard with ?profile=1
+    if st.query_params.get("profile") == "1":
+        render_profiler_panel(previous_profile, get_rerun_metrics())
+        render_memory_panel(previous_profile and previous_profile.memory, get_memory_ledger())
 
 
 if __name__ == "__main__":
-    main()
+    from components.memory import start_tracing
+    from components.profiler import profiled_rerun
+    from data.warmup import serving
+
+    # Memory accounting (opt-in) must trace from before the dataset loads
+    start_tracing()
+    with serving(), profiled_rerun(get_rerun_metrics(), get_memory_ledger()):
+        main()
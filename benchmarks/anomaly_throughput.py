@@ -0,0 +1,40 @@
+"""Segment anomaly detection: segments × days matrices, EWMA baselines and CUSUM.
+
+Usage: python -m benchmarks.anomaly_throughput [--rows 1000000] [--segments 500] [--days 365]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analytics.anomalies import binomial_z, cusum, ewma_baseline, what_changed
+from benchmarks.common import best_of, tiled_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--segments", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    total = rng.poisson(50, (args.segments, args.days)).astype(float)
+    fraud = rng.binomial(total.astype(int), 0.04).astype(float)
+
+    def detect():
+        baseline = ewma_baseline(total, fraud)
+        return cusum(binomial_z(total, fraud, baseline))
+
+    elapsed = best_of(detect)
+    print(f"matrix  {args.segments:>6,} segments × {args.days} days  {elapsed * 1000:8.1f} ms")
+
+    df = tiled_dataset(args.rows)
+    start = time.perf_counter()
+    changes = what_changed(df)
+    elapsed = time.perf_counter() - start
+    print(f"frame   {len(df):>12,} rows               {elapsed * 1000:8.1f} ms  ({len(changes)} segments reported)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Live-store append latency as the history grows: the whole append, and the sketch merge on its own.
+
+Usage: python -m benchmarks.append_latency [--history 100000 1000000 3000000] [--batch 1000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analytics.sketches import SegmentSketches
+from benchmarks.common import tiled_dataset
+from data.incremental import IncrementalAggregates
+from data.replay import shift_to_follow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history", type=int, nargs="+", default=[100_000, 1_000_000, 3_000_000])
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = tiled_dataset(max(args.history), sort=False)
+    # Unique card ids and cent offsets per tile, so the sketches fill as the history grows
+    tile = np.arange(len(source)) // 50_000
+    source["card_id"] = source["card_id"] + "-" + tile.astype(str)
+    source["amount"] = source["amount"] + tile * 0.01
+    source = source.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    for rows in args.history:
+        history = source.iloc[:rows].reset_index(drop=True)
+        store = IncrementalAggregates(history)
+        sketches = SegmentSketches()
+        sketches.add(history)
+        appends, merges = [], []
+        for _ in range(args.repeat):
+            batch = shift_to_follow(source.iloc[:args.batch], store.frame()["timestamp"].max())
+            start = time.perf_counter()
+            store.append(batch)
+            appends.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            sketches.add(batch)
+            merges.append(time.perf_counter() - start)
+        print(f"history {rows:>12,}  append {min(appends) * 1000:7.1f} ms  sketch merge {min(merges) * 1000:7.1f} ms  "
+              f"({args.batch:,}-row batches, best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
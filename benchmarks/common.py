@@ -0,0 +1,42 @@
+import time
+import tracemalloc
+
+import pandas as pd
+
+from data.generate_data import generate_fraud_dataset
+
+_BASE_ROWS = 50_000
+
+
+def tiled_dataset(n_rows: int, sort: bool = True) -> pd.DataFrame:
+    """`n_rows` transactions built by tiling one generated 50k-row dataset.
+
+    Generating millions of rows directly is slow; tiling keeps the column
+    types and value distributions while taking a fraction of the time.
+    """
+    base = generate_fraud_dataset(n_transactions=_BASE_ROWS)
+    reps = -(-n_rows // len(base))
+    df = pd.concat([base] * reps, ignore_index=True).iloc[:n_rows]
+    if sort:
+        df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    return df
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """Best wall time of `repeat` calls to `fn`, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn) -> int:
+    """Peak bytes allocated (Python and NumPy, via tracemalloc) during one call to `fn`."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,58 @@
+"""Comparison mode: one batched pass for both selections against answering each selection separately.
+
+Usage: python -m benchmarks.comparison_pass [--rows 1000000]
+"""
+import argparse
+
+from benchmarks.common import best_of, tiled_dataset
+from data.generate_data import add_derived_columns
+from data.query import ComparisonQuery, QueryPlanner, RollupCube
+
+_DEFAULT_FILTERS = {
+    "start_date": "2023-01-01", "end_date": "2023-12-31",
+    "fraud_type": "All Types", "card_type": "All Cards", "channel": "All Channels",
+}
+_BASELINE = {**_DEFAULT_FILTERS, "start_date": "2023-01-01", "end_date": "2023-06-30", "card_type": "Visa"}
+_COMPARISON = {**_DEFAULT_FILTERS, "start_date": "2023-07-01", "end_date": "2023-12-31", "card_type": "Mastercard"}
+
+_GROUPINGS = ["merchant_category", "transaction_channel", "hour", "date", ["state", "state_name"], "age_group"]
+
+
+def single(df, cube, filters: dict):
+    """Every grouping for one selection, as one view of the dashboard answers it."""
+    planner = QueryPlanner(df, filters, cube=cube)
+    for keys in _GROUPINGS:
+        planner.groups(keys)
+
+
+def separate(df, cube):
+    """Both selections answered on their own, as switching filters back and forth would."""
+    single(df, cube, _BASELINE)
+    single(df, cube, _COMPARISON)
+
+
+def batched(df, cube):
+    compare = ComparisonQuery(df, _BASELINE, _COMPARISON, cube)
+    compare.stats()
+    for keys in _GROUPINGS:
+        compare.groups(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = add_derived_columns(tiled_dataset(args.rows))
+    cube = RollupCube(df)
+    for label, structure in (("rollup", cube), ("rows only", None)):
+        one_view = best_of(lambda: single(df, structure, _BASELINE))
+        two = best_of(lambda: separate(df, structure))
+        one_pass = best_of(lambda: batched(df, structure))
+        print(f"{label:<10} {len(df):>12,} rows  one selection {one_view * 1000:8.1f} ms  "
+              f"two separately {two * 1000:8.1f} ms  batched comparison {one_pass * 1000:8.1f} ms "
+              f"({one_pass / one_view:.2f}× a single view)")
+
+
+if __name__ == "__main__":
+    main()
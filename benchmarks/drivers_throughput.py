@@ -0,0 +1,33 @@
+"""Risk-driver analysis: one count cube, then every 2- and 3-way table from it.
+
+Usage: python -m benchmarks.drivers_throughput [--rows 1000000]
+"""
+import argparse
+import time
+
+from analytics.drivers import count_cube, find_drivers
+from benchmarks.common import tiled_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = tiled_dataset(args.rows)
+
+    start = time.perf_counter()
+    _, total, _ = count_cube(df)
+    cube_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    drivers = find_drivers(df)
+    elapsed = time.perf_counter() - start
+
+    print(f"count cube   {len(df):>12,} rows → {total.size:,} cells  {cube_seconds * 1000:8.1f} ms")
+    print(f"find_drivers {len(df):>12,} rows                    {elapsed * 1000:8.1f} ms  "
+          f"({len(drivers):,} segments above support)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Concurrent-session load test: rerun latency percentiles, throughput and RSS as simulated sessions increase.
+
+Each simulated session is a headless AppTest client of app.py. Like browser
+sessions on one `streamlit run` process, sessions run on their own threads
+and share the process-wide caches. Every session loads the dashboard, then
+replays the interaction scripts below in turn, starting at a different
+script so the levels mix filter, drill-down and search reruns. Latency is
+the wall time of one interaction's rerun. Throughput is completed reruns per
+second across all sessions. RSS is sampled while the level runs.
+
+Usage: python -m benchmarks.load_test [--sessions 1 2 4 8] [--rounds 2] [--think 0.5]
+"""
+import argparse
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+from streamlit import logger as st_logger
+from streamlit.testing.v1 import AppTest
+
+from data.warmup import rss_mb
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+# Interaction scripts, as (widget kind, widget key, value) steps; each step is one
+# rerun. A "tab" step selects a tab of app.py's main tab bar.
+SCRIPTS = {
+    "narrow dates": [
+        ("date_input", "filter_start", date(2023, 4, 1)),
+        ("date_input", "filter_end", date(2023, 6, 30)),
+        ("date_input", "filter_start", date(2023, 1, 1)),
+        ("date_input", "filter_end", date(2023, 12, 31)),
+    ],
+    "switch fraud type": [
+        ("selectbox", "filter_fraud_type", "Card Not Present"),
+        ("selectbox", "filter_fraud_type", "Account Takeover"),
+        ("selectbox", "filter_card_type", "Visa"),
+        ("selectbox", "filter_card_type", "All Cards"),
+        ("selectbox", "filter_fraud_type", "All Types"),
+    ],
+    "explorer search": [
+        ("tab", "main_tab", "  Transaction Explorer  "),
+        ("selectbox", "tx_fraud_filter", "Fraud Only"),
+        ("text_input", "tx_search", "Jacksonville"),
+        ("text_input", "tx_search", "CA"),
+        ("text_input", "tx_search", ""),
+        ("selectbox", "tx_fraud_filter", "All Transactions"),
+        ("tab", "main_tab", "  Executive Overview  "),
+    ],
+}
+
+# Seconds between RSS samples while a level runs
+_RSS_INTERVAL = 0.1
+
+
+class _RssSampler:
+    """Peak RSS over the lifetime of the `with` block, sampled from a background thread."""
+
+    def __init__(self):
+        self.peak_mb = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(_RSS_INTERVAL):
+            self.peak_mb = max(self.peak_mb, rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _apply(at: AppTest, kind: str, key: str, value):
+    if kind == "tab":
+        at.session_state[key] = value
+        return
+    widget = getattr(at, kind)(key=key)
+    if kind == "selectbox":
+        widget.select(value)
+    elif kind == "text_input":
+        widget.input(value)
+    else:
+        widget.set_value(value)
+
+
+def run_session(number: int, rounds: int, think: float, timeout: float, start: threading.Barrier,
+                latencies: list, errors: list):
+    """One simulated analyst: load the dashboard, wait for the others, then replay the scripts.
+
+    A session that fails records why and breaks the start barrier, so the
+    level ends instead of waiting on it.
+    """
+    names = list(SCRIPTS)
+    order = names[number % len(names):] + names[:number % len(names)]
+    try:
+        at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        at.run()
+        start.wait()
+        for _ in range(rounds):
+            for name in order:
+                for kind, key, value in SCRIPTS[name]:
+                    _apply(at, kind, key, value)
+                    began = time.perf_counter()
+                    at.run()
+                    latencies.append((name, time.perf_counter() - began))
+                    if at.exception:
+                        errors.append(f"session {number} · {name} · {key}: {at.exception[0].message}")
+                    if think:
+                        time.sleep(think)
+    except Exception as exc:
+        errors.append(f"session {number}: {exc!r}")
+        start.abort()
+
+
+def run_level(sessions: int, rounds: int, think: float, timeout: float) -> dict:
+    """Latency percentiles (ms), throughput and peak RSS with `sessions` concurrent sessions."""
+    latencies, errors = [], []
+    start = threading.Barrier(sessions + 1)
+    threads = [
+        threading.Thread(target=run_session, args=(i, rounds, think, timeout, start, latencies, errors), daemon=True)
+        for i in range(sessions)
+    ]
+    with _RssSampler() as rss:
+        for thread in threads:
+            thread.start()
+        try:
+            start.wait()
+        except threading.BrokenBarrierError:
+            pass
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+    ms = np.array([seconds for _, seconds in latencies]) * 1000
+    if len(ms) == 0:
+        ms = np.array([np.nan])
+    return {
+        "reruns": len(latencies),
+        "p50": np.percentile(ms, 50),
+        "p95": np.percentile(ms, 95),
+        "p99": np.percentile(ms, 99),
+        "throughput": len(latencies) / elapsed,
+        "rss_mb": rss.peak_mb,
+        "by_script": {name: np.median([s for n, s in latencies if n == name] or [np.nan]) * 1000 for name in SCRIPTS},
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrency levels to run")
+    parser.add_argument("--rounds", type=int, default=2, help="passes over all scripts per session")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds a session waits between interactions")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds before one rerun counts as hung")
+    args = parser.parse_args()
+
+    st_logger.set_log_level("error")
+    print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'reruns/s':>9} {'RSS MB':>8}"
+          f"  median ms by script")
+    for sessions in args.sessions:
+        level = run_level(sessions, args.rounds, args.think, args.timeout)
+        scripts = "  ".join(f"{name} {ms:,.0f}" for name, ms in level["by_script"].items())
+        print(f"{sessions:>8} {level['reruns']:>7} {level['p50']:>9,.0f} {level['p95']:>9,.0f} {level['p99']:>9,.0f} "
+              f"{level['throughput']:>9.2f} {level['rss_mb']:>8,.0f}  {scripts}")
+        for error in level["errors"]:
+            print(f"    error: {error}")
+
+
+if __name__ == "__main__":
+    main()
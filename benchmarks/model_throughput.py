@@ -0,0 +1,28 @@
+"""Logistic model training time and batch scoring throughput.
+
+Usage: python -m benchmarks.model_throughput [--rows 2000000] [--epochs 2]
+"""
+import argparse
+
+from analytics.model import LogisticFraudModel, roc_auc
+from benchmarks.common import best_of, tiled_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--epochs", type=int, default=2)
+    args = parser.parse_args()
+
+    df = tiled_dataset(args.rows, sort=False)
+    model = LogisticFraudModel(epochs=args.epochs).fit(df)
+    print(f"train   {len(df):>12,} rows  {model.train_seconds:7.3f}s  "
+          f"{len(df) * args.epochs / model.train_seconds / 1e6:8.2f} M row-epochs/s")
+
+    elapsed = best_of(lambda: model.predict_proba(df))
+    print(f"score   {len(df):>12,} rows  {elapsed:7.3f}s  {len(df) / elapsed / 1e6:8.2f} M tx/s")
+    print(f"ROC AUC (in-sample): {roc_auc(model.predict_proba(df), df['is_fraud'].to_numpy()):.3f}")
+
+
+if __name__ == "__main__":
+    main()
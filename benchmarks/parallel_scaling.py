@@ -0,0 +1,95 @@
+"""Partitioned aggregation scaling: one pass over every chart grouping with 1 to N worker processes.
+
+The dataset is written to a memory-mapped ColumnStore in 1M-row chunks, so
+the row count is bounded by disk rather than memory (100M rows take about
+4 GB). Each level times a fresh pass of a PartitionedAggregator with that
+many workers, after a warm-up pass has started the workers and paged the
+columns in. Speedup and efficiency are relative to one worker; levels past
+the machine's core count cannot scale. Up to --pandas-max rows, the same
+groupings are also timed single-threaded with pandas over the filtered frame.
+
+Usage: python -m benchmarks.parallel_scaling [--rows 100000000] [--workers 1 2 4 8 16 32]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from analytics.sampling import group_estimates
+from benchmarks.common import best_of, tiled_dataset
+from data.parallel import GROUPINGS, ColumnStore, PartitionedAggregator
+from data.query import apply_filters
+
+_CHUNK_ROWS = 1_000_000
+
+_FILTERS = {
+    "start_date": pd.Timestamp("2023-01-01").date(), "end_date": pd.Timestamp("2023-12-31").date(),
+    "fraud_type": "All Types", "card_type": "All Cards", "channel": "All Channels",
+}
+_WARMUP_FILTERS = {**_FILTERS, "card_type": "Visa"}
+
+
+def _chunks(rows: int, chunk: pd.DataFrame):
+    for start in range(0, rows, len(chunk)):
+        yield chunk.iloc[:min(len(chunk), rows - start)]
+
+
+def pandas_pass(df: pd.DataFrame) -> float:
+    """Seconds to filter `df` and group it by every grouping in one thread."""
+    def run():
+        rows = apply_filters(df, _FILTERS)
+        for keys in GROUPINGS[1:]:
+            group_estimates(rows, list(keys))
+    return best_of(run, repeat=1)
+
+
+def parallel_pass(store: ColumnStore, workers: int, repeat: int) -> float:
+    """Best seconds of a fresh aggregation pass with `workers` processes."""
+    aggregator = PartitionedAggregator(store, workers=workers)
+    try:
+        aggregator.aggregate(_WARMUP_FILTERS)
+
+        def run():
+            aggregator.clear()
+            aggregator.aggregate(_FILTERS)
+        return best_of(run, repeat=repeat)
+    finally:
+        aggregator.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="worker levels")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per level (best of)")
+    parser.add_argument("--pandas-max", type=int, default=10_000_000, help="largest row count timed with pandas")
+    parser.add_argument("--dir", default=None, help="where the column files go (default: a temporary directory)")
+    args = parser.parse_args()
+
+    chunk = tiled_dataset(min(args.rows, _CHUNK_ROWS), sort=True)
+    with tempfile.TemporaryDirectory(prefix="fraud-columns-", dir=args.dir) as directory:
+        start = time.perf_counter()
+        store = ColumnStore(_chunks(args.rows, chunk), directory)
+        print(f"column store  {store.rows:>12,} rows  {len(store.partitions)} partitions  "
+              f"{time.perf_counter() - start:8.1f} s  ({os.cpu_count()} cores)")
+        if args.rows <= args.pandas_max:
+            df = pd.concat(list(_chunks(args.rows, chunk)), ignore_index=True)
+            seconds = pandas_pass(df)
+            print(f"pandas, 1 thread      {seconds:8.2f} s  {store.rows / seconds / 1e6:8.1f} M rows/s")
+            del df
+
+        print(f"{'workers':>8} {'seconds':>9} {'M rows/s':>9} {'speedup':>8} {'efficiency':>11}")
+        single = None
+        for workers in args.workers:
+            seconds = parallel_pass(store, workers, args.repeat)
+            if single is None:
+                single = seconds * workers
+            note = "  (more workers than cores)" if workers > (os.cpu_count() or 1) else ""
+            print(f"{workers:>8} {seconds:>9.2f} {store.rows / seconds / 1e6:>9.1f} {single / seconds:>7.2f}x "
+                  f"{single / seconds / workers:>10.0%}{note}")
+
+
+if __name__ == "__main__":
+    main()
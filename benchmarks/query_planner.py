@@ -0,0 +1,76 @@
+"""Chart aggregations on every access path against the query planner's choice.
+
+Usage: python -m benchmarks.query_planner [--rows 1000000]
+"""
+import argparse
+import time
+
+from analytics.sampling import group_estimates, stratified_sample
+from benchmarks.common import best_of, tiled_dataset
+from data.generate_data import add_derived_columns
+from data.query import BitmapIndex, QueryPlanner, RollupCube, apply_filters
+
+_SELECTIONS = {
+    "full year": {},
+    "Q2 · Visa · Online": {
+        "start_date": "2023-04-01", "end_date": "2023-06-30", "card_type": "Visa", "channel": "Online",
+    },
+    "Dec · Card Not Present": {
+        "start_date": "2023-12-01", "end_date": "2023-12-31", "fraud_type": "Card Not Present",
+    },
+}
+
+_GROUPINGS = ["merchant_category", "week", ["day_of_week", "hour"], ["state", "state_name"], ["city", "state"]]
+
+_DEFAULT_FILTERS = {
+    "start_date": "2023-01-01", "end_date": "2023-12-31",
+    "fraud_type": "All Types", "card_type": "All Cards", "channel": "All Channels",
+}
+
+
+def path_times(df, index, cube, sample, filters: dict, keys: list) -> dict:
+    """Wall time of one grouping, materialising the filtered rows fresh on each path."""
+    times = {
+        "scan": best_of(lambda: group_estimates(apply_filters(df, filters), keys), repeat=1),
+        "index": best_of(lambda: group_estimates(df.iloc[index.positions(filters)], keys), repeat=1),
+        "sample": best_of(lambda: group_estimates(apply_filters(sample, filters), keys)),
+    }
+    if cube.cube_for(keys) is not None:
+        times["rollup"] = best_of(lambda: cube.groups(keys, filters))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = add_derived_columns(tiled_dataset(args.rows))
+    start = time.perf_counter()
+    index = BitmapIndex(df)
+    print(f"build index   {len(df):>12,} rows  {(time.perf_counter() - start) * 1000:8.1f} ms")
+    start = time.perf_counter()
+    cube = RollupCube(df)
+    cells = sum(len(table) for table in cube.tables.values())
+    print(f"build rollup  {len(df):>12,} rows  {(time.perf_counter() - start) * 1000:8.1f} ms  ({cells:,} cells)")
+    sample = stratified_sample(df, seed=0)
+
+    for name, selection in _SELECTIONS.items():
+        filters = {**_DEFAULT_FILTERS, **selection}
+        print(f"\n{name}")
+        for keys in _GROUPINGS:
+            keys = [keys] if isinstance(keys, str) else keys
+            times = path_times(df, index, cube, sample, filters, keys)
+            planner = QueryPlanner(df, filters, index, cube)
+            start = time.perf_counter()
+            planner.groups(keys)
+            planned = time.perf_counter() - start
+            chosen = planner.log[-1]["path"]
+            fastest = min((p for p in times if p != "sample"), key=times.get)
+            paths = "  ".join(f"{p} {t * 1000:7.1f}" for p, t in times.items())
+            print(f"  {' × '.join(keys):<20} {paths} ms  planner → {chosen} {planned * 1000:7.1f} ms"
+                  f"  (fastest exact: {fastest})")
+
+
+if __name__ == "__main__":
+    main()
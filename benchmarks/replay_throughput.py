@@ -0,0 +1,45 @@
+"""Replay ingest throughput: sliding windows alone and windows + live store.
+
+Usage: python -m benchmarks.replay_throughput [--rows 500000] [--ticks 500]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import tiled_dataset
+from data.incremental import IncrementalAggregates
+from data.replay import SlidingWindowKPIs, StreamReplayer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+
+    df = tiled_dataset(args.rows)
+    epochs = df["timestamp"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    amount = df["amount"].to_numpy(dtype=float)
+    is_fraud = df["is_fraud"].to_numpy()
+    cuts = np.linspace(0, len(df), args.ticks + 1).astype(int)
+
+    windows = SlidingWindowKPIs()
+    start = time.perf_counter()
+    for lo, hi in zip(cuts[:-1], cuts[1:]):
+        windows.ingest(epochs[lo:hi], amount[lo:hi], is_fraud[lo:hi])
+        windows.kpis()
+    elapsed = time.perf_counter() - start
+    print(f"windows only      {len(df):>10,} rows  {elapsed:7.3f}s  {len(df) / elapsed:>12,.0f} tx/s")
+
+    replayer = StreamReplayer(IncrementalAggregates(df.iloc[:0]))
+    replayer.load(df)
+    start = time.perf_counter()
+    for hi in cuts[1:]:
+        replayer.step(int(epochs[hi - 1]))
+    elapsed = time.perf_counter() - start
+    print(f"windows + store   {len(df):>10,} rows  {elapsed:7.3f}s  {len(df) / elapsed:>12,.0f} tx/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Fraud-ring components: batched union-find over a bipartite card↔entity edge list.
+
+Usage: python -m benchmarks.rings_throughput [--edges 20000000] [--cards 2000000] [--entities 5000000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analytics.rings import UnionFind
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=20_000_000)
+    parser.add_argument("--cards", type=int, default=2_000_000)
+    parser.add_argument("--entities", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    card = rng.integers(0, args.cards, args.edges, dtype=np.int32)
+    entity = rng.integers(0, args.entities, args.edges, dtype=np.int32) + np.int32(args.cards)
+    print(f"edge list {(card.nbytes + entity.nbytes) / 1e6:,.0f} MB as int32")
+
+    sets = UnionFind(args.cards + args.entities)
+    start = time.perf_counter()
+    sets.union_many(card, entity)
+    roots = sets.roots()
+    elapsed = time.perf_counter() - start
+
+    sizes = np.bincount(roots[:args.cards], minlength=len(roots))
+    print(f"{args.edges:>12,} edges  {elapsed:7.2f}s  {args.edges / elapsed / 1e6:6.2f} M edges/s")
+    print(f"{np.count_nonzero(sizes):,} card components, largest {sizes.max():,} cards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Amount percentiles and distinct counts: merged sketches against exact computation.
+
+Usage: python -m benchmarks.sketch_accuracy [--rows 1000000] [--batch 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics.sketches import SUMMARY_QUANTILES, SegmentSketches
+from benchmarks.common import best_of, tiled_dataset
+
+_SELECTIONS = {
+    "everything": {},
+    "Q2 · Visa · Online": {
+        "start_date": "2023-04-01", "end_date": "2023-06-30", "card_type": "Visa", "channel": "Online",
+    },
+    "Dec · Card Not Present": {
+        "start_date": "2023-12-01", "end_date": "2023-12-31", "fraud_type": "Card Not Present",
+    },
+}
+
+
+def exact_summary(df: pd.DataFrame, filters: dict) -> dict:
+    """The sketch summary computed from the rows themselves."""
+    mask = np.ones(len(df), dtype=bool)
+    if "start_date" in filters:
+        mask &= df["timestamp"] >= pd.Timestamp(filters["start_date"])
+    if "end_date" in filters:
+        mask &= df["timestamp"] < pd.Timestamp(filters["end_date"]) + pd.Timedelta(days=1)
+    if "card_type" in filters:
+        mask &= df["card_type"] == filters["card_type"]
+    if "channel" in filters:
+        mask &= df["transaction_channel"] == filters["channel"]
+    if "fraud_type" in filters:
+        mask &= (df["is_fraud"] == 0) | (df["fraud_type"] == filters["fraud_type"])
+    rows = df[mask]
+    fraud = rows.loc[rows["is_fraud"] == 1, "amount"].to_numpy()
+    result = {}
+    for prefix, amounts in (("amount", rows["amount"].to_numpy()), ("fraud_amount", fraud)):
+        result.update({f"{prefix}_{name}": float(np.quantile(amounts, q, method="lower"))
+                       for name, q in SUMMARY_QUANTILES.items()})
+    result["distinct_cards"] = rows["card_id"].nunique()
+    result["distinct_cities"] = (rows["state"] + "|" + rows["city"]).nunique()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=100_000, help="rows per sketched partition")
+    args = parser.parse_args()
+
+    df = tiled_dataset(args.rows)
+    # Unique card ids per tile, so distinct counts grow with the rows
+    df["card_id"] = df["card_id"] + "-" + (np.arange(len(df)) // 50_000).astype(str)
+
+    sketches = SegmentSketches()
+    start = time.perf_counter()
+    for first in range(0, len(df), args.batch):
+        sketches.add(df.iloc[first:first + args.batch])
+    elapsed = time.perf_counter() - start
+    print(f"build   {len(df):>12,} rows in {args.batch:,}-row partitions  {elapsed * 1000:8.1f} ms  "
+          f"({len(sketches._amounts[0]):,} amount cells)")
+
+    for label, filters in _SELECTIONS.items():
+        sketch_time = best_of(lambda: sketches.summary(filters))
+        exact_time = best_of(lambda: exact_summary(df, filters), repeat=1)
+        approx, exact = sketches.summary(filters), exact_summary(df, filters)
+        errors = {k: abs(approx[k] - exact[k]) / exact[k] for k in exact if exact[k]}
+        worst = max(errors, key=errors.get)
+        print(f"{label:<24} sketch {sketch_time * 1000:7.1f} ms  exact {exact_time * 1000:8.1f} ms  "
+              f"worst error {errors[worst]:.2%} ({worst})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Cold start: worker spawn time, first paint and first rerun times, and an import-time breakdown per module.
+
+Every measurement runs in a fresh interpreter, as a new autoscaled worker
+would. Spawn time is starting Python and importing Streamlit, which a
+worker does before it can accept a session. The first rerun is the first
+session's run of app.py headlessly: importing the app's modules, loading
+the dataset and rendering the page. First paint is the part of it until
+the session receives its first element, before which the browser shows
+a blank page. The breakdown comes from
+`python -X importtime` on that same first rerun. app.py loads tab modules
+through importlib, which -X importtime does not log; the modules they
+import still appear.
+
+Usage: python -m benchmarks.startup [--runs 3] [--top 20]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Packages of this repo; everything else is reported by top-level package
+_PROJECT = ("app", "tabs", "components", "data", "analytics")
+
+_CHILD = f"""
+import json, time
+start = time.perf_counter()
+import streamlit
+from streamlit import logger
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.testing.v1 import AppTest
+logger.set_log_level("error")
+painted = []
+enqueue = DeltaGenerator._enqueue
+def first_element(self, *args, **kwargs):
+    painted.append(painted or time.perf_counter())
+    return enqueue(self, *args, **kwargs)
+DeltaGenerator._enqueue = first_element
+spawned = time.perf_counter()
+at = AppTest.from_file({str(ROOT / "app.py")!r}, default_timeout=600)
+at.run()
+print(json.dumps({{"spawn": spawned - start, "first_paint": painted[0] - spawned,
+                  "first_rerun": time.perf_counter() - spawned, "exceptions": [e.message for e in at.exception]}}))
+"""
+
+
+def _child(*flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", _CHILD], cwd=ROOT, capture_output=True, text=True)
+
+
+def cold_start() -> dict:
+    """Spawn, first paint, first rerun and total wall time (seconds) of one fresh worker."""
+    began = time.perf_counter()
+    child = _child()
+    total = time.perf_counter() - began
+    timings = json.loads(child.stdout.strip().splitlines()[-1])
+    return {**timings, "total": total}
+
+
+def import_breakdown() -> list:
+    """(module, self seconds, cumulative seconds) for every import of a fresh worker's first rerun."""
+    rows = []
+    for line in _child("-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return rows
+
+
+def by_package(rows: list) -> dict:
+    """Seconds per top-level package (or per module of this repo), counting each module's own time once."""
+    totals = {}
+    for name, own, _ in rows:
+        top = name.split(".")[0]
+        key = name if top in _PROJECT else top
+        totals[key] = totals.get(key, 0.0) + own
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="fresh workers timed (best of)")
+    parser.add_argument("--top", type=int, default=20, help="packages and modules listed in the breakdown")
+    args = parser.parse_args()
+
+    runs = [cold_start() for _ in range(args.runs)]
+    errors = {message for run in runs for message in run["exceptions"]}
+    for label, key in (("worker spawn", "spawn"), ("first paint", "first_paint"), ("first rerun", "first_rerun"),
+                       ("spawn to first rerun", "total")):
+        print(f"{label:<22} {min(run[key] for run in runs) * 1000:9.0f} ms  (best of {args.runs})")
+    for message in errors:
+        print(f"  first rerun raised: {message}")
+
+    rows = import_breakdown()
+    print(f"\nimport time by package, own time per module summed ({sum(r[1] for r in rows) * 1000:,.0f} ms total)")
+    for name, seconds in list(by_package(rows).items())[:args.top]:
+        print(f"  {name:<40} {seconds * 1000:8.1f} ms")
+    print("\nslowest modules of this repo, cumulative")
+    project = sorted((r for r in rows if r[0].split(".")[0] in _PROJECT), key=lambda r: -r[2])
+    for name, _, cumulative in project[:args.top]:
+        print(f"  {name:<40} {cumulative * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
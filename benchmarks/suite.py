@@ -0,0 +1,223 @@
+"""Dashboard benchmark suite: generator, filters, stats, every chart builder and tab render, against a stored baseline.
+
+Tab renders run headless: Streamlit calls outside `streamlit run` execute
+in bare mode, building every element without a browser. Each case reports
+best wall time, peak Python/NumPy memory and the JSON size of the figures
+it produces. `--save-baseline` stores the results; later runs flag cases
+that got slower, bigger or heavier than the baseline by more than the
+tolerance and exit non-zero.
+
+Usage: python -m benchmarks.suite [--rows 50000 1000000 10000000] [--save-baseline] [--tolerance 0.25]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit import logger as st_logger
+
+import app
+from analytics.bursts import add_burst_features
+from analytics.model import LogisticFraudModel
+from analytics.thresholds import ThresholdCurve
+from analytics.travel import add_travel_features, impossible_travel_pairs
+from analytics.velocity import add_velocity_features
+from benchmarks.common import best_of, peak_memory, tiled_dataset
+from components import charts
+from data.generate_data import generate_fraud_dataset
+from data.query import BitmapIndex, ComparisonQuery, QueryPlanner, RollupCube, apply_filters
+from tabs.geography import render_geography
+from tabs.model import render_model
+from tabs.overview import render_overview
+from tabs.segments import render_segments
+from tabs.transactions import render_transactions
+from tabs.trends import render_trends
+
+SIZES = [50_000, 1_000_000, 10_000_000]
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# The default full-year view every chart and tab is timed on
+_ALL = {
+    "start_date": "2023-01-01", "end_date": "2023-12-31",
+    "fraud_type": "All Types", "card_type": "All Cards", "channel": "All Channels",
+}
+# A narrower selection for the filtering paths
+_SELECTION = {**_ALL, "start_date": "2023-04-01", "end_date": "2023-06-30", "card_type": "Visa", "channel": "Online"}
+_COMPARISON = {**_ALL, "start_date": "2023-07-01", "end_date": "2023-09-30", "card_type": "Visa", "channel": "Online"}
+
+# Builders taking a frame or QueryPlanner, as the tabs call them
+_SOURCE_CHARTS = [
+    "fraud_donut", "fraud_by_category_bar", "monthly_fraud_trend", "hourly_heatmap", "day_of_week_bar",
+    "quarterly_comparison", "weekly_trend", "us_choropleth", "top_cities_bar", "age_group_chart",
+    "card_type_donut", "channel_fraud_bar", "fraud_type_breakdown", "amount_distribution",
+]
+
+# Below these absolute changes a relative change is timer or allocator noise
+_MIN_MS_CHANGE = 2.0
+_MIN_MB_CHANGE = 1.0
+_MIN_KB_CHANGE = 1.0
+
+
+def _figure_kb(figures) -> float:
+    return sum(len(fig.to_json()) for fig in figures) / 1024
+
+
+class _ChartCapture:
+    """Collects the figures a tab passes to st.plotly_chart, which still renders them."""
+
+    def __init__(self):
+        self.figures = []
+        self._plotly_chart = st.plotly_chart
+
+    def __enter__(self):
+        def plotly_chart(figure, *args, **kwargs):
+            self.figures.append(figure)
+            return self._plotly_chart(figure, *args, **kwargs)
+        st.plotly_chart = plotly_chart
+        return self
+
+    def __exit__(self, *exc):
+        st.plotly_chart = self._plotly_chart
+
+
+def measure(fn, repeat: int, cold_cache: bool = False) -> dict:
+    """Best wall time, peak memory and output figure size of `fn`.
+
+    Figures are counted when `fn` returns one or sends them through
+    st.plotly_chart. With `cold_cache`, Streamlit caches are cleared before
+    every call so repeats pay what a first rerun pays.
+    """
+    def call():
+        if cold_cache:
+            st.cache_data.clear()
+            st.cache_resource.clear()
+        return fn()
+
+    seconds = best_of(call, repeat)
+    with _ChartCapture() as capture:
+        result = []
+        peak = peak_memory(lambda: result.append(call()))
+    figures = capture.figures
+    if isinstance(result[0], go.Figure):
+        figures.append(result[0])
+    return {"ms": seconds * 1000, "peak_mb": peak / 2**20, "json_kb": _figure_kb(figures)}
+
+
+def cases(n_rows: int, repeat: int) -> dict:
+    """Every benchmark case at one dataset size, as {name: measurement}."""
+    results = {}
+    slow = repeat if n_rows < 1_000_000 else 1
+    results["generate_fraud_dataset"] = measure(lambda: generate_fraud_dataset(n_transactions=n_rows), slow)
+
+    df = tiled_dataset(n_rows)
+    results["enrich features"] = measure(
+        lambda: add_burst_features(add_travel_features(add_velocity_features(df.copy()))), slow,
+    )
+    df = add_burst_features(add_travel_features(add_velocity_features(df)))
+
+    results["build bitmap index"] = measure(lambda: BitmapIndex(df), slow)
+    results["build rollup cube"] = measure(lambda: RollupCube(df), slow)
+    index, cube = BitmapIndex(df), RollupCube(df)
+
+    results["filters · scan"] = measure(lambda: apply_filters(df, _SELECTION), repeat)
+    results["filters · index"] = measure(lambda: df.iloc[index.positions(_SELECTION)], repeat)
+    filtered = apply_filters(df, _SELECTION)
+    compute_stats = app.compute_stats.__wrapped__
+    results["compute_stats"] = measure(lambda: compute_stats(filtered), repeat)
+    results["compute_stats · all rows"] = measure(lambda: compute_stats(df), repeat)
+
+    def planner():
+        return QueryPlanner(df, _ALL, index, cube)
+
+    for name in _SOURCE_CHARTS:
+        builder = getattr(charts, name)
+        results[f"chart · {name}"] = measure(lambda: builder(planner()), repeat)
+
+    model = LogisticFraudModel().fit(df)
+    scored, _ = model.score(df)
+    curve = ThresholdCurve(scored["fraud_score"].to_numpy(), scored["is_fraud"].to_numpy(),
+                           scored["amount"].to_numpy()).curve()
+    results["chart · score_distribution"] = measure(lambda: charts.score_distribution(scored), repeat)
+    results["chart · pr_roc_curves"] = measure(lambda: charts.pr_roc_curves(curve), repeat)
+
+    def compare():
+        return ComparisonQuery(df, _SELECTION, _COMPARISON, cube)
+
+    results["chart · rate_delta_bar"] = measure(lambda: charts.rate_delta_bar(compare(), "merchant_category"), repeat)
+    results["chart · comparison_trend"] = measure(lambda: charts.comparison_trend(compare()), repeat)
+    results["chart · rate_overlay"] = measure(lambda: charts.rate_overlay(compare(), "hour"), repeat)
+    results["chart · state_delta_map"] = measure(lambda: charts.state_delta_map(compare()), repeat)
+
+    stats = compute_stats(df)
+    travel_pairs = impossible_travel_pairs(df)
+    tabs = {
+        "render_overview": lambda: render_overview(df, stats, None, planner()),
+        "render_trends": lambda: render_trends(df, stats, "suite", planner()),
+        "render_geography": lambda: render_geography(df, stats, None, travel_pairs, planner()),
+        "render_segments": lambda: render_segments(df, stats, "suite", planner()),
+        "render_transactions": lambda: render_transactions(df, stats),
+        "render_model": lambda: render_model(df, stats, model, "suite"),
+    }
+    for name, render in tabs.items():
+        results[f"tab · {name}"] = measure(render, slow, cold_cache=True)
+    return results
+
+
+def regressions(current: dict, baseline: dict, tolerance: float) -> dict:
+    """{case: [reasons]} for cases worse than the baseline by more than `tolerance`."""
+    limits = {"ms": _MIN_MS_CHANGE, "peak_mb": _MIN_MB_CHANGE, "json_kb": _MIN_KB_CHANGE}
+    flagged = {}
+    for case, now in current.items():
+        before = baseline.get(case)
+        if before is None:
+            continue
+        reasons = [
+            f"{metric} {before[metric]:,.1f} → {now[metric]:,.1f}"
+            for metric, floor in limits.items()
+            if now[metric] > before[metric] * (1 + tolerance) and now[metric] - before[metric] > floor
+        ]
+        if reasons:
+            flagged[case] = reasons
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="timed calls per case (1 for slow cases at 1M+ rows)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown or growth")
+    args = parser.parse_args()
+
+    st_logger.set_log_level("error")
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    flagged = {}
+    for n_rows in args.rows:
+        results = cases(n_rows, args.repeat)
+        previous = baseline.get(str(n_rows), {})
+        found = regressions(results, previous, args.tolerance)
+        print(f"\n{n_rows:,} rows")
+        print(f"  {'case':<36} {'ms':>10} {'peak MB':>9} {'JSON KB':>9}  vs baseline")
+        for case, m in results.items():
+            change = f"{m['ms'] / previous[case]['ms'] - 1:+.0%}" if case in previous else "new"
+            flag = "  REGRESSION: " + "; ".join(found[case]) if case in found else ""
+            print(f"  {case:<36} {m['ms']:>10.1f} {m['peak_mb']:>9.1f} {m['json_kb']:>9.1f}  {change}{flag}")
+        flagged.update({f"{n_rows:,} rows · {case}": reasons for case, reasons in found.items()})
+        if args.save_baseline:
+            baseline[str(n_rows)] = results
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(baseline, indent=1, sort_keys=True))
+        print(f"\nBaseline saved to {args.baseline}")
+    if flagged:
+        print(f"\n{len(flagged)} regression(s) beyond {args.tolerance:.0%}:")
+        for case, reasons in flagged.items():
+            print(f"  {case}: {'; '.join(reasons)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
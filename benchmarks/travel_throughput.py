@@ -0,0 +1,44 @@
+"""Impossible-travel legs: sort by (card, time), then distance/speed of neighbouring rows.
+
+Usage: python -m benchmarks.travel_throughput [--rows 10000000] [--cards 1000000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analytics.travel import MAX_SPEED_KMH, MIN_DISTANCE_KM, is_impossible, travel_legs
+from data.geo import CITY_COORDINATES, STATE_CENTROIDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--travel-rate", type=float, default=0.08,
+                        help="share of transactions away from the card's home location")
+    args = parser.parse_args()
+
+    # Skewed card activity, time-sorted like the store, mostly at a home location
+    rng = np.random.default_rng(0)
+    places = np.array(list(CITY_COORDINATES.values()) + list(STATE_CENTROIDS.values()))
+    activity = rng.lognormal(0.0, 1.2, args.cards)
+    card = rng.choice(args.cards, args.rows, p=activity / activity.sum())
+    epoch = np.sort(rng.integers(0, 365 * 86_400, args.rows))
+    home = rng.integers(0, len(places), args.cards)
+    place = np.where(rng.random(args.rows) < args.travel_rate,
+                     rng.integers(0, len(places), args.rows), home[card])
+    lat, lon = places[place, 0], places[place, 1]
+
+    start = time.perf_counter()
+    legs = travel_legs(card, epoch, lat, lon)
+    flagged = is_impossible(legs["km"], legs["kmh"])
+    elapsed = time.perf_counter() - start
+    print(f"{args.rows:>12,} tx × {args.cards:>10,} cards  {elapsed:7.2f}s  "
+          f"{args.rows / elapsed / 1e6:6.2f} M tx/s")
+    print(f"flagged {int(flagged.sum()):,} legs over {MIN_DISTANCE_KM:,.0f} km "
+          f"at > {MAX_SPEED_KMH:,.0f} km/h ({flagged.mean():.3%} of transactions)")
+
+
+if __name__ == "__main__":
+    main()
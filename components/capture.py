@@ -0,0 +1,167 @@
+import html
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from components.styles import COLORS, PLOTLY_CONFIG
+
+# Streamlit calls a captured page records or answers; any other call runs as usual
+CAPTURED_CALLS = (
+    "markdown", "caption", "info", "warning", "columns", "expander", "plotly_chart", "dataframe",
+    "selectbox", "toggle", "number_input", "slider", "text_input", "button", "download_button",
+)
+
+_GAPS = {"small": "1rem", "medium": "1.5rem", "large": "3rem"}
+_CAPTION = f"font-size:0.78rem;color:{COLORS['text_muted']};margin:0.25rem 0;"
+_NOTICE = "border-radius:8px;padding:0.75rem 1rem;margin:0.5rem 0;font-size:0.85rem;"
+
+
+def _cell(value) -> str:
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and value != value):
+        return ""
+    return html.escape(str(value))
+
+
+def _table(frame: pd.DataFrame, index: bool) -> str:
+    """An HTML table of `frame`; a plain join, several times faster than DataFrame.to_html on wide tables."""
+    if index:
+        frame = frame.reset_index()
+    header = "".join(f"<th>{html.escape(str(column))}</th>" for column in frame.columns)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{_cell(value)}</td>" for value in row) + "</tr>"
+        for row in frame.itertuples(index=False, name=None)
+    )
+    return f'<table class="report-table"><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>'
+
+
+class _Block:
+    """A captured container (the page, a column or an expander): HTML parts and nested blocks in order."""
+
+    def __init__(self, page: "CapturedPage", opening: str = "", closing: str = ""):
+        self.page = page
+        self.opening = opening
+        self.closing = closing
+        self.parts = []
+
+    def __enter__(self):
+        self.page._stack.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.page._stack.pop()
+
+    def html(self) -> str:
+        inner = "".join(part if isinstance(part, str) else part.html() for part in self.parts)
+        return f"{self.opening}{inner}{self.closing}"
+
+
+class CapturedPage:
+    """Static HTML of what render functions emit through the streamlit calls in CAPTURED_CALLS.
+
+    Markdown, captions, columns, expanders, Plotly charts and dataframes are
+    recorded in place, charts without Plotly's JavaScript (the report
+    includes it once). Widgets are not drawn; each answers its default, so
+    the page shows what a session that touched nothing would see.
+    """
+
+    def __init__(self):
+        self.root = _Block(self)
+        self.figures = 0
+        self._stack = [self.root]
+
+    def _emit(self, part):
+        self._stack[-1].parts.append(part)
+
+    def html(self) -> str:
+        return self.root.html()
+
+    # ── Elements
+    def markdown(self, body: str, unsafe_allow_html: bool = False, **_):
+        self._emit(body if unsafe_allow_html else f"<p>{html.escape(body)}</p>")
+
+    def caption(self, body: str, **_):
+        self._emit(f'<div style="{_CAPTION}">{html.escape(body)}</div>')
+
+    def info(self, body: str, **_):
+        self._emit(f'<div style="{_NOTICE}background:{COLORS["accent_blue_light"]};">{html.escape(body)}</div>')
+
+    def warning(self, body: str, **_):
+        self._emit(f'<div style="{_NOTICE}background:{COLORS["warning_amber_light"]};">{html.escape(body)}</div>')
+
+    def columns(self, spec, gap: str = "small", **_) -> list:
+        weights = [1] * spec if isinstance(spec, int) else list(spec)
+        row = _Block(self, f'<div style="display:flex;gap:{_GAPS.get(gap, gap)};">', "</div>")
+        row.parts = [_Block(self, f'<div style="flex:{weight} 1 0;min-width:0;">', "</div>") for weight in weights]
+        self._emit(row)
+        return row.parts
+
+    def expander(self, label: str, expanded: bool = False, **_) -> _Block:
+        block = _Block(self, f'<details{" open" if expanded else ""}><summary>{html.escape(label)}</summary>',
+                       "</details>")
+        self._emit(block)
+        return block
+
+    def plotly_chart(self, figure, use_container_width: bool = True, config: dict = None, **_):
+        self._emit(figure.to_html(
+            full_html=False, include_plotlyjs=False, default_width="100%",
+            config={**(config or PLOTLY_CONFIG), "responsive": True},
+        ))
+        self.figures += 1
+
+    def dataframe(self, data, height: int = None, hide_index: bool = None, **_):
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        table = _table(frame, index=not hide_index)
+        scroll = f"max-height:{height}px;" if height else ""
+        self._emit(f'<div style="{scroll}overflow:auto;margin:0.5rem 0;">{table}</div>')
+
+    # ── Widgets: not drawn, each answers its default
+    def selectbox(self, label: str, options, index: int = 0, **_):
+        options = list(options)
+        return options[index] if options and index is not None else None
+
+    def toggle(self, label: str, value: bool = False, **_) -> bool:
+        return value
+
+    def number_input(self, label: str, min_value=None, max_value=None, value="min", **_):
+        return (min_value if min_value is not None else 0.0) if value == "min" else value
+
+    def slider(self, label: str, min_value=None, max_value=None, value=None, **_):
+        return min_value if value is None else value
+
+    def text_input(self, label: str, value: str = "", **_) -> str:
+        return value
+
+    def button(self, label: str, **_) -> bool:
+        return False
+
+    download_button = button
+
+
+@contextmanager
+def capture_page():
+    """Record the `with` block's streamlit calls into a CapturedPage instead of a script run.
+
+    This swaps functions on the streamlit module for the whole process, so
+    use it only where no app is running, as the headless report renderer does.
+    """
+    page = CapturedPage()
+    originals = {name: getattr(st, name) for name in CAPTURED_CALLS}
+    for name in CAPTURED_CALLS:
+        setattr(st, name, getattr(page, name))
+    try:
+        yield page
+    finally:
+        for name, original in originals.items():
+            setattr(st, name, original)
+
+
+def inline_fragments():
+    """Make `st.fragment` a plain call for modules imported afterwards.
+
+    Outside a script run Streamlit skips fragment bodies altogether, so the
+    tab modules must be imported after this for their fragments to render.
+    """
+    def fragment(func=None, **_):
+        return func if func is not None else (lambda inner: inner)
+    st.fragment = fragment
@@ -1,8 +1,14 @@
+from functools import wraps
+
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from components.styles import COLORS, CHART_COLORSCALE, FRAUD_COLORSCALE, plotly_layout_defaults, DAY_ORDER, DAY_SHORT
+from analytics.sampling import is_sample
+from data.query import ComparisonQuery, QueryPlanner, grouped, source_rows
+from components.profiler import traced
+from components.styles import (
+    COLORS, CHART_COLORSCALE, DELTA_COLORSCALE, FRAUD_COLORSCALE, plotly_layout_defaults, DAY_ORDER, DAY_SHORT,
+)
 
 
 def _apply_layout(fig, title: str = None, height: int = None):
@@ -22,12 +28,64 @@ def _apply_layout(fig, title: str = None, height: int = None):
     return fig
 
 
+def _make_subplots(**kwargs) -> go.Figure:
+    # plotly.subplots takes ~0.1 s to import and only three charts use it
+    from plotly.subplots import make_subplots
+    return make_subplots(**kwargs)
+
+
+# Chart builders take a transaction frame or a data.query.QueryPlanner; the
+# planner answers each grouping by its cheapest access path.
+
+def _groups(source, keys, label: str, fraud_only: bool = False) -> pd.DataFrame:
+    """Per-group total, fraud, fraud_amount, rate and rate_err; reweighted when `source` is a sample."""
+    return grouped(source, keys, label, fraud_only).reset_index()
+
+
+def _per_view(fn):
+    """Decorator sharing the figure a builder makes from a QueryPlanner with every session on the same view.
+
+    Figures are not modified once built, so one object can serve them all;
+    calls with arguments that cannot be hashed are built every time.
+    """
+    @wraps(fn)
+    def wrapper(source, *args, **kwargs):
+        key = ("figure", fn.__name__, args, tuple(sorted(kwargs.items())))
+        if not isinstance(source, QueryPlanner) or source.cache is None:
+            return fn(source, *args, **kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            return fn(source, *args, **kwargs)
+        return source.memo(key, lambda: fn(source, *args, **kwargs))
+    return wrapper
+
+
+def _is_estimate(data: pd.DataFrame) -> bool:
+    return bool((data["rate_err"] > 0).any())
+
+
+def _error_bars(data: pd.DataFrame) -> dict:
+    """95% error bars on a rate trace, only when the numbers are sample estimates."""
+    if not _is_estimate(data):
+        return None
+    return dict(type="data", array=data["rate_err"], color=COLORS["text_secondary"], thickness=1.2, width=4)
+
+
+def _rate_hover(data: pd.DataFrame) -> str:
+    """Hover suffix for the rate's 95% margin, reading it from customdata[1]."""
+    return " ± %{customdata[1]:.2f}%" if _is_estimate(data) else ""
+
+
 # ─── Overview Charts ──────────────────────────────────────────────────────────
 
+@traced
+@_per_view
 def fraud_donut(df: pd.DataFrame) -> go.Figure:
     """Fraud vs Legitimate donut chart."""
-    fraud_count = df["is_fraud"].sum()
-    legit_count = len(df) - fraud_count
+    split = _groups(df, "is_fraud", "fraud_donut").set_index("is_fraud")["total"]
+    fraud_count = split.get(1, 0)
+    legit_count = split.get(0, 0)
 
     fig = go.Figure(go.Pie(
         labels=["Legitimate", "Fraudulent"],
@@ -42,7 +100,7 @@ def fraud_donut(df: pd.DataFrame) -> go.Figure:
         hovertemplate="<b>%{label}</b><br>%{value:,} transactions<br>%{percent}<extra></extra>",
     ))
 
-    fraud_rate = fraud_count / len(df) * 100
+    fraud_rate = fraud_count / (fraud_count + legit_count) * 100
     fig.add_annotation(
         text=f"<b>{fraud_rate:.2f}%</b><br><span style='font-size:11px'>Fraud Rate</span>",
         x=0.5, y=0.5,
@@ -68,13 +126,11 @@ def fraud_donut(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def fraud_by_category_bar(df: pd.DataFrame) -> go.Figure:
     """Horizontal bar chart: fraud count and rate by merchant category."""
-    cat_data = df.groupby("merchant_category").agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-    ).reset_index()
-    cat_data["rate"] = cat_data["fraud"] / cat_data["total"] * 100
+    cat_data = _groups(df, "merchant_category", "fraud_by_category_bar")
     cat_data = cat_data.sort_values("fraud", ascending=True)
 
     fig = go.Figure()
@@ -92,9 +148,9 @@ def fraud_by_category_bar(df: pd.DataFrame) -> go.Figure:
         hovertemplate=(
             "<b>%{y}</b><br>"
             "Fraud Transactions: %{x:,}<br>"
-            "Fraud Rate: %{customdata:.2f}%<extra></extra>"
+            "Fraud Rate: %{customdata[0]:.2f}%" + _rate_hover(cat_data) + "<extra></extra>"
         ),
-        customdata=cat_data["rate"],
+        customdata=cat_data[["rate", "rate_err"]],
     ))
 
     fig = _apply_layout(fig, height=340)
@@ -107,17 +163,14 @@ def fraud_by_category_bar(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def monthly_fraud_trend(df: pd.DataFrame) -> go.Figure:
     """Monthly fraud trend line with volume context."""
-    monthly = df.groupby("month").agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-        fraud_amount=("amount", lambda x: x[df.loc[x.index, "is_fraud"] == 1].sum()),
-    ).reset_index()
-    monthly["rate"] = monthly["fraud"] / monthly["total"] * 100
+    monthly = _groups(df, "month", "monthly_fraud_trend")
     monthly["month_label"] = pd.to_datetime(monthly["month"].astype(str), format="%m").dt.strftime("%b")
 
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig = _make_subplots(specs=[[{"secondary_y": True}]])
 
     fig.add_trace(
         go.Bar(
@@ -174,11 +227,11 @@ def monthly_fraud_trend(df: pd.DataFrame) -> go.Figure:
 
 # ─── Trend Charts ─────────────────────────────────────────────────────────────
 
+@traced
+@_per_view
 def hourly_heatmap(df: pd.DataFrame) -> go.Figure:
     """Heatmap of fraud count by hour and day of week."""
-    heat_data = df[df["is_fraud"] == 1].groupby(
-        ["day_of_week", "hour"]
-    ).size().reset_index(name="count")
+    heat_data = _groups(df, ["day_of_week", "hour"], "hourly_heatmap", fraud_only=True).rename(columns={"fraud": "count"})
 
     pivot = heat_data.pivot_table(
         index="day_of_week", columns="hour", values="count", fill_value=0
@@ -208,13 +261,11 @@ def hourly_heatmap(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def day_of_week_bar(df: pd.DataFrame) -> go.Figure:
     """Fraud rate by day of week."""
-    dow = df.groupby("day_of_week").agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-    ).reindex(DAY_ORDER).reset_index()
-    dow["rate"] = dow["fraud"] / dow["total"] * 100
+    dow = _groups(df, "day_of_week", "day_of_week_bar").set_index("day_of_week").reindex(DAY_ORDER).reset_index()
     dow["day_short"] = DAY_SHORT
 
     max_rate = dow["rate"].max()
@@ -230,8 +281,12 @@ def day_of_week_bar(df: pd.DataFrame) -> go.Figure:
         text=dow["rate"].apply(lambda x: f"{x:.2f}%"),
         textposition="outside",
         textfont=dict(size=11, color=COLORS["text_secondary"]),
-        hovertemplate="<b>%{x}</b><br>Fraud Rate: %{y:.3f}%<br>Fraud Count: %{customdata:,}<extra></extra>",
-        customdata=dow["fraud"],
+        error_y=_error_bars(dow),
+        hovertemplate=(
+            "<b>%{x}</b><br>Fraud Rate: %{y:.3f}%" + _rate_hover(dow)
+            + "<br>Fraud Count: %{customdata[0]:,}<extra></extra>"
+        ),
+        customdata=dow[["fraud", "rate_err"]],
     ))
 
     fig = _apply_layout(fig, height=300)
@@ -240,17 +295,14 @@ def day_of_week_bar(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def quarterly_comparison(df: pd.DataFrame) -> go.Figure:
     """Quarter-over-quarter fraud comparison."""
-    qtr = df.groupby("quarter").agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-        fraud_amount=("amount", lambda x: x[df.loc[x.index, "is_fraud"] == 1].sum()),
-    ).reset_index()
-    qtr["rate"] = qtr["fraud"] / qtr["total"] * 100
+    qtr = _groups(df, "quarter", "quarterly_comparison")
     qtr["quarter_label"] = qtr["quarter"].apply(lambda q: f"Q{q}")
 
-    fig = make_subplots(
+    fig = _make_subplots(
         rows=1, cols=2,
         subplot_titles=["Fraud Count by Quarter", "Fraud Rate by Quarter"],
         horizontal_spacing=0.1,
@@ -278,7 +330,9 @@ def quarterly_comparison(df: pd.DataFrame) -> go.Figure:
             line=dict(color=COLORS["fraud_red"], width=2.5),
             marker=dict(size=9, color=COLORS["fraud_red"],
                         line=dict(color=COLORS["white"], width=2)),
-            hovertemplate="<b>%{x}</b><br>Rate: %{y:.3f}%<extra></extra>",
+            error_y=_error_bars(qtr),
+            hovertemplate="<b>%{x}</b><br>Rate: %{y:.3f}%" + _rate_hover(qtr) + "<extra></extra>",
+            customdata=qtr[["fraud", "rate_err"]],
             showlegend=False,
         ),
         row=1, col=2,
@@ -296,13 +350,11 @@ def quarterly_comparison(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def weekly_trend(df: pd.DataFrame) -> go.Figure:
     """Weekly fraud trend with rolling average."""
-    weekly = df.groupby("week").agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-    ).reset_index()
-    weekly["rate"] = weekly["fraud"] / weekly["total"] * 100
+    weekly = _groups(df, "week", "weekly_trend")
     weekly["rolling_rate"] = weekly["rate"].rolling(4, min_periods=1).mean()
 
     fig = go.Figure()
@@ -313,7 +365,9 @@ def weekly_trend(df: pd.DataFrame) -> go.Figure:
         mode="lines",
         name="Weekly Rate",
         line=dict(color=COLORS["border"], width=1.5),
-        hovertemplate="Week %{x}<br>Rate: %{y:.3f}%<extra></extra>",
+        error_y=_error_bars(weekly),
+        hovertemplate="Week %{x}<br>Rate: %{y:.3f}%" + _rate_hover(weekly) + "<extra></extra>",
+        customdata=weekly[["fraud", "rate_err"]],
     ))
 
     fig.add_trace(go.Scatter(
@@ -334,15 +388,11 @@ def weekly_trend(df: pd.DataFrame) -> go.Figure:
 
 # ─── Geography Charts ─────────────────────────────────────────────────────────
 
-def us_choropleth(df: pd.DataFrame) -> go.Figure:
-    """US choropleth map of fraud rate by state."""
-    state_data = df.groupby("state").agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-        fraud_amount=("amount", lambda x: x[df.loc[x.index, "is_fraud"] == 1].sum()),
-    ).reset_index()
-    state_data["rate"] = state_data["fraud"] / state_data["total"] * 100
-    state_data["state_name"] = df.groupby("state")["state_name"].first().reindex(state_data["state"]).values
+@traced
+@_per_view
+def us_choropleth(df: pd.DataFrame, travel_pairs: pd.DataFrame = None, max_routes: int = 300) -> go.Figure:
+    """US choropleth map of fraud rate by state, optionally with impossible-travel routes on top."""
+    state_data = _groups(df, ["state", "state_name"], "us_choropleth")
 
     fig = go.Figure(go.Choropleth(
         locations=state_data["state"],
@@ -369,6 +419,9 @@ def us_choropleth(df: pd.DataFrame) -> go.Figure:
         marker=dict(line=dict(color=COLORS["white"], width=0.8)),
     ))
 
+    if travel_pairs is not None and len(travel_pairs):
+        _add_travel_layer(fig, travel_pairs.head(max_routes))
+
     fig.update_layout(
         geo=dict(
             scope="usa",
@@ -392,11 +445,53 @@ def us_choropleth(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+def _add_travel_layer(fig: go.Figure, pairs: pd.DataFrame):
+    """Draw each impossible-travel leg as a line plus a marker at the arriving city."""
+    # One line trace for all legs; None breaks the line between legs
+    n = len(pairs)
+    lons = np.column_stack([pairs["from_lon"], pairs["to_lon"], np.full(n, np.nan)]).ravel()
+    lats = np.column_stack([pairs["from_lat"], pairs["to_lat"], np.full(n, np.nan)]).ravel()
+    fig.add_trace(go.Scattergeo(
+        lon=lons,
+        lat=lats,
+        mode="lines",
+        line=dict(width=1.2, color=COLORS["warning_amber"]),
+        opacity=0.7,
+        hoverinfo="skip",
+        showlegend=False,
+    ))
+    fig.add_trace(go.Scattergeo(
+        lon=pairs["to_lon"],
+        lat=pairs["to_lat"],
+        mode="markers",
+        marker=dict(
+            size=6,
+            color=np.where(pairs["is_fraud"] == 1, COLORS["fraud_red"], COLORS["warning_amber"]),
+            line=dict(color=COLORS["white"], width=0.8),
+        ),
+        customdata=list(zip(
+            pairs["card_id"],
+            pairs["from_city"] + ", " + pairs["from_state"],
+            pairs["to_city"] + ", " + pairs["to_state"],
+            pairs["km"],
+            pairs["hours"] * 60,
+            pairs["kmh"],
+        )),
+        hovertemplate=(
+            "<b>%{customdata[0]}</b><br>"
+            "%{customdata[1]} → %{customdata[2]}<br>"
+            "%{customdata[3]:,.0f} km in %{customdata[4]:,.0f} min<br>"
+            "Implied speed: %{customdata[5]:,.0f} km/h<extra></extra>"
+        ),
+        showlegend=False,
+    ))
+
+
+@traced
+@_per_view
 def top_cities_bar(df: pd.DataFrame, n: int = 12) -> go.Figure:
     """Top N cities by fraud count."""
-    city_data = df[df["is_fraud"] == 1].groupby(["city", "state"]).agg(
-        fraud=("is_fraud", "count"),
-    ).reset_index().sort_values("fraud", ascending=True).tail(n)
+    city_data = _groups(df, ["city", "state"], "top_cities_bar", fraud_only=True).sort_values("fraud", ascending=True).tail(n)
     city_data["label"] = city_data["city"] + ", " + city_data["state"]
 
     fig = go.Figure(go.Bar(
@@ -408,7 +503,7 @@ def top_cities_bar(df: pd.DataFrame, n: int = 12) -> go.Figure:
             line=dict(width=0),
             opacity=0.85,
         ),
-        text=city_data["fraud"].apply(lambda x: f"{x:,}"),
+        text=city_data["fraud"].apply(lambda x: f"{x:,.0f}"),
         textposition="outside",
         textfont=dict(size=11, color=COLORS["text_secondary"]),
         hovertemplate="<b>%{y}</b><br>Fraud Count: %{x:,}<extra></extra>",
@@ -423,14 +518,12 @@ def top_cities_bar(df: pd.DataFrame, n: int = 12) -> go.Figure:
 
 # ─── Segment Charts ───────────────────────────────────────────────────────────
 
+@traced
+@_per_view
 def age_group_chart(df: pd.DataFrame) -> go.Figure:
     """Fraud rate and count by age group."""
     age_order = ["18-25", "26-35", "36-45", "46-55", "56-65", "65+"]
-    age_data = df.groupby("age_group").agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-    ).reindex(age_order).reset_index()
-    age_data["rate"] = age_data["fraud"] / age_data["total"] * 100
+    age_data = _groups(df, "age_group", "age_group_chart").set_index("age_group").reindex(age_order).reset_index()
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -438,8 +531,8 @@ def age_group_chart(df: pd.DataFrame) -> go.Figure:
         y=age_data["fraud"],
         name="Fraud Count",
         marker=dict(color=COLORS["chart_2"], line=dict(width=0)),
-        hovertemplate="<b>%{x}</b><br>Fraud Count: %{y:,}<br>Rate: %{customdata:.2f}%<extra></extra>",
-        customdata=age_data["rate"],
+        hovertemplate="<b>%{x}</b><br>Fraud Count: %{y:,}<br>Rate: %{customdata[0]:.2f}%<extra></extra>",
+        customdata=age_data[["rate", "rate_err"]],
     ))
 
     fig.add_trace(go.Scatter(
@@ -450,7 +543,9 @@ def age_group_chart(df: pd.DataFrame) -> go.Figure:
         mode="lines+markers",
         line=dict(color=COLORS["fraud_red"], width=2),
         marker=dict(size=8, color=COLORS["fraud_red"], line=dict(color=COLORS["white"], width=2)),
-        hovertemplate="<b>%{x}</b><br>Rate: %{y:.2f}%<extra></extra>",
+        error_y=_error_bars(age_data),
+        hovertemplate="<b>%{x}</b><br>Rate: %{y:.2f}%" + _rate_hover(age_data) + "<extra></extra>",
+        customdata=age_data[["fraud", "rate_err"]],
     ))
 
     defaults = plotly_layout_defaults()
@@ -471,9 +566,11 @@ def age_group_chart(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def card_type_donut(df: pd.DataFrame) -> go.Figure:
     """Fraud distribution by card type."""
-    card_fraud = df[df["is_fraud"] == 1].groupby("card_type").size().reset_index(name="count")
+    card_fraud = _groups(df, "card_type", "card_type_donut", fraud_only=True).rename(columns={"fraud": "count"})
 
     colors = [COLORS["chart_1"], COLORS["chart_2"], COLORS["chart_3"], COLORS["chart_4"]]
 
@@ -495,13 +592,11 @@ def card_type_donut(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def channel_fraud_bar(df: pd.DataFrame) -> go.Figure:
     """Fraud rate by transaction channel."""
-    ch_data = df.groupby("transaction_channel").agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-    ).reset_index()
-    ch_data["rate"] = ch_data["fraud"] / ch_data["total"] * 100
+    ch_data = _groups(df, "transaction_channel", "channel_fraud_bar")
     ch_data = ch_data.sort_values("rate", ascending=False)
 
     fig = go.Figure(go.Bar(
@@ -514,8 +609,12 @@ def channel_fraud_bar(df: pd.DataFrame) -> go.Figure:
         text=ch_data["rate"].apply(lambda x: f"{x:.2f}%"),
         textposition="outside",
         textfont=dict(size=11),
-        hovertemplate="<b>%{x}</b><br>Rate: %{y:.3f}%<br>Count: %{customdata:,}<extra></extra>",
-        customdata=ch_data["fraud"],
+        error_y=_error_bars(ch_data),
+        hovertemplate=(
+            "<b>%{x}</b><br>Rate: %{y:.3f}%" + _rate_hover(ch_data)
+            + "<br>Count: %{customdata[0]:,}<extra></extra>"
+        ),
+        customdata=ch_data[["fraud", "rate_err"]],
     ))
 
     fig = _apply_layout(fig, height=320)
@@ -524,12 +623,13 @@ def channel_fraud_bar(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def fraud_type_breakdown(df: pd.DataFrame) -> go.Figure:
     """Horizontal bar: fraud count by fraud type."""
-    ft_data = df[df["is_fraud"] == 1].groupby("fraud_type").agg(
-        count=("is_fraud", "count"),
-        avg_amount=("amount", "mean"),
-    ).reset_index().sort_values("count", ascending=True)
+    ft_data = _groups(df, "fraud_type", "fraud_type_breakdown", fraud_only=True).rename(columns={"fraud": "count"})
+    ft_data["avg_amount"] = ft_data["fraud_amount"] / ft_data["count"]
+    ft_data = ft_data.sort_values("count", ascending=True)
 
     fig = go.Figure()
 
@@ -553,30 +653,27 @@ def fraud_type_breakdown(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@traced
+@_per_view
 def amount_distribution(df: pd.DataFrame) -> go.Figure:
     """Overlapping histogram: transaction amount for fraud vs legitimate."""
-    legit = df[df["is_fraud"] == 0]["amount"]
-    fraud = df[df["is_fraud"] == 1]["amount"]
+    rows = source_rows(df)
+    legit = rows[rows["is_fraud"] == 0]
+    fraud = rows[rows["is_fraud"] == 1]
 
     fig = go.Figure()
 
-    fig.add_trace(go.Histogram(
-        x=legit.clip(upper=1000),
-        name="Legitimate",
-        marker=dict(color=COLORS["border"], line=dict(width=0)),
-        opacity=0.7,
-        nbinsx=50,
-        hovertemplate="$%{x:.0f} - %{y:,} transactions<extra>Legitimate</extra>",
-    ))
-
-    fig.add_trace(go.Histogram(
-        x=fraud.clip(upper=1000),
-        name="Fraudulent",
-        marker=dict(color=COLORS["fraud_red"], line=dict(width=0)),
-        opacity=0.7,
-        nbinsx=50,
-        hovertemplate="$%{x:.0f} - %{y:,} transactions<extra>Fraudulent</extra>",
-    ))
+    for part, label, color in [(legit, "Legitimate", COLORS["border"]), (fraud, "Fraudulent", COLORS["fraud_red"])]:
+        fig.add_trace(go.Histogram(
+            x=part["amount"].clip(upper=1000),
+            # A sample counts each row as its weight
+            **(dict(y=part["sample_weight"], histfunc="sum") if is_sample(rows) else {}),
+            name=label,
+            marker=dict(color=color, line=dict(width=0)),
+            opacity=0.7,
+            nbinsx=50,
+            hovertemplate="$%{x:.0f} - %{y:,.0f} transactions<extra>" + label + "</extra>",
+        ))
 
     fig = _apply_layout(fig, height=320)
     fig.update_layout(
@@ -587,3 +684,267 @@ def amount_distribution(df: pd.DataFrame) -> go.Figure:
     fig.update_xaxes(title_text="Transaction Amount (USD, capped at $1,000)", tickprefix="$")
     fig.update_yaxes(title_text="Count")
     return fig
+
+
+# ─── Model Charts ─────────────────────────────────────────────────────────────
+
+@traced
+def score_distribution(df: pd.DataFrame, column: str = "fraud_score") -> go.Figure:
+    """Overlapping histogram of a model score for fraud vs legitimate transactions.
+
+    Each class is normalised to a percentage so the rare fraud class stays visible.
+    """
+    fig = go.Figure()
+
+    for label, flag, color in [("Legitimate", 0, COLORS["chart_4"]), ("Fraudulent", 1, COLORS["fraud_red"])]:
+        rows = df[df["is_fraud"] == flag]
+        fig.add_trace(go.Histogram(
+            x=rows[column],
+            **(dict(y=rows["sample_weight"], histfunc="sum") if is_sample(df) else {}),
+            name=label,
+            histnorm="percent",
+            marker=dict(color=color, line=dict(width=0)),
+            opacity=0.7,
+            xbins=dict(start=0, end=float(df[column].max()) * 1.02, size=float(df[column].max()) / 60),
+            hovertemplate="Score %{x:.3f}<br>%{y:.2f}% of " + label.lower() + "<extra></extra>",
+        ))
+
+    fig = _apply_layout(fig, height=340)
+    fig.update_layout(
+        barmode="overlay",
+        margin=dict(l=0, r=0, t=10, b=0),
+        legend=dict(orientation="h", y=1.05, font=dict(size=11)),
+    )
+    fig.update_xaxes(title_text="Fraud Score")
+    fig.update_yaxes(title_text="Share of Class (%)", ticksuffix="%")
+    return fig
+
+
+@traced
+def pr_roc_curves(points: pd.DataFrame, current: dict = None) -> go.Figure:
+    """Side-by-side precision/recall and ROC curves, with the current threshold marked."""
+    fig = _make_subplots(
+        rows=1, cols=2,
+        subplot_titles=["Precision vs Recall", "ROC (Recall vs False-Positive Rate)"],
+        horizontal_spacing=0.1,
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=points["recall"], y=points["precision"],
+            mode="lines",
+            line=dict(color=COLORS["chart_1"], width=2.5),
+            customdata=points["threshold"],
+            hovertemplate="Recall %{x:.1%}<br>Precision %{y:.1%}<br>Threshold %{customdata:.4f}<extra></extra>",
+            showlegend=False,
+        ),
+        row=1, col=1,
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=points["fpr"], y=points["recall"],
+            mode="lines",
+            line=dict(color=COLORS["chart_1"], width=2.5),
+            customdata=points["threshold"],
+            hovertemplate="FPR %{x:.1%}<br>Recall %{y:.1%}<br>Threshold %{customdata:.4f}<extra></extra>",
+            showlegend=False,
+        ),
+        row=1, col=2,
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=[0, 1], y=[0, 1],
+            mode="lines",
+            line=dict(color=COLORS["border"], width=1, dash="dot"),
+            hoverinfo="skip",
+            showlegend=False,
+        ),
+        row=1, col=2,
+    )
+
+    if current is not None:
+        marker = dict(size=11, color=COLORS["fraud_red"], line=dict(color=COLORS["white"], width=2))
+        fig.add_trace(
+            go.Scatter(x=[current["recall"]], y=[current["precision"]], mode="markers",
+                       marker=marker, hoverinfo="skip", showlegend=False),
+            row=1, col=1,
+        )
+        fig.add_trace(
+            go.Scatter(x=[current["fpr"]], y=[current["recall"]], mode="markers",
+                       marker=marker, hoverinfo="skip", showlegend=False),
+            row=1, col=2,
+        )
+
+    defaults = plotly_layout_defaults()
+    fig.update_layout(**defaults)
+    fig.update_layout(height=340, margin=dict(l=0, r=0, t=30, b=0))
+    fig.update_annotations(font=dict(size=12, color=COLORS["text_secondary"]))
+    fig.update_xaxes(tickformat=".0%", range=[0, 1])
+    fig.update_yaxes(tickformat=".0%", range=[0, 1.02])
+    return fig
+
+
+# ─── Comparison Charts ────────────────────────────────────────────────────────
+# Built from a data.query.ComparisonQuery; both selections come from one pass.
+
+_SIDE_LINES = {
+    "baseline": dict(color=COLORS["chart_4"], width=2, dash="dot"),
+    "comparison": dict(color=COLORS["accent_blue"], width=2.5),
+}
+
+
+def _delta_colors(deltas: pd.Series) -> list:
+    return [COLORS["fraud_red"] if d > 0 else COLORS["safe_green"] for d in deltas]
+
+
+@traced
+def rate_delta_bar(compare: ComparisonQuery, column: str, height: int = 320) -> go.Figure:
+    """Horizontal bars of comparison minus baseline fraud rate per `column` value.
+
+    Values only one selection reaches have no delta and are left out.
+    """
+    data = compare.deltas(column, f"rate_delta_bar:{column}").reset_index()
+    data = data.dropna(subset=["rate_delta"]).sort_values("rate_delta")
+
+    fig = go.Figure(go.Bar(
+        y=data[column].astype(str),
+        x=data["rate_delta"],
+        orientation="h",
+        marker=dict(color=_delta_colors(data["rate_delta"]), line=dict(width=0), opacity=0.85),
+        customdata=data[["rate_baseline", "rate_comparison", "fraud_baseline", "fraud_comparison"]],
+        hovertemplate=(
+            "<b>%{y}</b><br>"
+            "Δ Fraud Rate: %{x:+.2f} pts<br>"
+            "Baseline: %{customdata[0]:.2f}% (%{customdata[2]:,.0f} fraud)<br>"
+            "Comparison: %{customdata[1]:.2f}% (%{customdata[3]:,.0f} fraud)<extra></extra>"
+        ),
+    ))
+
+    fig = _apply_layout(fig, height=height)
+    fig.update_layout(showlegend=False, margin=dict(l=0, r=0, t=10, b=0))
+    fig.update_xaxes(title_text="Δ Fraud Rate (pts)", ticksuffix=" pts", zeroline=True,
+                     zerolinecolor=COLORS["text_muted"])
+    fig.update_yaxes(title_text=None)
+    return fig
+
+
+@traced
+def comparison_trend(compare: ComparisonQuery) -> go.Figure:
+    """Weekly fraud rate of both selections overlaid, aligned on week since each selection's start."""
+    fig = go.Figure()
+    for side, weekly in compare.aligned_weeks("comparison_trend").items():
+        fig.add_trace(go.Scatter(
+            x=weekly.index,
+            y=weekly["rate"],
+            mode="lines",
+            name=f"{side.title()}: {compare.labels[side]}",
+            line=_SIDE_LINES[side],
+            customdata=weekly[["fraud", "total"]],
+            hovertemplate="Week %{x}<br>Rate: %{y:.3f}%<br>%{customdata[0]:,} of %{customdata[1]:,} tx<extra></extra>",
+        ))
+
+    fig = _apply_layout(fig, height=300)
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=10, b=0),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0, font=dict(size=11)),
+    )
+    fig.update_yaxes(title_text="Fraud Rate (%)", ticksuffix="%")
+    fig.update_xaxes(title_text="Week of Selection")
+    return fig
+
+
+@traced
+def rate_overlay(compare: ComparisonQuery, column: str, title: str = None) -> go.Figure:
+    """Fraud rate per `column` value for both selections, as overlaid lines."""
+    fig = go.Figure()
+    for side, data in compare.groups(column, label=f"rate_overlay:{column}").items():
+        fig.add_trace(go.Scatter(
+            x=data.index,
+            y=data["rate"],
+            mode="lines+markers",
+            name=side.title(),
+            line=_SIDE_LINES[side],
+            marker=dict(size=5, color=_SIDE_LINES[side]["color"]),
+            hovertemplate="%{x}<br>" + side.title() + ": %{y:.2f}%<extra></extra>",
+        ))
+
+    fig = _apply_layout(fig, height=300)
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=10, b=0),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0, font=dict(size=11)),
+    )
+    fig.update_yaxes(title_text="Fraud Rate (%)", ticksuffix="%")
+    fig.update_xaxes(title_text=title)
+    return fig
+
+
+@traced
+def state_delta_map(compare: ComparisonQuery) -> go.Figure:
+    """US choropleth of comparison minus baseline fraud rate by state.
+
+    States with transactions in only one selection have no delta and are greyed out.
+    """
+    deltas = compare.deltas(["state", "state_name"], "state_delta_map").reset_index()
+    one_sided = deltas["rate_delta"].isna()
+    data = deltas[~one_sided]
+    limit = float(np.abs(data["rate_delta"].to_numpy()).max(initial=0.01))
+
+    fig = go.Figure()
+    if one_sided.any():
+        missing = deltas[one_sided]
+        fig.add_trace(go.Choropleth(
+            locations=missing["state"],
+            z=np.zeros(len(missing)),
+            locationmode="USA-states",
+            colorscale=[[0, COLORS["border"]], [1, COLORS["border"]]],
+            showscale=False,
+            customdata=np.column_stack([
+                missing["state_name"],
+                np.where(missing["total_baseline"] > 0, "comparison", "baseline"),
+            ]),
+            hovertemplate="<b>%{customdata[0]}</b><br>No transactions in the %{customdata[1]}<extra></extra>",
+            marker=dict(line=dict(color=COLORS["white"], width=0.8)),
+        ))
+    fig.add_trace(go.Choropleth(
+        locations=data["state"],
+        z=data["rate_delta"],
+        zmin=-limit,
+        zmax=limit,
+        locationmode="USA-states",
+        colorscale=DELTA_COLORSCALE,
+        colorbar=dict(
+            title=dict(text="Δ Rate (pts)", font=dict(size=11)),
+            thickness=14,
+            tickfont=dict(size=10),
+        ),
+        customdata=data[["state_name", "rate_baseline", "rate_comparison"]],
+        hovertemplate=(
+            "<b>%{customdata[0]}</b><br>"
+            "Δ Fraud Rate: %{z:+.2f} pts<br>"
+            "Baseline: %{customdata[1]:.2f}%<br>"
+            "Comparison: %{customdata[2]:.2f}%<extra></extra>"
+        ),
+        marker=dict(line=dict(color=COLORS["white"], width=0.8)),
+    ))
+
+    fig.update_layout(
+        geo=dict(
+            scope="usa",
+            showlakes=False,
+            showland=True,
+            landcolor=COLORS["surface"],
+            bgcolor="rgba(0,0,0,0)",
+            showframe=False,
+            coastlinecolor=COLORS["border"],
+        ),
+        paper_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=400,
+        font=dict(family="Inter, sans-serif", color=COLORS["text_primary"]),
+        hoverlabel=dict(
+            bgcolor=COLORS["white"],
+            bordercolor=COLORS["border"],
+            font=dict(color=COLORS["text_primary"], size=12),
+        ),
+    )
+    return fig
@@ -114,6 +114,50 @@ def render_mini_kpi_row(items: list):
             )
 
 
+def render_amount_kpis(stats: dict):
+    """Render the amount percentile and distinct-count pills from the sketch summary."""
+    render_mini_kpi_row([
+        {"label": "Median Amount", "value": f"${stats['amount_p50']:,.2f}"},
+        {"label": "p95 Amount", "value": f"${stats['amount_p95']:,.0f}"},
+        {"label": "p99 Fraud Amount", "value": f"${stats['fraud_amount_p99']:,.0f}", "color": COLORS["fraud_red"]},
+        {"label": "Distinct Cards", "value": f"≈{stats['distinct_cards']:,}"},
+        {"label": "Distinct Cities", "value": f"≈{stats['distinct_cities']:,}"},
+    ])
+
+
+def _delta_text(change: float, relative: float, unit: str = "") -> str:
+    arrow = "↑" if change > 0 else "↓" if change < 0 else "→"
+    return f"{arrow} {abs(change):,.2f}{unit}" if unit else f"{arrow} {abs(relative):.1%} vs baseline"
+
+
+def render_comparison_kpis(stats: dict, labels: dict):
+    """Render the comparison selection's KPIs with deltas against the baseline."""
+    base, comp = stats["baseline"], stats["comparison"]
+    items = [
+        ("Total Transactions", "total_transactions", "{:,.0f}", COLORS["text_primary"], None),
+        ("Fraud Rate", "fraud_rate", "{:.2f}%", COLORS["fraud_red"], " pts"),
+        ("Total Fraud Amount", "fraud_amount", "${:,.0f}", COLORS["warning_amber"], None),
+        ("Avg Fraud Transaction", "avg_fraud_amount", "${:,.0f}", COLORS["chart_2"], None),
+    ]
+    cols = st.columns(len(items), gap="small")
+    for col, (label, key, fmt, color, unit) in zip(cols, items):
+        change = comp[key] - base[key]
+        relative = change / base[key] if base[key] else 0.0
+        # More transactions is neutral; more fraud is bad
+        rising_is_bad = key != "total_transactions"
+        with col:
+            render_kpi_card(
+                label=label,
+                value=fmt.format(comp[key]),
+                delta=_delta_text(change, relative, unit),
+                delta_positive=None if not rising_is_bad or change == 0 else change < 0,
+                sub=f"Baseline {fmt.format(base[key])} · {labels['baseline']}",
+                accent_color=color,
+            )
+
+    st.markdown("<div style='margin-top:0.25rem'></div>", unsafe_allow_html=True)
+
+
 def render_page_header(title: str, subtitle: str):
     """Render a consistent tab page title and subtitle."""
     st.markdown(
@@ -149,3 +193,18 @@ def render_insight_box(label: str, items: list):
         f'{bullets}</div>',
         unsafe_allow_html=True,
     )
+
+
+def render_live_kpi_row(windows: dict, clock_label: str):
+    """Render the sliding-window KPI row fed by the live stream."""
+    cols = st.columns(len(windows), gap="small")
+    for col, (label, kpi) in zip(cols, windows.items()):
+        with col:
+            render_kpi_card(
+                label=f"{label} · Fraud Rate",
+                value=f"{kpi['fraud_rate']:.2f}%",
+                delta=f"{kpi['fraud']:,} of {kpi['total']:,} transactions",
+                delta_positive=False if kpi["fraud"] else None,
+                sub=f"${kpi['fraud_amount']:,.0f} fraud of ${kpi['amount']:,.0f} · as of {clock_label}",
+                accent_color=COLORS["accent_blue"],
+            )
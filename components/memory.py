@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import streamlit as st
+from streamlit.runtime.caching import get_data_cache_stats_provider
+
+from components.kpi_cards import render_mini_kpi_row
+from components.styles import COLORS, plotly_layout_defaults
+
+# NumPy, pandas and Plotly load on first use: app.py starts tracing from this
+# module before its first element is drawn, and accounting is opt-in
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
+
+logger = logging.getLogger(__name__)
+
+# Setting this starts tracemalloc when app.py loads; accounting runs only while it
+# traces. Its value is the stack depth kept per allocation: 1 is cheapest, while
+# leak sites need enough frames to reach app code beneath pandas/numpy internals.
+TRACE_MEMORY_ENV = "DASHBOARD_TRACE_MEMORY"
+_APP_ROOT = str(Path(__file__).resolve().parent.parent)
+
+# Rerun stages (span names, or span name prefixes ending in " · ") per memory category
+CATEGORIES = {
+    "Dataset": ("load data", "enrich features"),
+    "Filtered Selections": ("filter rows", "explorer · filter"),
+    "Formatted Tables": ("explorer · table", "explorer · csv", "st.dataframe"),
+    "Figures": ("chart · ", "st.plotly_chart"),
+}
+
+# A leak warning needs this many reruns in a row on one unchanged view, each
+# retaining more than the last, and at least LEAK_MIN_BYTES growth overall
+LEAK_RERUNS = 4
+LEAK_MIN_BYTES = 1 << 20
+# Allocation sites reported with a leak warning, and the smallest site tracked
+LEAK_SITES = 5
+_MIN_SITE_BYTES = 16 << 10
+
+# Cache size samples kept for the over-time chart
+CACHE_HISTORY = 500
+
+
+def start_tracing():
+    """Start tracemalloc when DASHBOARD_TRACE_MEMORY is set; call before the dataset loads."""
+    frames = os.environ.get(TRACE_MEMORY_ENV)
+    if frames and not tracemalloc.is_tracing():
+        tracemalloc.start(max(int(frames), 1))
+
+
+def deep_size(obj, seen: set = None) -> int:
+    """Approximate bytes held by `obj`: frames and arrays by buffer size, objects by their own int `nbytes`
+    when they keep one, containers and other objects recursively."""
+    import numpy as np
+    import pandas as pd
+
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes if obj.base is None else 0
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+    if isinstance(getattr(obj, "nbytes", None), int):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return sys.getsizeof(obj) + sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return sys.getsizeof(obj) + deep_size(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+def cache_sizes(resources: dict) -> dict:
+    """Bytes per cache: `resources` ({name: cached object}) sized in place, st.cache_data entries as stored."""
+    sizes = {name: deep_size(obj) for name, obj in resources.items()}
+    for stats in get_data_cache_stats_provider().get_stats().values():
+        for stat in stats:
+            name = f"data · {stat.cache_name.rsplit('.', 1)[-1]}"
+            sizes[name] = sizes.get(name, 0) + stat.byte_length
+    return sizes
+
+
+def stage_bytes(spans: list) -> dict:
+    """Bytes still held at the end of each categorised stage, summed per category."""
+    totals = dict.fromkeys(CATEGORIES, 0)
+    for s in spans:
+        if s.get("net_bytes") is None:
+            continue
+        for category, stages in CATEGORIES.items():
+            if any(s["name"] == stage or (stage.endswith(" · ") and s["name"].startswith(stage)) for stage in stages):
+                totals[category] += max(s["net_bytes"], 0)
+                break
+    return totals
+
+
+def _allocation_sites() -> dict:
+    """{file:line: bytes} per allocation site of app code, attributing library allocations to their caller."""
+    sites = {}
+    for stat in tracemalloc.take_snapshot().statistics("traceback"):
+        frame = next((f for f in reversed(stat.traceback) if f.filename.startswith(_APP_ROOT)), stat.traceback[-1])
+        site = f"{os.path.relpath(frame.filename, _APP_ROOT)}:{frame.lineno}"
+        sites[site] = sites.get(site, 0) + stat.size
+    return {site: size for site, size in sites.items() if size >= _MIN_SITE_BYTES}
+
+
+def _growing(values: list) -> bool:
+    return all(b > a for a, b in zip(values, values[1:])) and values[-1] - values[0] >= LEAK_MIN_BYTES
+
+
+class MemoryLedger:
+    """Process-wide cache sizes over time and per-session leak checks, fed once per rerun."""
+
+    def __init__(self, history: int = CACHE_HISTORY):
+        self._lock = threading.Lock()
+        self.cache_history = deque(maxlen=history)
+
+    def account(self, profile, resources: dict, view: str) -> dict:
+        """Memory report for a finished rerun, after its locals are gone.
+
+        Categories come from the bytes each rerun stage still held when it
+        ended; caches are sized directly. Growth is checked against this
+        session's earlier reruns on the same `view` (data version and
+        filters): a steady view should retain the same memory every rerun.
+        """
+        gc.collect()
+        sizes = cache_sizes(resources)
+        traced, peak = tracemalloc.get_traced_memory()
+        session_bytes = deep_size({k: v for k, v in st.session_state.items() if k != "memory_history"})
+        with self._lock:
+            self.cache_history.append({"ts": time.time(), **sizes})
+
+        history = st.session_state.get("memory_history", [])
+        history = [h for h in history if h["view"] == view][-(LEAK_RERUNS - 1):]
+        history.append({"view": view, "traced": traced, "session": session_bytes, "sites": _allocation_sites()})
+        st.session_state["memory_history"] = history
+
+        warnings = []
+        if len(history) == LEAK_RERUNS:
+            if _growing([h["traced"] for h in history]):
+                first, last = history[0]["sites"], history[-1]["sites"]
+                growth = sorted(((last[k] - first.get(k, 0), k) for k in last), reverse=True)[:LEAK_SITES]
+                warnings.append({
+                    "kind": "process",
+                    "growth": history[-1]["traced"] - history[0]["traced"],
+                    "sites": [(site, grew) for grew, site in growth if grew > 0],
+                })
+            if _growing([h["session"] for h in history]):
+                warnings.append({"kind": "session", "growth": history[-1]["session"] - history[0]["session"], "sites": []})
+        for warning in warnings:
+            logger.warning("memory grew %.1f MB (%s) over %d reruns of view %s; top sites: %s",
+                           warning["growth"] / 2**20, warning["kind"], LEAK_RERUNS, view, warning["sites"])
+
+        return {
+            "categories": stage_bytes(profile.spans),
+            "caches": sizes,
+            "session_bytes": session_bytes,
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "warnings": warnings,
+        }
+
+    def cache_frame(self) -> pd.DataFrame:
+        """Cache sizes (MB) per rerun, one column per cache."""
+        import pandas as pd
+
+        with self._lock:
+            rows = list(self.cache_history)
+        frame = pd.DataFrame(rows)
+        if frame.empty:
+            return frame
+        frame["ts"] = pd.to_datetime(frame["ts"], unit="s")
+        return frame.set_index("ts") / 2**20
+
+
+# ── Memory Panel
+def _cache_trend(frame: pd.DataFrame) -> go.Figure:
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for column in frame.columns:
+        fig.add_trace(go.Scatter(x=frame.index, y=frame[column], mode="lines", name=column))
+    fig.update_layout(**plotly_layout_defaults())
+    fig.update_layout(height=280, yaxis_title="MB")
+    return fig
+
+
+def render_memory_panel(report: dict, ledger: MemoryLedger):
+    """Memory attribution of the previous rerun, cache sizes over time and leak warnings."""
+    import numpy as np
+    import pandas as pd
+
+    with st.expander("Memory · previous rerun", expanded=True):
+        if report is None:
+            st.info(f"Set {TRACE_MEMORY_ENV}=1 before starting the app to account memory per rerun.")
+            return
+        for warning in report["warnings"]:
+            who = "This session's state" if warning["kind"] == "session" else "Process memory"
+            sites = "; ".join(f"{site} +{grew / 2**20:.1f} MB" for site, grew in warning["sites"])
+            st.warning(
+                f"{who} grew {warning['growth'] / 2**20:,.1f} MB over the last {LEAK_RERUNS} reruns "
+                f"with unchanged filters." + (f" Largest growth: {sites}" if sites else "")
+            )
+        render_mini_kpi_row(
+            [{"label": name, "value": f"{size / 2**20:,.1f} MB"} for name, size in report["categories"].items()]
+            + [{"label": "Session State", "value": f"{report['session_bytes'] / 2**20:,.2f} MB"},
+               {"label": "Traced Total", "value": f"{report['traced_bytes'] / 2**20:,.0f} MB",
+                "color": COLORS["chart_1"]}]
+        )
+        caches = pd.DataFrame({"cache": list(report["caches"]), "mb": np.array(list(report["caches"].values())) / 2**20})
+        st.dataframe(
+            caches.sort_values("mb", ascending=False).round({"mb": 2}),
+            use_container_width=True,
+            hide_index=True,
+            column_config={"cache": "Cache", "mb": st.column_config.NumberColumn("Size (MB)", format="%.2f")},
+        )
+        trend = ledger.cache_frame()
+        if len(trend) > 1:
+            st.plotly_chart(_cache_trend(trend), use_container_width=True, key="memory_cache_trend")
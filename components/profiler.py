@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from components.kpi_cards import render_mini_kpi_row
+from components.styles import COLORS
+
+# NumPy and pandas load on first use: app.py wraps every rerun in this module
+# before its first element is drawn
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Export settings, read once per process: a directory for rerun JSON lines and
+# the Prometheus text file, and a port serving the same text at /metrics
+PROFILE_DIR_ENV = "DASHBOARD_PROFILE_DIR"
+METRICS_PORT_ENV = "DASHBOARD_METRICS_PORT"
+
+# Recent durations kept per rerun and per span name for the latency quantiles
+HISTORY = 1_000
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Streamlit calls timed as their own spans
+ELEMENT_CALLS = ("plotly_chart", "dataframe")
+
+_current = contextvars.ContextVar("rerun_profile", default=None)
+
+
+# ── Spans
+class RerunProfile:
+    """Timing spans of one rerun, nested in the order they open and close."""
+
+    def __init__(self, session: str = None):
+        self.session = session
+        self.started_at = time.time()
+        self.total_ms = None
+        self.spans = []
+        self.notes = {}
+        self.memory = None
+        self._start = time.perf_counter()
+        self._open = []
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    @contextmanager
+    def span(self, name: str):
+        """Time a block; while tracemalloc traces, also record the bytes it still holds on exit."""
+        tracing = tracemalloc.is_tracing()
+        entry = {
+            "name": name,
+            "depth": len(self._open),
+            "parent": self._open[-1] if self._open else None,
+            "start_ms": self._now_ms(),
+            "ms": None,
+            "net_bytes": None,
+        }
+        self.spans.append(entry)
+        self._open.append(len(self.spans) - 1)
+        before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        try:
+            yield entry
+        finally:
+            entry["ms"] = self._now_ms() - entry["start_ms"]
+            if tracing:
+                entry["net_bytes"] = tracemalloc.get_traced_memory()[0] - before
+            self._open.pop()
+
+    def finish(self):
+        self.total_ms = self._now_ms()
+
+    def record(self) -> dict:
+        """One JSON-lines record: the rerun, its spans and, when accounted, its memory."""
+        record = {
+            "ts": self.started_at,
+            "session": self.session,
+            "total_ms": round(self.total_ms, 3),
+            "spans": [{**s, "start_ms": round(s["start_ms"], 3), "ms": round(s["ms"] or 0.0, 3)} for s in self.spans],
+        }
+        if self.memory is not None:
+            record["memory"] = {**self.memory, "warnings": [w["kind"] for w in self.memory["warnings"]]}
+        return record
+
+    def tree(self) -> pd.DataFrame:
+        """Spans in call order with indented names, own time (minus children) and percent share of the rerun."""
+        import pandas as pd
+
+        if not self.spans:
+            return pd.DataFrame(columns=["span", "ms", "self_ms", "share"])
+        table = pd.DataFrame(self.spans)
+        table["ms"] = table["ms"].fillna(0.0)
+        child_ms = table.dropna(subset=["parent"]).groupby("parent")["ms"].sum()
+        table["self_ms"] = table["ms"] - child_ms.reindex(table.index, fill_value=0.0)
+        table["share"] = 100 * table["ms"] / self.total_ms if self.total_ms else 0.0
+        table["span"] = [" " * depth + name for depth, name in zip(table["depth"], table["name"])]
+        if table["net_bytes"].notna().any():
+            table["net_mb"] = table["net_bytes"] / 2**20
+            return table[["span", "ms", "self_ms", "share", "net_mb"]]
+        return table[["span", "ms", "self_ms", "share"]]
+
+
+@contextmanager
+def span(name: str):
+    """Time a block as a span of the current rerun; does nothing outside a profiled rerun."""
+    profile = _current.get()
+    if profile is None:
+        yield None
+        return
+    with profile.span(name) as entry:
+        yield entry
+
+
+def note(**values):
+    """Attach values to the current rerun's profile (e.g. what memory accounting needs)."""
+    profile = _current.get()
+    if profile is not None:
+        profile.notes.update(values)
+
+
+def traced(fn):
+    """Decorator timing every call of a chart builder as a `chart · <name>` span."""
+    name = f"chart · {fn.__name__}"
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return fn(*args, **kwargs)
+        with span(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def _element_call(name: str, original):
+    @wraps(original)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return original(*args, **kwargs)
+        with span(f"st.{name}"):
+            return original(*args, **kwargs)
+    wrapper._profiled = True
+    return wrapper
+
+
+def _instrument_elements():
+    """Wrap ELEMENT_CALLS on the streamlit module once; unprofiled threads pass straight through."""
+    for name in ELEMENT_CALLS:
+        original = getattr(st, name)
+        if not getattr(original, "_profiled", False):
+            setattr(st, name, _element_call(name, original))
+
+
+# ── Aggregation and Export
+class RerunMetrics:
+    """Recent rerun and span durations across sessions, exported as JSON lines and Prometheus text.
+
+    With `export_dir`, every rerun appends a line to reruns.jsonl and
+    rewrites metrics.prom (atomically, for a textfile collector to scrape).
+    """
+
+    def __init__(self, export_dir: str = None, history: int = HISTORY):
+        self.export_dir = Path(export_dir) if export_dir else None
+        self._lock = threading.Lock()
+        self._reruns = deque(maxlen=history)
+        self._spans = {}
+        self._history = history
+        self.count = 0
+        self.total_seconds = 0.0
+        self._memory = None
+        if self.export_dir is not None:
+            self.export_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "RerunMetrics":
+        """Metrics exporting to $DASHBOARD_PROFILE_DIR and serving $DASHBOARD_METRICS_PORT, when set."""
+        metrics = cls(os.environ.get(PROFILE_DIR_ENV))
+        port = os.environ.get(METRICS_PORT_ENV)
+        if port:
+            serve_metrics(metrics, int(port))
+        return metrics
+
+    def add(self, profile: RerunProfile):
+        with self._lock:
+            self._reruns.append(profile.total_ms)
+            self.count += 1
+            self.total_seconds += profile.total_ms / 1000
+            if profile.memory is not None:
+                self._memory = profile.memory
+            for s in profile.spans:
+                self._spans.setdefault(s["name"], deque(maxlen=self._history)).append(s["ms"] or 0.0)
+            if self.export_dir is not None:
+                with open(self.export_dir / "reruns.jsonl", "a") as f:
+                    f.write(json.dumps(profile.record()) + "\n")
+                target = self.export_dir / "metrics.prom"
+                scratch = target.with_suffix(".prom.tmp")
+                scratch.write_text(self._prometheus())
+                os.replace(scratch, target)
+
+    def quantiles(self) -> dict:
+        """Rerun latency quantiles (ms) over the recent history."""
+        import numpy as np
+
+        with self._lock:
+            values = np.array(self._reruns)
+        if len(values) == 0:
+            return {}
+        return {q: float(np.quantile(values, q)) for q in QUANTILES}
+
+    def _prometheus(self) -> str:
+        import numpy as np
+
+        lines = [
+            "# HELP dashboard_rerun_seconds Wall time of a full dashboard rerun.",
+            "# TYPE dashboard_rerun_seconds summary",
+        ]
+        reruns = np.array(self._reruns) / 1000
+        if len(reruns):
+            lines += [f'dashboard_rerun_seconds{{quantile="{q}"}} {np.quantile(reruns, q):.6f}' for q in QUANTILES]
+        lines += [f"dashboard_rerun_seconds_sum {self.total_seconds:.6f}", f"dashboard_rerun_seconds_count {self.count}"]
+        lines += [
+            "# HELP dashboard_span_seconds Wall time of one instrumented span within a rerun.",
+            "# TYPE dashboard_span_seconds summary",
+        ]
+        for name, durations in sorted(self._spans.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            values = np.array(durations) / 1000
+            lines += [f'dashboard_span_seconds{{span="{label}",quantile="{q}"}} {np.quantile(values, q):.6f}'
+                      for q in QUANTILES]
+            lines.append(f'dashboard_span_seconds_count{{span="{label}"}} {len(values)}')
+        if self._memory is not None:
+            lines += [
+                "# HELP dashboard_memory_bytes Bytes held at the end of the latest accounted rerun, by category.",
+                "# TYPE dashboard_memory_bytes gauge",
+            ]
+            lines += [f'dashboard_memory_bytes{{category="{name}"}} {size}'
+                      for name, size in self._memory["categories"].items()]
+            lines += [
+                f'dashboard_memory_bytes{{category="session state"}} {self._memory["session_bytes"]}',
+                f'dashboard_memory_bytes{{category="traced total"}} {self._memory["traced_bytes"]}',
+                "# HELP dashboard_cache_bytes Size of each dashboard cache.",
+                "# TYPE dashboard_cache_bytes gauge",
+            ]
+            lines += [f'dashboard_cache_bytes{{cache="{name}"}} {size}' for name, size in self._memory["caches"].items()]
+        return "\n".join(lines) + "\n"
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of the rerun and span summaries."""
+        with self._lock:
+            return self._prometheus()
+
+
+def serve_metrics(metrics: RerunMetrics, port: int) -> ThreadingHTTPServer:
+    """Serve `metrics` as Prometheus text at http://0.0.0.0:<port>/metrics from a daemon thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-endpoint").start()
+    return server
+
+
+@contextmanager
+def profiled_rerun(metrics: RerunMetrics, ledger=None):
+    """Profile one script run: spans opened inside it land in a RerunProfile recorded on exit.
+
+    The finished profile is kept in session state as `last_profile` for the
+    debug panel of the next rerun. With a components.memory.MemoryLedger
+    and tracemalloc tracing, the rerun's memory is accounted once its locals
+    are released, from the `resources` and `view` the script noted.
+    """
+    _instrument_elements()
+    ctx = get_script_run_ctx()
+    profile = RerunProfile(ctx.session_id if ctx is not None else None)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        profile.finish()
+        resources = profile.notes.pop("resources", None)
+        if ledger is not None and tracemalloc.is_tracing() and resources is not None:
+            profile.memory = ledger.account(profile, resources, profile.notes["view"])
+        metrics.add(profile)
+        st.session_state["last_profile"] = profile
+
+
+# ── Debug Panel
+def render_profiler_panel(previous: RerunProfile, metrics: RerunMetrics):
+    """Span tree of the previous rerun and recent rerun latency percentiles."""
+    with st.expander("Profiler · previous rerun", expanded=True):
+        if previous is None:
+            st.info("Timings appear from the second rerun on.")
+            return
+        quantiles = metrics.quantiles()
+        render_mini_kpi_row([
+            {"label": "Previous Rerun", "value": f"{previous.total_ms:,.0f} ms", "color": COLORS["chart_1"]},
+            {"label": "p50 Rerun", "value": f"{quantiles.get(0.5, 0):,.0f} ms"},
+            {"label": "p95 Rerun", "value": f"{quantiles.get(0.95, 0):,.0f} ms", "color": COLORS["warning_amber"]},
+            {"label": "Reruns Recorded", "value": f"{metrics.count:,}"},
+        ])
+        st.dataframe(
+            previous.tree().round({"ms": 1, "self_ms": 1}),
+            use_container_width=True,
+            height=420,
+            hide_index=True,
+            column_config={
+                "span": st.column_config.TextColumn("Span"),
+                "ms": st.column_config.NumberColumn("Total (ms)", format="%.1f"),
+                "self_ms": st.column_config.NumberColumn("Own (ms)", format="%.1f",
+                                                          help="Time not spent in nested spans"),
+                "share": st.column_config.ProgressColumn("Share of Rerun", min_value=0.0, max_value=100.0, format="%.0f%%"),
+                "net_mb": st.column_config.NumberColumn("Held (MB)", format="%.2f",
+                                                        help="Traced memory still held when the span ended"),
+            },
+        )
@@ -41,6 +41,13 @@ FRAUD_COLORSCALE = [
     [1.0, "#DC2626"],
 ]
 
+# Diverging scale for comparison minus baseline: green falls, red rises
+DELTA_COLORSCALE = [
+    [0.0, "#059669"],
+    [0.5, "#F8F9FA"],
+    [1.0, "#DC2626"],
+]
+
 
 # ── Shared chart config (avoids repeating {"displayModeBar": False} everywhere)
 PLOTLY_CONFIG = {"displayModeBar": False}
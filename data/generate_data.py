@@ -1,11 +1,10 @@
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 
+# Default seed of generate_fraud_dataset; each call seeds its own generator,
+# so importing this module leaves NumPy's global random state alone
 SEED = 42
-np.random.seed(SEED)
-random.seed(SEED)
 
 MERCHANT_CATEGORIES = [
     "Electronics", "Groceries", "Restaurants", "Travel", "Healthcare",
@@ -76,99 +75,166 @@ HOUR_FRAUD_WEIGHTS = {
 }
 
 
-def generate_fraud_dataset(n_transactions: int = 50000) -> pd.DataFrame:
-    """Generate a realistic synthetic credit card fraud dataset."""
+# Share of a card's transactions made away from its holder's home city,
+# and how much riskier those are
+TRAVEL_RATE = 0.08
+AWAY_FRAUD_MULTIPLIER = 1.8
 
+# Card-testing and split-purchase attacks: share of transactions injected as
+# bursts of similar amounts at one merchant category and city within minutes
+BURST_RATE = 0.003
+BURST_SIZES = (3, 9)
+BURST_GAP_SECONDS = (5, 120)
+
+# Customers per card; the remaining cards are second/third cards of existing customers
+CUSTOMERS_PER_CARD = 0.8
+
+_STATE_WEIGHTS = [0.12, 0.09, 0.07, 0.06, 0.04, 0.04, 0.04, 0.03, 0.03, 0.03,
+                  0.03, 0.03, 0.03, 0.03, 0.03, 0.02, 0.02, 0.02, 0.02, 0.02,
+                  0.02, 0.02, 0.02, 0.02, 0.02, 0.01, 0.01, 0.01, 0.01, 0.01,
+                  0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01,
+                  0.01, 0.01, 0.01, 0.01, 0.01, 0.005, 0.005, 0.005, 0.005]
+
+_AMOUNT_LOGNORMAL = {"Electronics": (5.5, 0.8), "Groceries": (3.5, 0.5), "Travel": (5.8, 0.9)}
+_DEFAULT_LOGNORMAL = (3.8, 0.7)
+_ATM_AMOUNTS = [20, 40, 60, 80, 100, 200, 300, 500]
+_ATM_WEIGHTS = [0.15, 0.20, 0.15, 0.10, 0.20, 0.10, 0.05, 0.05]
+
+
+def _random_locations(rng: np.random.RandomState, n: int) -> tuple:
+    """Draw `n` (state, city) pairs using the state mix; cities are uniform within a state."""
+    state_keys = list(US_STATES.keys())
+    weights = np.array(_STATE_WEIGHTS[:len(state_keys)])
+    states = rng.choice(state_keys, n, p=weights / weights.sum())
+
+    cities = np.empty(n, dtype=object)
+    for state in np.unique(states):
+        mask = states == state
+        if state in CITIES_BY_STATE:
+            cities[mask] = rng.choice(CITIES_BY_STATE[state], mask.sum())
+        else:
+            cities[mask] = US_STATES[state] + " City"
+    return states, cities
+
+
+def _lookup(values: np.ndarray, table: dict, default: float) -> np.ndarray:
+    return pd.Series(values).map(table).fillna(default).to_numpy(dtype=float)
+
+
+def sequential_ids(prefix: str, first: int, count: int) -> np.ndarray:
+    """IDs such as TXN0000001: `prefix` and a zero-padded number, for `count` numbers from `first`."""
+    return np.char.add(prefix, np.char.zfill(np.arange(first, first + count).astype(str), 7))
+
+
+def generate_fraud_dataset(n_transactions: int = 50000, n_cards: int = None,
+                           activity_skew: float = 1.2, seed: int = SEED) -> pd.DataFrame:
+    """Generate a realistic synthetic credit card fraud dataset.
+
+    Transactions belong to a population of `n_cards` cards (default: one per
+    ten transactions) held by customers with a home city. Card activity is
+    lognormally skewed with sigma `activity_skew`, so a minority of cards
+    carries most of the volume. Card type follows the card; age group and
+    home city follow the customer. The same `seed` gives the same dataset;
+    pass None for a fresh one.
+    """
+    # RandomState draws the same stream the former global np.random.seed(SEED) did
+    rng = np.random.RandomState(seed)
+    n = n_transactions
+    n_cards = n_cards or max(1, n // 10)
+    n_customers = max(1, int(n_cards * CUSTOMERS_PER_CARD))
+
+    # ── Card and customer population
+    customer_of_card = np.concatenate([
+        np.arange(min(n_customers, n_cards)),
+        rng.randint(0, n_customers, max(0, n_cards - n_customers)),
+    ])
+    card_type_of_card = rng.choice(CARD_TYPES, n_cards, p=[0.40, 0.35, 0.15, 0.10])
+    age_of_customer = rng.choice(AGE_GROUPS, n_customers, p=[0.12, 0.22, 0.25, 0.20, 0.13, 0.08])
+    home_state, home_city = _random_locations(rng, n_customers)
+    activity = rng.lognormal(0.0, activity_skew, n_cards)
+
+    # ── Transactions
     start_date = datetime(2023, 1, 1)
     end_date = datetime(2023, 12, 31)
     date_range_seconds = int((end_date - start_date).total_seconds())
+    offsets = np.sort(rng.randint(0, date_range_seconds + 1, n))
+    timestamps = pd.Timestamp(start_date) + pd.to_timedelta(offsets, unit="s")
 
-    timestamps = [
-        start_date + timedelta(seconds=random.randint(0, date_range_seconds))
-        for _ in range(n_transactions)
-    ]
-    timestamps.sort()
-
-    merchant_categories = np.random.choice(
+    merchant_categories = rng.choice(
         MERCHANT_CATEGORIES,
-        n_transactions,
+        n,
         p=[0.12, 0.18, 0.14, 0.10, 0.08, 0.08, 0.10, 0.08, 0.08, 0.04]
     )
-
-    card_types = np.random.choice(
-        CARD_TYPES, n_transactions, p=[0.40, 0.35, 0.15, 0.10]
+    channels = rng.choice(
+        TRANSACTION_CHANNELS, n, p=[0.42, 0.35, 0.18, 0.05]
     )
 
-    channels = np.random.choice(
-        TRANSACTION_CHANNELS, n_transactions, p=[0.42, 0.35, 0.18, 0.05]
-    )
-
-    age_groups = np.random.choice(
-        AGE_GROUPS, n_transactions, p=[0.12, 0.22, 0.25, 0.20, 0.13, 0.08]
-    )
-
-    state_keys = list(US_STATES.keys())
-    state_weights = [0.12, 0.09, 0.07, 0.06, 0.04, 0.04, 0.04, 0.03, 0.03, 0.03,
-                     0.03, 0.03, 0.03, 0.03, 0.03, 0.02, 0.02, 0.02, 0.02, 0.02,
-                     0.02, 0.02, 0.02, 0.02, 0.02, 0.01, 0.01, 0.01, 0.01, 0.01,
-                     0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01,
-                     0.01, 0.01, 0.01, 0.01, 0.01, 0.005, 0.005, 0.005, 0.005]
-    state_weights = state_weights[:len(state_keys)]
-    state_weights = [w / sum(state_weights) for w in state_weights]
-    states = np.random.choice(state_keys, n_transactions, p=state_weights)
-
-    cities = []
-    for state in states:
-        if state in CITIES_BY_STATE:
-            cities.append(random.choice(CITIES_BY_STATE[state]))
-        else:
-            cities.append(US_STATES[state] + " City")
-
-    amounts = []
-    for cat, channel in zip(merchant_categories, channels):
-        if cat == "Electronics":
-            base = np.random.lognormal(5.5, 0.8)
-        elif cat == "Groceries":
-            base = np.random.lognormal(3.5, 0.5)
-        elif cat == "Travel":
-            base = np.random.lognormal(5.8, 0.9)
-        elif cat == "ATM/Cash":
-            base = np.random.choice([20, 40, 60, 80, 100, 200, 300, 500],
-                                    p=[0.15, 0.20, 0.15, 0.10, 0.20, 0.10, 0.05, 0.05])
-        else:
-            base = np.random.lognormal(3.8, 0.7)
-
-        if channel == "Phone Order":
-            base *= 1.2
-        amounts.append(round(min(base, 9999.99), 2))
-
-    is_fraud = []
-    fraud_types = []
-
-    for i, (cat, channel, state, ts) in enumerate(zip(merchant_categories, channels, states, timestamps)):
-        hour = ts.hour
-        base_rate = (CATEGORY_FRAUD_RATES.get(cat, 0.015) +
-                     CHANNEL_FRAUD_RATES.get(channel, 0.015)) / 2
-        hour_mult = HOUR_FRAUD_WEIGHTS.get(hour, 1.0)
-        state_mult = STATE_FRAUD_MULTIPLIERS.get(state, 1.0)
-
-        fraud_prob = base_rate * hour_mult * state_mult
-
-        if random.random() < fraud_prob:
-            is_fraud.append(1)
-            if cat in ["Online Retail", "Electronics"] or channel == "Online":
-                fraud_type = np.random.choice(FRAUD_TYPES[:3], p=[0.45, 0.30, 0.25])
-            elif cat == "ATM/Cash":
-                fraud_type = np.random.choice(["Skimming", "Account Takeover"], p=[0.65, 0.35])
-            else:
-                fraud_type = np.random.choice(FRAUD_TYPES, p=[0.30, 0.25, 0.20, 0.15, 0.10])
-            fraud_types.append(fraud_type)
+    card_idx = rng.choice(n_cards, n, p=activity / activity.sum())
+    customer_idx = customer_of_card[card_idx]
+    card_types = card_type_of_card[card_idx]
+    age_groups = age_of_customer[customer_idx]
+
+    states = home_state[customer_idx]
+    cities = home_city[customer_idx]
+    away = rng.random(n) < TRAVEL_RATE
+    states[away], cities[away] = _random_locations(rng, int(away.sum()))
+
+    amounts = np.empty(n)
+    for cat in MERCHANT_CATEGORIES:
+        mask = merchant_categories == cat
+        if cat == "ATM/Cash":
+            amounts[mask] = rng.choice(_ATM_AMOUNTS, mask.sum(), p=_ATM_WEIGHTS)
         else:
-            is_fraud.append(0)
-            fraud_types.append(None)
+            mu, sigma = _AMOUNT_LOGNORMAL.get(cat, _DEFAULT_LOGNORMAL)
+            amounts[mask] = rng.lognormal(mu, sigma, mask.sum())
+    amounts[channels == "Phone Order"] *= 1.2
+    amounts = np.minimum(amounts, 9999.99).round(2)
+
+    base_rate = (_lookup(merchant_categories, CATEGORY_FRAUD_RATES, 0.015)
+                 + _lookup(channels, CHANNEL_FRAUD_RATES, 0.015)) / 2
+    fraud_prob = (base_rate
+                  * _lookup(timestamps.hour, HOUR_FRAUD_WEIGHTS, 1.0)
+                  * _lookup(states, STATE_FRAUD_MULTIPLIERS, 1.0)
+                  * np.where(away, AWAY_FRAUD_MULTIPLIER, 1.0))
+    is_fraud = (rng.random(n) < fraud_prob).astype(int)
+
+    # ── Bursts: regroup random rows around a lead transaction's place, time and amount
+    n_bursts = int(n * BURST_RATE / np.mean(BURST_SIZES))
+    members = np.array([], dtype=int)
+    if n_bursts:
+        sizes = rng.randint(BURST_SIZES[0], BURST_SIZES[1] + 1, n_bursts)
+        members = rng.choice(n, sizes.sum(), replace=False)
+        firsts = np.r_[0, np.cumsum(sizes)[:-1]]
+        lead = np.repeat(members[firsts], sizes)
+        gaps = rng.randint(BURST_GAP_SECONDS[0], BURST_GAP_SECONDS[1], len(members))
+        gaps[firsts] = 0
+        elapsed = np.cumsum(gaps) - np.repeat(np.cumsum(gaps)[firsts], sizes)
+        offsets[members] = np.minimum(offsets[lead] + elapsed, date_range_seconds)
+        states[members] = states[lead]
+        cities[members] = cities[lead]
+        merchant_categories[members] = merchant_categories[lead]
+        amounts[members] = (amounts[lead] * rng.uniform(0.97, 1.03, len(members))).round(2)
+        is_fraud[members] = 1
+        timestamps = pd.Timestamp(start_date) + pd.to_timedelta(offsets, unit="s")
+
+    fraud_types = np.full(n, None, dtype=object)
+    online = np.isin(merchant_categories, ["Online Retail", "Electronics"]) | (channels == "Online")
+    atm = (merchant_categories == "ATM/Cash") & ~online
+    for mask, types, p in [
+        (online, FRAUD_TYPES[:3], [0.45, 0.30, 0.25]),
+        (atm, ["Skimming", "Account Takeover"], [0.65, 0.35]),
+        (~online & ~atm, FRAUD_TYPES, [0.30, 0.25, 0.20, 0.15, 0.10]),
+    ]:
+        mask = mask & (is_fraud == 1)
+        fraud_types[mask] = rng.choice(types, mask.sum(), p=p)
+    fraud_types[members] = "Card Not Present"
+
+    card_ids = sequential_ids("C", 1, n_cards)
+    customer_ids = sequential_ids("U", 1, n_customers)
 
     df = pd.DataFrame({
-        "transaction_id": [f"TXN{str(i+1).zfill(7)}" for i in range(n_transactions)],
+        "card_id": card_ids[card_idx],
+        "customer_id": customer_ids[customer_idx],
         "timestamp": timestamps,
         "amount": amounts,
         "merchant_category": merchant_categories,
@@ -176,17 +242,28 @@ def generate_fraud_dataset(n_transactions: int = 50000) -> pd.DataFrame:
         "transaction_channel": channels,
         "age_group": age_groups,
         "state": states,
-        "state_name": [US_STATES[s] for s in states],
+        "state_name": pd.Series(states).map(US_STATES).to_numpy(),
         "city": cities,
         "is_fraud": is_fraud,
         "fraud_type": fraud_types,
     })
 
+    # Bursts moved rows in time; restore timestamp order and sequential IDs
+    df = df.sort_values("timestamp", kind="stable", ignore_index=True)
+    df.insert(0, "transaction_id", sequential_ids("TXN", 1, n))
+    return add_derived_columns(df)
+
+
+def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the calendar columns the dashboard groups by, derived from timestamp."""
     df["date"] = df["timestamp"].dt.date
     df["hour"] = df["timestamp"].dt.hour
     df["day_of_week"] = df["timestamp"].dt.day_name()
     df["month"] = df["timestamp"].dt.month
-    df["month_name"] = df["timestamp"].dt.strftime("%b %Y")
+    # Format each distinct month once instead of every row
+    year_month = df["timestamp"].dt.year * 100 + df["timestamp"].dt.month
+    labels = {ym: datetime(ym // 100, ym % 100, 1).strftime("%b %Y") for ym in year_month.unique()}
+    df["month_name"] = year_month.map(labels)
     df["week"] = df["timestamp"].dt.isocalendar().week.astype(int)
     df["quarter"] = df["timestamp"].dt.quarter
 
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# (lat, lon) of the named cities in generate_data.CITIES_BY_STATE
+CITY_COORDINATES = {
+    ("CA", "Los Angeles"): (34.05, -118.24), ("CA", "San Francisco"): (37.77, -122.42),
+    ("CA", "San Diego"): (32.72, -117.16), ("CA", "Sacramento"): (38.58, -121.49),
+    ("CA", "San Jose"): (37.34, -121.89),
+    ("TX", "Houston"): (29.76, -95.37), ("TX", "Dallas"): (32.78, -96.80),
+    ("TX", "Austin"): (30.27, -97.74), ("TX", "San Antonio"): (29.42, -98.49),
+    ("TX", "Fort Worth"): (32.76, -97.33),
+    ("FL", "Miami"): (25.76, -80.19), ("FL", "Orlando"): (28.54, -81.38),
+    ("FL", "Tampa"): (27.95, -82.46), ("FL", "Jacksonville"): (30.33, -81.66),
+    ("FL", "Fort Lauderdale"): (26.12, -80.14),
+    ("NY", "New York City"): (40.71, -74.01), ("NY", "Buffalo"): (42.89, -78.88),
+    ("NY", "Albany"): (42.65, -73.76), ("NY", "Rochester"): (43.16, -77.61),
+    ("NY", "Yonkers"): (40.93, -73.90),
+    ("IL", "Chicago"): (41.88, -87.63), ("IL", "Aurora"): (41.76, -88.32),
+    ("IL", "Naperville"): (41.75, -88.15), ("IL", "Joliet"): (41.53, -88.08),
+    ("IL", "Rockford"): (42.27, -89.09),
+    ("PA", "Philadelphia"): (39.95, -75.17), ("PA", "Pittsburgh"): (40.44, -80.00),
+    ("PA", "Allentown"): (40.60, -75.49), ("PA", "Erie"): (42.13, -80.09),
+    ("PA", "Reading"): (40.34, -75.93),
+    ("OH", "Columbus"): (39.96, -83.00), ("OH", "Cleveland"): (41.50, -81.69),
+    ("OH", "Cincinnati"): (39.10, -84.51), ("OH", "Toledo"): (41.65, -83.54),
+    ("OH", "Akron"): (41.08, -81.52),
+    ("GA", "Atlanta"): (33.75, -84.39), ("GA", "Columbus"): (32.46, -84.99),
+    ("GA", "Augusta"): (33.47, -81.97), ("GA", "Macon"): (32.84, -83.63),
+    ("GA", "Savannah"): (32.08, -81.09),
+    ("NC", "Charlotte"): (35.23, -80.84), ("NC", "Raleigh"): (35.78, -78.64),
+    ("NC", "Greensboro"): (36.07, -79.79), ("NC", "Durham"): (35.99, -78.90),
+    ("NC", "Winston-Salem"): (36.10, -80.24),
+    ("MI", "Detroit"): (42.33, -83.05), ("MI", "Grand Rapids"): (42.96, -85.67),
+    ("MI", "Warren"): (42.51, -83.01), ("MI", "Sterling Heights"): (42.58, -83.03),
+    ("MI", "Ann Arbor"): (42.28, -83.74),
+}
+
+# Approximate geographic centre per state, used for the generic "<State> City" locations
+STATE_CENTROIDS = {
+    "AL": (32.8, -86.8), "AK": (64.0, -152.0), "AZ": (34.2, -111.7), "AR": (34.9, -92.4),
+    "CA": (37.2, -119.5), "CO": (39.0, -105.5), "CT": (41.6, -72.7), "DE": (39.0, -75.5),
+    "FL": (28.6, -82.4), "GA": (32.7, -83.4), "HI": (20.8, -156.3), "ID": (44.4, -114.6),
+    "IL": (40.0, -89.2), "IN": (39.9, -86.3), "KS": (38.5, -98.4), "KY": (37.5, -85.3),
+    "LA": (31.1, -92.0), "ME": (45.4, -69.2), "MD": (39.0, -76.8), "MA": (42.3, -71.8),
+    "MI": (44.3, -85.4), "MN": (46.3, -94.3), "MS": (32.7, -89.7), "MO": (38.4, -92.5),
+    "MT": (47.0, -109.6), "NE": (41.5, -99.8), "NV": (39.3, -116.6), "NH": (43.7, -71.6),
+    "NJ": (40.2, -74.7), "NM": (34.4, -106.1), "NY": (42.9, -75.5), "NC": (35.6, -79.4),
+    "ND": (47.5, -100.5), "OH": (40.3, -82.8), "OK": (35.6, -97.5), "OR": (43.9, -120.6),
+    "PA": (40.9, -77.8), "RI": (41.7, -71.5), "SC": (33.9, -80.9), "SD": (44.4, -100.2),
+    "TN": (35.9, -86.4), "UT": (39.3, -111.7), "VT": (44.1, -72.7), "VA": (37.5, -78.9),
+    "WA": (47.4, -120.5), "WV": (38.6, -80.6), "WI": (44.6, -89.9), "WY": (43.0, -107.6),
+}
+
+
+def city_coordinates(state: pd.Series, city: pd.Series) -> tuple:
+    """(lat, lon) arrays for aligned state/city columns.
+
+    Each distinct location is resolved once. Cities missing from
+    CITY_COORDINATES fall back to their state's centroid, unknown states to NaN.
+    """
+    codes, uniques = pd.factorize(pd.Series(state).astype(str).to_numpy() + "|"
+                                  + pd.Series(city).astype(str).to_numpy())
+    table = np.full((len(uniques) + 1, 2), np.nan)
+    for i, key in enumerate(uniques):
+        st_code, name = key.split("|", 1)
+        table[i] = CITY_COORDINATES.get((st_code, name), STATE_CENTROIDS.get(st_code, (np.nan, np.nan)))
+    located = table[codes]
+    return located[:, 0], located[:, 1]
@@ -0,0 +1,263 @@
+import hashlib
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics.sampling import sample_mask, strata_counts, weight_sample
+from analytics.sketches import SegmentSketches
+from data.generate_data import US_STATES, add_derived_columns, sequential_ids
+
+# Dimensions whose rollups are kept up to date on every append; the unfiltered
+# view's groupings by any one of them are answered from these
+ROLLUP_DIMENSIONS = [
+    "merchant_category", "state", "transaction_channel", "hour", "week",
+    "is_fraud", "card_type", "age_group", "fraud_type", "day_of_week", "month", "quarter",
+]
+
+# Columns that follow from a rollup dimension, so a grouping may carry them alongside it
+_DEPENDENT_COLUMNS = {"state": {"state_name": US_STATES}}
+
+# Columns a batch must carry; everything else is filled in by prepare_batch
+REQUIRED_COLUMNS = [
+    "card_id", "timestamp", "amount", "merchant_category", "card_type",
+    "transaction_channel", "age_group", "state", "city", "is_fraud",
+]
+
+
+def _rollup_values(df: pd.DataFrame) -> pd.DataFrame:
+    fraud = df["is_fraud"].to_numpy(dtype=np.int64)
+    amount = df["amount"].to_numpy(dtype=float)
+    return pd.DataFrame({
+        "total": np.ones(len(df), dtype=np.int64),
+        "fraud": fraud,
+        "amount": amount,
+        "fraud_amount": amount * fraud,
+    })
+
+
+def rollup(df: pd.DataFrame, key: str, values: pd.DataFrame = None) -> pd.DataFrame:
+    """Count, fraud count, amount and fraud amount per value of `key`."""
+    if values is None:
+        values = _rollup_values(df)
+    return values.groupby(df[key].to_numpy()).sum().rename_axis(key)
+
+
+def _fingerprint(df: pd.DataFrame, previous: str = "") -> str:
+    """Digest of `previous` and the required columns of `df`, row by row."""
+    rows = pd.util.hash_pandas_object(df[REQUIRED_COLUMNS], index=False).to_numpy()
+    return hashlib.blake2b(previous.encode() + rows.tobytes(), digest_size=16).hexdigest()
+
+
+def prepare_batch(batch: pd.DataFrame, first_id: int) -> pd.DataFrame:
+    """Fill in IDs, state names and calendar columns for a batch of raw transactions."""
+    missing = [c for c in REQUIRED_COLUMNS if c not in batch.columns]
+    if missing:
+        raise ValueError(f"Transaction batch is missing columns: {', '.join(missing)}")
+
+    batch = batch.copy()
+    batch["timestamp"] = pd.to_datetime(batch["timestamp"])
+    batch["is_fraud"] = batch["is_fraud"].astype(int)
+    if "transaction_id" not in batch.columns:
+        batch["transaction_id"] = sequential_ids("TXN", first_id, len(batch))
+    if "customer_id" not in batch.columns:
+        batch["customer_id"] = None
+    if "state_name" not in batch.columns:
+        batch["state_name"] = batch["state"].map(US_STATES)
+    if "fraud_type" not in batch.columns:
+        batch["fraud_type"] = None
+    return add_derived_columns(batch)
+
+
+class IncrementalAggregates:
+    """Transaction store whose KPI totals and rollups are updated per appended batch.
+
+    Appends only touch the new rows: the batch is rolled up on its own and
+    added onto the running aggregates, so the cost scales with the batch and
+    the number of groups, never with the history. The full frame is only
+    stitched together when a caller asks for it, and `settled` bounds how
+    often that happens for structures built over the whole history.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._lock = threading.RLock()
+        self.version = 0
+        # Version the current history was loaded at; later versions only append to it
+        self._loaded_version = 0
+        self._load(df)
+
+    def _load(self, df: pd.DataFrame):
+        self._columns = list(df.columns)
+        self._chunks = [df]
+        self._rows = len(df)
+        self._fingerprint = _fingerprint(df)
+        # (version, frame, fingerprint) last handed out by `settled`; None stitches at the next call
+        self._settled = None
+        self._settled_at = 0.0
+
+        fraud = df["is_fraud"] == 1
+        self._totals = {
+            "total_transactions": len(df),
+            "fraud_count": int(fraud.sum()),
+            "fraud_amount": float(df.loc[fraud, "amount"].sum()),
+            "total_amount": float(df["amount"].sum()),
+        }
+        values = _rollup_values(df)
+        self._rollups = {dim: rollup(df, dim, values) for dim in ROLLUP_DIMENSIONS}
+        self._sketches = SegmentSketches()
+        self._sketches.add(df)
+        # Stratified sample kept alongside: batches are sampled on arrival and
+        # weights follow from the running stratum counts
+        self._rng = np.random.default_rng()
+        self._strata = strata_counts(df)
+        self._sample_chunks = [df[sample_mask(df, self._rng)]]
+
+    def reset(self, df: pd.DataFrame) -> int:
+        """Replace the whole history with `df` (full recompute) and return the new version."""
+        with self._lock:
+            self._load(df)
+            self.version += 1
+            self._loaded_version = self.version
+            return self.version
+
+    def append(self, batch: pd.DataFrame) -> int:
+        """Append a batch of transactions and return the new data version."""
+        if len(batch) == 0:
+            return self.version
+
+        with self._lock:
+            batch = prepare_batch(batch, self._rows + 1)[self._columns]
+            fraud = batch["is_fraud"] == 1
+
+            self._totals["total_transactions"] += len(batch)
+            self._totals["fraud_count"] += int(fraud.sum())
+            self._totals["fraud_amount"] += float(batch.loc[fraud, "amount"].sum())
+            self._totals["total_amount"] += float(batch["amount"].sum())
+
+            values = _rollup_values(batch)
+            for dim in ROLLUP_DIMENSIONS:
+                merged = self._rollups[dim].add(rollup(batch, dim, values), fill_value=0)
+                self._rollups[dim] = merged.astype({"total": np.int64, "fraud": np.int64})
+            self._sketches.add(batch)
+            self._strata = self._strata.add(strata_counts(batch), fill_value=0).astype(np.int64)
+            self._sample_chunks.append(batch[sample_mask(batch, self._rng)])
+
+            self._chunks.append(batch)
+            self._rows += len(batch)
+            self._fingerprint = _fingerprint(batch, self._fingerprint)
+            self.version += 1
+            return self.version
+
+    def fingerprint(self, version: int) -> str:
+        """Content digest of the history at `version` (the current or the settled one), else None.
+
+        Unlike the version counter, the digest is the same in every process
+        that loads the same transactions and appends the same batches.
+        """
+        with self._lock:
+            if version == self.version:
+                return self._fingerprint
+            if self._settled is not None and version == self._settled[0]:
+                return self._settled[2]
+            return None
+
+    def history(self, version: int):
+        """Version at which the history holding `version` was loaded, or None if a reset has replaced it.
+
+        Frames of two versions with the same history differ only by rows
+        appended at the end.
+        """
+        with self._lock:
+            return self._loaded_version if version >= self._loaded_version else None
+
+    def frame(self) -> pd.DataFrame:
+        """Return the full transaction frame, including every appended batch."""
+        with self._lock:
+            if len(self._chunks) > 1:
+                self._chunks = [pd.concat(self._chunks, ignore_index=True)]
+            return self._chunks[0]
+
+    def settled(self, interval: float) -> tuple:
+        """(version, frame) as last stitched, re-stitched once batches have landed and `interval` seconds passed.
+
+        Structures built over the whole frame (enriched features, indexes,
+        models) should be keyed by this version, so while batches keep
+        landing they are rebuilt once per `interval` rather than per batch.
+        A store that was just loaded or reset is stitched at once.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._settled is None or (self._settled[0] != self.version and now - self._settled_at >= interval):
+                self._settled = (self.version, self.frame(), self._fingerprint)
+                self._settled_at = now
+            return self._settled[:2]
+
+    def snapshot(self) -> tuple:
+        """Consistent (version, stats, state table) of the whole history, taken under one lock."""
+        with self._lock:
+            return self.version, self.stats(), self.state_table()
+
+    def stats(self) -> dict:
+        """KPI totals in the same shape as `compute_stats` in app.py."""
+        with self._lock:
+            t = dict(self._totals)
+        total = t["total_transactions"]
+        fraud = t["fraud_count"]
+        return {
+            "total_transactions": total,
+            "fraud_count": fraud,
+            "fraud_rate": fraud / total * 100 if total else 0.0,
+            "fraud_amount": t["fraud_amount"],
+            "avg_fraud_amount": t["fraud_amount"] / fraud if fraud else float("nan"),
+            "total_amount": t["total_amount"],
+            "legitimate_count": total - fraud,
+        }
+
+    def sample(self) -> pd.DataFrame:
+        """Weighted stratified sample of the full history (see analytics.sampling)."""
+        with self._lock:
+            if len(self._sample_chunks) > 1:
+                self._sample_chunks = [pd.concat(self._sample_chunks, ignore_index=True)]
+            return weight_sample(self._sample_chunks[0], self._strata)
+
+    def sketch_summary(self, filters: dict = None) -> dict:
+        """Amount percentiles and distinct cards/cities for a filter selection, from the merged sketches."""
+        with self._lock:
+            return self._sketches.summary(filters)
+
+    def rollup(self, dim: str) -> pd.DataFrame:
+        """Current rollup for one of ROLLUP_DIMENSIONS, with a fraud rate column."""
+        with self._lock:
+            data = self._rollups[dim].copy()
+        data["rate"] = data["fraud"] / data["total"] * 100
+        return data
+
+    def covers(self, keys: list) -> bool:
+        """Whether `groups` can answer a grouping by `keys`: one rollup dimension and columns it determines."""
+        return (len(keys) > 0 and keys[0] in ROLLUP_DIMENSIONS
+                and set(keys[1:]) <= set(_DEPENDENT_COLUMNS.get(keys[0], {})))
+
+    def groups(self, keys: list, fraud_only: bool = False) -> pd.DataFrame:
+        """Whole-history totals per group from the rollups, in the shape of analytics.sampling.group_estimates.
+
+        With `fraud_only` the totals are those of the fraud rows alone, as
+        when grouping only those rows; groups without fraud drop out.
+        """
+        with self._lock:
+            data = self._rollups[keys[0]]
+        table = data[["total", "fraud", "fraud_amount"]]
+        if fraud_only:
+            table = table[table["fraud"] > 0].assign(total=lambda t: t["fraud"])
+        if len(keys) > 1:
+            dependent = [table.index.map(_DEPENDENT_COLUMNS[keys[0]][key]) for key in keys[1:]]
+            table = table.set_axis(pd.MultiIndex.from_arrays([table.index, *dependent], names=keys))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table = table.assign(rate=table["fraud"] / table["total"] * 100, rate_err=0.0)
+        return table
+
+    def state_table(self) -> pd.DataFrame:
+        """State table in the shape `render_geography` builds from a frame."""
+        data = self.rollup("state").reset_index()
+        data.insert(1, "state_name", data["state"].map(US_STATES))
+        return data[["state", "state_name", "total", "fraud", "fraud_amount", "rate"]]
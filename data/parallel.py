@@ -0,0 +1,373 @@
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.sketches import amount_bins, bin_quantiles
+from data.query import FILTER_COLUMNS, _day_range, _days
+
+# Setting this sets the worker processes per aggregator (default: one per core; 1 turns parallel aggregation off)
+AGG_WORKERS_ENV = "DASHBOARD_AGG_WORKERS"
+
+# Columns kept per row as integer codes: the filter bar's and every key a chart groups by
+CODED_COLUMNS = [
+    "card_type", "transaction_channel", "fraud_type", "merchant_category", "age_group", "state", "state_name",
+    "city", "hour", "day_of_week", "month", "month_name", "week", "quarter",
+]
+
+# Every grouping the charts, KPIs and insights request. One pass per partition
+# sums all of them; a fraud-only grouping is read off the fraud column.
+GROUPINGS = [
+    (), ("is_fraud",), ("merchant_category",), ("month",), ("month_name",), ("week",), ("quarter",), ("hour",),
+    ("day_of_week",), ("day_of_week", "hour"), ("state", "state_name"), ("city", "state"), ("age_group",),
+    ("card_type",), ("transaction_channel",), ("fraud_type",),
+]
+
+# Rows per time partition (the last one may be shorter)
+PARTITION_ROWS = 1 << 20
+
+# Merged results kept per aggregator, one per filter selection
+_RESULT_HISTORY = 8
+# Groupings with at most this many code combinations are summed densely
+_DENSE_LIMIT = 1 << 20
+_AMOUNT_BINS = 1 << 12
+_QUANTILES = {"amount_p50": 0.50, "amount_p95": 0.95, "amount_p99": 0.99}
+
+
+def default_workers() -> int:
+    return int(os.environ.get(AGG_WORKERS_ENV) or os.cpu_count() or 1)
+
+
+class ColumnStore:
+    """Transactions as memory-mapped column files, split into time partitions of PARTITION_ROWS rows.
+
+    Strings and group keys are dictionary-coded to the smallest integer type
+    (-1 for missing); `day`, `is_fraud` and `amount` are stored as they are.
+    Rows are written chunk by chunk, so a store can be larger than memory,
+    and `append` adds later rows without rewriting the earlier ones.
+    Each partition keeps its first and last day, which lets a date filter
+    skip partitions outside its range; chunks arriving in time order (as the
+    live store appends them) give tight ranges.
+    """
+
+    def __init__(self, chunks, directory: str = None, partition_rows: int = PARTITION_ROWS):
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="fraud-columns-")
+            weakref.finalize(self, shutil.rmtree, directory, True)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for stale in self.directory.glob("*.bin"):
+            stale.unlink()
+        self.partition_rows = partition_rows
+        self.categories = {}
+        self.rows = 0
+        self.partitions = []
+        self.dtypes = {"day": "int32", "is_fraud": "int8", "amount": "float64"}
+        self.dtypes.update({name: np.dtype(np.int16).str for name in CODED_COLUMNS})
+        for chunk in chunks:
+            self.append(chunk)
+
+    def append(self, chunk: pd.DataFrame):
+        """Write `chunk`'s rows after the existing ones, filling the last partition before opening new ones."""
+        if len(chunk) == 0:
+            return
+        day = _days(chunk["timestamp"].to_numpy()).astype(np.int32)
+        columns = {"day": day,
+                   "is_fraud": chunk["is_fraud"].to_numpy(dtype=np.int8),
+                   "amount": chunk["amount"].to_numpy(dtype=np.float64)}
+        for name in CODED_COLUMNS:
+            codes = self._encode(name, chunk[name])
+            if self._code_dtype(name).itemsize > np.dtype(self.dtypes[name]).itemsize:
+                self._widen(name)
+            columns[name] = codes.astype(self.dtypes[name])
+        for name, values in columns.items():
+            with open(self.directory / f"{name}.bin", "ab") as column:
+                values.tofile(column)
+
+        start, self.rows = self.rows, self.rows + len(chunk)
+        lo = start
+        while lo < self.rows:
+            if self.partitions and self.partitions[-1][1] - self.partitions[-1][0] < self.partition_rows:
+                first_lo, _, first, last = self.partitions.pop()
+            else:
+                first_lo, first, last = lo, np.iinfo(np.int32).max, np.iinfo(np.int32).min
+            hi = min(first_lo + self.partition_rows, self.rows)
+            days = day[lo - start:hi - start]
+            self.partitions.append((first_lo, hi, min(first, int(days.min())), max(last, int(days.max()))))
+            lo = hi
+
+    def _encode(self, name: str, values: pd.Series) -> np.ndarray:
+        """Codes of `values` in this column's dictionary, extending it with values not seen before."""
+        known = self.categories.get(name, pd.Index([], dtype=values.dtype))
+        new = pd.Index(values.dropna().unique()).difference(known)
+        if len(new):
+            known = known.append(new)
+            self.categories[name] = known
+        self.categories.setdefault(name, known)
+        return known.get_indexer(values).astype(np.int32)
+
+    def _code_dtype(self, name: str) -> np.dtype:
+        return np.dtype(np.int16) if len(self.categories[name]) < np.iinfo(np.int16).max else np.dtype(np.int32)
+
+    def _widen(self, name: str):
+        """Rewrite a coded column as int32 once its dictionary outgrows int16.
+
+        The new file replaces the old one, so workers still mapping the old
+        file keep reading consistent codes until they reopen.
+        """
+        path = self.directory / f"{name}.bin"
+        scratch = path.with_suffix(".widen")
+        if not path.exists():
+            self.dtypes[name] = np.dtype(np.int32).str
+            return
+        np.fromfile(path, dtype=self.dtypes[name]).astype(np.int32).tofile(scratch)
+        os.replace(scratch, path)
+        self.dtypes[name] = np.dtype(np.int32).str
+
+    def code(self, column: str, value) -> int:
+        """Code of `value` in `column`, or -2 (matches no row) when it never occurs."""
+        index = self.categories[column].get_indexer([value])[0]
+        return int(index) if index >= 0 else -2
+
+    def sizes(self, keys: tuple) -> tuple:
+        return tuple(2 if key == "is_fraud" else len(self.categories[key]) for key in keys)
+
+    def decode(self, keys: tuple, codes: np.ndarray, sizes: tuple = None) -> pd.Index:
+        """Group index for combined `codes` of `keys` (combined over `sizes`, default the current ones)."""
+        if not keys:
+            return pd.RangeIndex(len(codes))
+        parts = np.unravel_index(codes, sizes or self.sizes(keys))
+        levels = [pd.Index(part, name=key) if key == "is_fraud" else self.categories[key][part].rename(key)
+                  for key, part in zip(keys, parts)]
+        return levels[0] if len(levels) == 1 else pd.MultiIndex.from_arrays(levels)
+
+
+# ── Worker side
+_opened = {}
+
+
+def _columns(directory: str, rows: int, dtypes: dict) -> dict:
+    """Memory maps of a store's columns, kept per worker until the store grows, is widened or is replaced."""
+    key = (directory, rows, tuple(sorted(dtypes.items())))
+    if key not in _opened:
+        # A worker serves one store at a time; dropping older maps releases replaced files
+        _opened.clear()
+        _opened[key] = {
+            name: np.memmap(os.path.join(directory, f"{name}.bin"), dtype=dtype, mode="r", shape=(rows,))
+            for name, dtype in dtypes.items()
+        }
+    return _opened[key]
+
+
+def _sums(code: np.ndarray, fraud: np.ndarray, amount: np.ndarray, size: int, with_amount: bool) -> np.ndarray:
+    """Transactions, fraud, fraud amount and (only `with_amount`, else zeros) amount per group code."""
+    fraud_code = code[fraud]
+    return np.stack([
+        np.bincount(code, minlength=size),
+        np.bincount(fraud_code, minlength=size),
+        np.bincount(fraud_code, weights=amount[fraud], minlength=size),
+        np.bincount(code, weights=amount, minlength=size) if with_amount else np.zeros(size),
+    ]).astype(float)
+
+
+def _partial(directory: str, rows: int, dtypes: dict, lo: int, hi: int, selection: dict, sizes: dict) -> dict:
+    """Per-grouping sums (transactions, fraud, fraud amount, amount) and amount sketch buckets of one partition."""
+    columns = _columns(directory, rows, dtypes)
+    day = columns["day"][lo:hi]
+    mask = (day >= selection["first"]) & (day <= selection["last"])
+    for name, code in selection["equals"].items():
+        mask &= columns[name][lo:hi] == code
+    if selection["fraud_type"] is not None:
+        mask &= (columns["is_fraud"][lo:hi] == 0) | (columns["fraud_type"][lo:hi] == selection["fraud_type"])
+    rows_in = slice(lo, hi) if mask.all() else lo + np.flatnonzero(mask)
+    fraud = np.asarray(columns["is_fraud"][rows_in] == 1)
+    amount = np.asarray(columns["amount"][rows_in])
+    n = len(amount)
+
+    # Key codes are read once per column; rows missing a key (legitimate rows
+    # have no fraud type) join no group of it, as in a pandas groupby
+    codes, missing = {}, {}
+    partial = {}
+    for keys, shape in sizes.items():
+        code = np.zeros(n, dtype=np.int64) if not keys else None
+        valid = None
+        for key, size in zip(keys, shape):
+            if key not in codes:
+                codes[key] = np.asarray(columns[key][rows_in], dtype=np.int64)
+                missing[key] = codes[key] < 0 if n and codes[key].min() < 0 else None
+            code = codes[key] if code is None else code * size + codes[key]
+            if missing[key] is not None:
+                valid = ~missing[key] if valid is None else valid & ~missing[key]
+        group_fraud, group_amount = fraud, amount
+        if valid is not None:
+            code, group_fraud, group_amount = code[valid], fraud[valid], amount[valid]
+        size = int(np.prod(shape))
+        if size <= _DENSE_LIMIT:
+            partial[keys] = (None, _sums(code, group_fraud, group_amount, size, with_amount=not keys))
+        else:
+            uniques, inverse = np.unique(code, return_inverse=True)
+            partial[keys] = (uniques, _sums(inverse, group_fraud, group_amount, len(uniques), with_amount=not keys))
+    buckets = amount_bins(amount)
+    partial["amount"] = np.stack([np.bincount(buckets[~fraud], minlength=_AMOUNT_BINS),
+                                  np.bincount(buckets[fraud], minlength=_AMOUNT_BINS)])
+    return partial
+
+
+# ── Parent side
+def _merge(parts: list) -> tuple:
+    """Sum per-partition (codes, sums) pairs: dense arrays add up, sparse ones merge on their codes."""
+    if parts[0][0] is None:
+        return None, np.sum([sums for _, sums in parts], axis=0)
+    codes = np.concatenate([c for c, _ in parts])
+    uniques, inverse = np.unique(codes, return_inverse=True)
+    sums = np.concatenate([s for _, s in parts], axis=1)
+    return uniques, np.stack([np.bincount(inverse, weights=row, minlength=len(uniques)) for row in sums])
+
+
+class PartitionedAggregator:
+    """Every chart's groupings for a filter selection, from one parallel pass over a ColumnStore.
+
+    Each time partition in the selection's date range is a task for a pool
+    of worker processes, which read the store's memory-mapped columns and
+    return partial sums per grouping plus amount sketch buckets. The parent
+    merges them; merged results are kept for the last few selections, so a
+    view's later groupings are lookups.
+
+    The pool outlives the store: `follow` appends a growing frame's new rows
+    to the store (or rewrites it when the history was replaced), and results
+    are keyed by the row count they were summed over.
+    """
+
+    def __init__(self, store: ColumnStore = None, workers: int = None):
+        self.store = store
+        self.workers = workers or default_workers()
+        self.groupings = len(GROUPINGS)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+        weakref.finalize(self, self._pool.shutdown, wait=False, cancel_futures=True)
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._follow_lock = threading.Lock()
+        self._history = None
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+    def clear(self):
+        """Forget merged results, so the next request for any selection makes a fresh pass."""
+        with self._lock:
+            self._results.clear()
+
+    def follow(self, frame: pd.DataFrame, history=None):
+        """Bring the store up to `frame`: append its rows past the stored ones while `history` is unchanged.
+
+        `history` names the history `frame` extends (IncrementalAggregates.history);
+        a different one, or a frame shorter than the store, rewrites the store.
+        The rewrite happens off the lock, so passes over the old store go on meanwhile.
+        """
+        with self._follow_lock:
+            store = self.store
+            if store is not None and history is not None and history == self._history and len(frame) >= store.rows:
+                if len(frame) > store.rows:
+                    with self._lock:
+                        store.append(frame.iloc[store.rows:])
+                        self._results.clear()
+                return
+            replacement = ColumnStore(frame)
+            with self._lock:
+                self.store, self._history = replacement, history
+                self._results.clear()
+
+    def covers(self, keys) -> bool:
+        return tuple(keys) in GROUPINGS
+
+    def has(self, filters: dict) -> bool:
+        with self._lock:
+            return self._selection_key(filters) in self._results
+
+    def _selection_key(self, filters: dict) -> tuple:
+        return (self.store.rows, *sorted((key, str(value)) for key, value in filters.items()))
+
+    def _selection(self, filters: dict) -> dict:
+        first, last = _day_range(filters)
+        equals = {column: self.store.code(column, filters[key])
+                  for key, (column, everything) in FILTER_COLUMNS.items()
+                  if key != "fraud_type" and filters[key] != everything}
+        fraud_type = None if filters["fraud_type"] == "All Types" else self.store.code("fraud_type", filters["fraud_type"])
+        return {"first": int(first), "last": int(last), "equals": equals, "fraud_type": fraud_type}
+
+    def aggregate(self, filters: dict) -> dict:
+        """{grouping: (codes or None, sums)} and {"amount": bucket counts} for `filters`, merged over partitions."""
+        # The store is read under the lock, so a pass sees one row count even while `follow` appends
+        with self._lock:
+            key = self._selection_key(filters)
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            store = self.store
+            directory, rows, dtypes = str(store.directory), store.rows, dict(store.dtypes)
+            partitions = list(store.partitions)
+            selection = self._selection(filters)
+            sizes = {keys: store.sizes(keys) for keys in GROUPINGS}
+        tasks = [
+            self._pool.submit(_partial, directory, rows, dtypes, lo, hi, selection, sizes)
+            for lo, hi, first, last in partitions
+            if last >= selection["first"] and first <= selection["last"]
+        ]
+        parts = [task.result() for task in tasks] or [_partial(directory, rows, dtypes, 0, 0, selection, sizes)]
+        merged = {keys: _merge([part[keys] for part in parts]) for keys in GROUPINGS}
+        merged["amount"] = np.sum([part["amount"] for part in parts], axis=0)
+        merged["sizes"], merged["store"] = sizes, store
+        with self._lock:
+            if self.store is not store:
+                return merged
+            self._results[key] = merged
+            while len(self._results) > _RESULT_HISTORY:
+                self._results.popitem(last=False)
+        return merged
+
+    def groups(self, keys, filters: dict, fraud_only: bool = False) -> pd.DataFrame:
+        """Group totals in the shape of analytics.sampling.group_estimates (rate_err is 0)."""
+        keys = (keys,) if isinstance(keys, str) else tuple(keys)
+        merged = self.aggregate(filters)
+        codes, sums = merged[keys]
+        total, fraud, fraud_amount, _ = sums
+        if fraud_only:
+            total = fraud
+        codes = np.flatnonzero(total > 0) if codes is None else codes[total > 0]
+        present = total > 0
+        result = pd.DataFrame({
+            "total": total[present].round().astype(np.int64),
+            "fraud": fraud[present].round().astype(np.int64),
+            "fraud_amount": fraud_amount[present],
+        }, index=merged["store"].decode(keys, codes, merged["sizes"][keys]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["rate"] = result["fraud"] / result["total"] * 100
+        result["rate_err"] = 0.0
+        return result.sort_index()
+
+    def stats(self, filters: dict) -> dict:
+        """KPI totals in the shape of app.compute_stats, plus amount percentiles from the merged buckets."""
+        merged = self.aggregate(filters)
+        total, fraud, fraud_amount, amount = (float(v) for v in merged[()][1][:, 0])
+        total, fraud = int(round(total)), int(round(fraud))
+        quantiles = bin_quantiles(merged["amount"].sum(axis=0), list(_QUANTILES.values()))
+        return {
+            "total_transactions": total,
+            "fraud_count": fraud,
+            "fraud_rate": fraud / total * 100 if total else 0.0,
+            "fraud_amount": fraud_amount,
+            "avg_fraud_amount": fraud_amount / fraud if fraud else float("nan"),
+            "total_amount": amount,
+            "legitimate_count": total - fraud,
+            **dict(zip(_QUANTILES, quantiles)),
+        }
@@ -0,0 +1,226 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Directory aggregates persist under (empty disables the store), and its size budget in MB
+AGGREGATE_DIR_ENV = "DASHBOARD_AGGREGATE_DIR"
+AGGREGATE_DISK_MB_ENV = "DASHBOARD_AGGREGATE_DISK_MB"
+AGGREGATE_DIR = str(Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "fraud-dashboard" / "aggregates")
+AGGREGATE_DISK_MB = 1024.0
+
+# Bump when the shape of a persisted result changes, so older entries are never read
+AGGREGATE_FORMAT = 2
+
+# Eviction trims the store to this fraction of its budget, so it does not run on every write
+_EVICT_TO = 0.9
+# Scratch files older than this were left by a process that died mid-write
+_STALE_SCRATCH_SECONDS = 3600
+# Empty dataset directories are removed once untouched this long; a younger one may be about to get an entry
+_EMPTY_DIR_SECONDS = 3600
+
+
+# ── Entry encoding: frames and dicts as plain arrays and JSON, loaded without pickle
+def _column(values) -> tuple:
+    """(dtype name, array) for a frame column or index level of numbers or non-missing strings."""
+    dtype = values.dtype
+    if dtype.kind in "biuf":
+        return str(dtype), np.asarray(values)
+    # An object column can hold anything (dates, say), so check the values rather than the dtype
+    if pd.api.types.infer_dtype(values, skipna=False) == "string" and not pd.isna(values).any():
+        return "str", np.asarray(values, dtype=np.str_)
+    raise TypeError(f"cannot persist a {dtype} column")
+
+
+def _json_scalar(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"cannot persist a {type(value).__name__} value")
+
+
+def _encode(value) -> bytes:
+    """An npz archive holding `value` (a DataFrame, or a dict of scalars) as plain arrays and JSON."""
+    arrays = {}
+    if isinstance(value, pd.DataFrame):
+        levels = [value.index.get_level_values(i) for i in range(value.index.nlevels)]
+        meta = {"kind": "frame", "columns": list(value.columns), "index": list(value.index.names),
+                "dtypes": [], "index_dtypes": []}
+        for i, level in enumerate(levels):
+            dtype, arrays[f"index{i}"] = _column(level)
+            meta["index_dtypes"].append(dtype)
+        for i, name in enumerate(value.columns):
+            dtype, arrays[f"column{i}"] = _column(value[name])
+            meta["dtypes"].append(dtype)
+    elif isinstance(value, dict):
+        meta = {"kind": "dict", "items": value}
+    else:
+        raise TypeError(f"cannot persist a {type(value).__name__}")
+    arrays["meta"] = np.array(json.dumps(meta, default=_json_scalar))
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _decode(payload: bytes):
+    """The value `_encode` wrote into `payload`."""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as archive:
+        meta = json.loads(str(archive["meta"]))
+        if meta["kind"] == "dict":
+            return meta["items"]
+        levels = [pd.Index(archive[f"index{i}"], dtype=dtype, name=name)
+                  for i, (name, dtype) in enumerate(zip(meta["index"], meta["index_dtypes"]))]
+        index = levels[0] if len(levels) == 1 else pd.MultiIndex.from_arrays(levels)
+        return pd.DataFrame({name: pd.array(archive[f"column{i}"], dtype=dtype)
+                             for i, (name, dtype) in enumerate(zip(meta["columns"], meta["dtypes"]))}, index=index)
+
+
+def _private_dir(path: Path):
+    """Create `path` readable by this user alone, refusing one another user owns or others may write."""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    stat = path.stat()
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    if stat.st_mode & 0o022:
+        raise PermissionError(f"{path} is writable by other users")
+
+
+class DiskAggregateStore:
+    """Aggregates per dataset fingerprint and key, shared by every process of this user on the host.
+
+    Entries live in one directory per dataset (see
+    IncrementalAggregates.fingerprint), so a process never reads another
+    dataset's results. Earlier datasets' entries are left for eviction, since
+    other processes may still serve those versions. Writes go to a scratch
+    file that is then renamed over the entry, so concurrent readers and
+    writers see either the old entry or the new one, never part of one.
+    Past the byte budget the least recently read entries go first, whatever
+    their dataset. Entries are npz archives of plain arrays, never pickles,
+    and the directory must belong to this user with no write access for others.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = int(AGGREGATE_DISK_MB * 2**20)):
+        self.root = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        _private_dir(self.root)
+        self.nbytes = sum(size for _, size, _ in self._entries())
+
+    @classmethod
+    def from_env(cls) -> "DiskAggregateStore":
+        """The store configured by the environment, or None when it is disabled."""
+        directory = os.environ.get(AGGREGATE_DIR_ENV, AGGREGATE_DIR)
+        max_mb = float(os.environ.get(AGGREGATE_DISK_MB_ENV, AGGREGATE_DISK_MB))
+        if not directory or max_mb <= 0:
+            return None
+        try:
+            return cls(directory, int(max_mb * 2**20))
+        except PermissionError:
+            logger.warning("not persisting aggregates: unsafe directory", exc_info=True)
+            return None
+
+    def _dataset_dir(self, dataset: str) -> Path:
+        return self.root / f"v{AGGREGATE_FORMAT}-{dataset}"
+
+    def _path(self, dataset: str, key) -> Path:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return self._dataset_dir(dataset) / f"{digest}.npz"
+
+    def _entries(self):
+        """(path, bytes, last read or written) of every entry, removing stale scratch files on the way."""
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+                if path.suffix == ".tmp":
+                    if time.time() - stat.st_mtime > _STALE_SCRATCH_SECONDS:
+                        path.unlink()
+                    continue
+            except OSError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def get(self, dataset: str, key, default=None):
+        """The result stored for `key` under `dataset`, or `default`."""
+        path = self._path(dataset, key)
+        try:
+            value = _decode(path.read_bytes())
+        except FileNotFoundError:
+            value = default
+        except Exception:
+            logger.warning("dropping unreadable aggregate %s", path, exc_info=True)
+            path.unlink(missing_ok=True)
+            value = default
+        else:
+            # The modification time doubles as last read, for eviction
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        with self._lock:
+            if value is default:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, dataset: str, key, value):
+        """Store `value` for `key` under `dataset`, replacing any previous entry atomically."""
+        path = self._path(dataset, key)
+        try:
+            payload = _encode(value)
+        except TypeError:
+            logger.warning("not persisting aggregate %s", path, exc_info=True)
+            return
+        scratch = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(mode=0o700, exist_ok=True)
+            scratch.write_bytes(payload)
+            # An overwritten entry's bytes leave the store as the new ones arrive
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(scratch, path)
+        except OSError:
+            logger.warning("could not persist aggregate %s", path, exc_info=True)
+            scratch.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self.writes += 1
+            self.nbytes += len(payload) - replaced
+            over = self.nbytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _evict(self):
+        # Least recently read first, across datasets, so no version is singled out
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes * _EVICT_TO:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        for directory in self.root.iterdir():
+            try:
+                if directory.is_dir() and time.time() - directory.stat().st_mtime > _EMPTY_DIR_SECONDS:
+                    directory.rmdir()
+            except OSError:
+                pass
+        with self._lock:
+            self.nbytes = total
+            self.evictions += evicted
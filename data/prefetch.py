@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from data.warmup import wait_idle
+
+logger = logging.getLogger(__name__)
+
+# Worker threads shared by every session's prefetch jobs, and the most jobs queued at once
+PREFETCH_WORKERS = 2
+PREFETCH_QUEUE = 32
+# Seconds a queued job waits for no rerun to be in progress before it is dropped
+PREFETCH_IDLE_WAIT = 10.0
+
+
+class Prefetcher:
+    """Runs speculative (label, callable) jobs for the view each session is on, on a bounded thread pool.
+
+    A session has one view's jobs outstanding at a time: submitting for a
+    new view cancels the session's queued jobs for the old one, and a job
+    that has become stale by the time a worker picks it up is skipped. Jobs
+    start only while no rerun is in progress, so prefetching never competes
+    with a session's rerun for the CPU; one that cannot start within
+    PREFETCH_IDLE_WAIT is dropped. Submissions past the queue bound are
+    dropped too.
+    """
+
+    def __init__(self, workers: int = PREFETCH_WORKERS, queue: int = PREFETCH_QUEUE):
+        self.queue = queue
+        self.completed = 0
+        self.cancelled = 0
+        self.dropped = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def pending(self) -> int:
+        """Jobs queued or running across all sessions."""
+        with self._lock:
+            return sum(not job.done() for _, jobs in self._views.values() for job in jobs)
+
+    def submit(self, session: str, view: str, jobs: list):
+        """Queue `jobs` for `session` now on `view`; resubmitting the same view is a no-op."""
+        with self._lock:
+            current = self._views.get(session)
+            if current is not None and current[0] == view:
+                return
+            if current is not None:
+                self.cancelled += sum(job.cancel() for job in current[1])
+            # Sessions whose jobs have all finished (or have gone away) are forgotten
+            self._views = {s: v for s, v in self._views.items() if not all(job.done() for job in v[1])}
+            room = self.queue - sum(not job.done() for _, queued in self._views.values() for job in queued)
+            self.dropped += max(len(jobs) - room, 0)
+            self._views[session] = (view, [
+                self._pool.submit(self._run, session, view, label, job) for label, job in jobs[:max(room, 0)]
+            ])
+
+    def _stale(self, session: str, view: str) -> bool:
+        with self._lock:
+            current = self._views.get(session)
+        return current is None or current[0] != view
+
+    def _count(self, outcome: str):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _run(self, session: str, view: str, label: str, job):
+        if not wait_idle(time.monotonic() + PREFETCH_IDLE_WAIT):
+            self._count("dropped")
+            return
+        if self._stale(session, view):
+            self._count("cancelled")
+            return
+        started = time.perf_counter()
+        try:
+            job()
+        except Exception:
+            logger.exception("prefetch %s for %s failed", label, view)
+            return
+        self._count("completed")
+        logger.debug("prefetched %s for %s in %.1f ms", label, view, (time.perf_counter() - started) * 1000)
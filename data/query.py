@@ -0,0 +1,640 @@
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from analytics.sampling import group_estimates
+from data.generate_data import add_derived_columns
+
+logger = logging.getLogger(__name__)
+
+# Filter bar key → (column, value meaning "no restriction")
+FILTER_COLUMNS = {
+    "card_type": ("card_type", "All Cards"),
+    "channel": ("transaction_channel", "All Channels"),
+    "fraud_type": ("fraud_type", "All Types"),
+}
+
+# Cube dimensions on top of day × card type × channel × fraud label × fraud type
+CUBE_DIMENSIONS = {
+    "calendar": [],
+    "hour": ["hour"],
+    "category": ["merchant_category"],
+    "age": ["age_group"],
+    "state": ["state", "state_name"],
+    "city": ["state", "state_name", "city"],
+}
+
+# Calendar columns a cube derives from its day instead of storing them
+CALENDAR_KEYS = ["date", "day_of_week", "month", "month_name", "week", "quarter"]
+
+ACCESS_PATHS = ["scan", "index", "rollup", "sample", "parallel", "live"]
+
+# Relative cost per row or cube cell touched; only the ratios matter
+_COST_PREDICATE = 1.0
+_COST_BITMAP = 0.05
+_COST_GATHER = 2.0
+_COST_GROUP = 3.0
+# Per partition task of a parallel pass: process hop and pickled partial sums
+_COST_TASK = 20_000.0
+
+# Byte budget of the process-wide AggregateCache
+AGGREGATE_CACHE_BYTES = 256 << 20
+
+_BASE_KEYS = ["card_type", "transaction_channel", "is_fraud", "fraud_type"]
+_COMPARE_VALUES = ["total", "fraud", "fraud_amount", "amount"]
+_SECONDS_PER_DAY = 86_400
+
+
+def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """Apply the filter bar selections to the transaction frame (the raw scan path)."""
+    filtered = df.copy()
+    start_ts = pd.Timestamp(filters["start_date"])
+    end_ts = pd.Timestamp(filters["end_date"]) + pd.Timedelta(days=1)
+    filtered = filtered[(filtered["timestamp"] >= start_ts) & (filtered["timestamp"] < end_ts)]
+
+    if filters["fraud_type"] != "All Types":
+        fraud_mask = (filtered["is_fraud"] == 0) | (filtered["fraud_type"] == filters["fraud_type"])
+        filtered = filtered[fraud_mask]
+
+    if filters["card_type"] != "All Cards":
+        filtered = filtered[filtered["card_type"] == filters["card_type"]]
+
+    if filters["channel"] != "All Channels":
+        filtered = filtered[filtered["transaction_channel"] == filters["channel"]]
+
+    return filtered
+
+
+def _days(timestamps) -> np.ndarray:
+    return np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64) // _SECONDS_PER_DAY
+
+
+def _day_range(filters: dict) -> tuple:
+    """First and last day number (inclusive) of the filter's date range."""
+    return (_days([pd.Timestamp(filters["start_date"])])[0], _days([pd.Timestamp(filters["end_date"])])[0])
+
+
+def selection_mask(frame: pd.DataFrame, filters: dict, day: np.ndarray) -> np.ndarray:
+    """Rows (or cube cells) of `frame` matching the filter selection, given each one's day number."""
+    first, last = _day_range(filters)
+    mask = (day >= first) & (day <= last)
+    for key, (column, everything) in FILTER_COLUMNS.items():
+        if filters[key] == everything:
+            continue
+        matches = (frame[column] == filters[key]).to_numpy()
+        mask &= (frame["is_fraud"].to_numpy() == 0) | matches if key == "fraud_type" else matches
+    return mask
+
+
+def selection_label(filters: dict) -> str:
+    """Short description of a filter selection, e.g. "Apr 01 – Jun 30 · Visa · Online"."""
+    start, end = pd.Timestamp(filters["start_date"]), pd.Timestamp(filters["end_date"])
+    parts = [f"{start:%b %d} – {end:%b %d}"]
+    parts += [filters[key] for key, (_, everything) in FILTER_COLUMNS.items() if filters[key] != everything]
+    return " · ".join(parts)
+
+
+def active_predicates(filters: dict) -> list:
+    """Filter bar keys that actually restrict rows (the date range always counts)."""
+    return ["date"] + [key for key, (_, everything) in FILTER_COLUMNS.items() if filters[key] != everything]
+
+
+class BitmapIndex:
+    """Packed bitmaps per value of the filter columns, and a day-sorted row order for date ranges.
+
+    A selection ANDs one bitmap per restricted column (fraud type ORs in the
+    legitimate rows, matching the filter bar) over n/8 bytes each, instead of
+    comparing every row's strings. Value counts give selectivity estimates.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n = len(df)
+        self._bitmaps = {}
+        self._counts = {}
+        for _, (column, _) in FILTER_COLUMNS.items():
+            codes, uniques = pd.factorize(df[column])
+            self._bitmaps[column] = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+            self._counts[column] = dict(zip(uniques, np.bincount(codes[codes >= 0], minlength=len(uniques))))
+        legit = df["is_fraud"].to_numpy() == 0
+        self._legit = np.packbits(legit)
+        self._legit_count = int(legit.sum())
+        day = _days(df["timestamp"].to_numpy())
+        self._order = np.argsort(day, kind="stable")
+        self._sorted_days = day[self._order]
+
+    def _date_bounds(self, filters: dict) -> tuple:
+        first, last = _day_range(filters)
+        return (np.searchsorted(self._sorted_days, first, side="left"),
+                np.searchsorted(self._sorted_days, last, side="right"))
+
+    def estimate_rows(self, filters: dict) -> float:
+        """Expected matching rows, assuming the filter columns are independent."""
+        if self.n == 0:
+            return 0.0
+        lo, hi = self._date_bounds(filters)
+        rows = float(hi - lo)
+        for key, (column, everything) in FILTER_COLUMNS.items():
+            value = filters[key]
+            if value == everything:
+                continue
+            matching = self._counts[column].get(value, 0)
+            if key == "fraud_type":
+                matching += self._legit_count
+            rows *= matching / self.n
+        return rows
+
+    def positions(self, filters: dict) -> np.ndarray:
+        """Row positions matching the filter selection, in frame order."""
+        lo, hi = self._date_bounds(filters)
+        if lo == 0 and hi == self.n:
+            packed = np.full((self.n + 7) // 8, 0xFF, dtype=np.uint8)
+        else:
+            in_range = np.zeros(self.n, dtype=bool)
+            in_range[self._order[lo:hi]] = True
+            packed = np.packbits(in_range)
+        for key, (column, everything) in FILTER_COLUMNS.items():
+            value = filters[key]
+            if value == everything:
+                continue
+            bitmap = self._bitmaps[column].get(value, np.zeros_like(packed))
+            if key == "fraud_type":
+                bitmap = bitmap | self._legit
+            packed = packed & bitmap
+        return np.flatnonzero(np.unpackbits(packed, count=self.n))
+
+
+class RollupCube:
+    """Transaction, fraud and fraud-amount totals pre-aggregated per cell, one table per CUBE_DIMENSIONS entry.
+
+    Every cell is a day × card type × channel × fraud label × fraud type
+    combination (plus the cube's own dimensions), so any filter bar
+    selection is a filter over cells and any grouping by those columns, or
+    by a calendar column derived from the day, is a sum over cells.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensions: dict = None):
+        dimensions = dimensions or CUBE_DIMENSIONS
+        fraud = df["is_fraud"].to_numpy() == 1
+        values = pd.DataFrame({
+            "total": np.ones(len(df), dtype=np.int64),
+            "fraud": fraud.astype(np.int64),
+            "fraud_amount": np.where(fraud, df["amount"].to_numpy(dtype=float), 0.0),
+            "amount": df["amount"].to_numpy(dtype=float),
+        }, index=df.index)
+        day = pd.Series(_days(df["timestamp"].to_numpy()), index=df.index, name="day")
+        self.dimensions = dimensions
+        self.tables = {}
+        for name, dims in dimensions.items():
+            keys = [day] + [df[k] for k in _BASE_KEYS + dims]
+            self.tables[name] = values.groupby(keys, dropna=False, observed=True).sum().reset_index()
+
+        days = pd.Index(np.unique(day.to_numpy()), name="day")
+        calendar = pd.DataFrame({"timestamp": pd.to_datetime(days.to_numpy(), unit="D")}, index=days)
+        self._calendar = add_derived_columns(calendar)[CALENDAR_KEYS]
+
+    def cube_for(self, keys: list) -> str:
+        """Smallest cube that can group by `keys`, or None."""
+        covering = [name for name, dims in self.dimensions.items()
+                    if set(keys) <= set(dims) | set(_BASE_KEYS) | set(CALENDAR_KEYS) | {"day"}]
+        return min(covering, key=lambda name: len(self.tables[name]), default=None)
+
+    def cells(self, name: str) -> int:
+        return len(self.tables[name])
+
+    def with_calendar(self, cells: pd.DataFrame, keys: list) -> pd.DataFrame:
+        """`cells` with any calendar columns in `keys` joined on from their day."""
+        calendar = [k for k in keys if k in CALENDAR_KEYS and k not in cells.columns]
+        return cells.join(self._calendar[calendar], on="day") if calendar else cells
+
+    def groups(self, keys: list, filters: dict, fraud_only: bool = False) -> pd.DataFrame:
+        """Group totals in the shape of analytics.sampling.group_estimates (rate_err is 0)."""
+        table = self.tables[self.cube_for(keys)]
+        mask = selection_mask(table, filters, table["day"].to_numpy())
+        if fraud_only:
+            mask &= table["is_fraud"].to_numpy() == 1
+        cells = self.with_calendar(table[mask], keys)
+        result = cells.groupby(keys, observed=True)[["total", "fraud", "fraud_amount"]].sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["rate"] = result["fraud"] / result["total"] * 100
+        result["rate_err"] = 0.0
+        return result
+
+
+def _result_bytes(value) -> int:
+    """Approximate bytes held by a cached result: frames by memory usage, figures by their trace arrays."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if hasattr(value, "data") and hasattr(value, "layout"):
+        size = sys.getsizeof(value)
+        for trace in value.data:
+            for item in trace.to_plotly_json().values():
+                size += item.nbytes if hasattr(item, "nbytes") else 8 * len(item) if isinstance(item, (list, tuple)) else 0
+        return size
+    return sys.getsizeof(value)
+
+
+class AggregateCache:
+    """Process-wide results per view (groupings, figures), least recently used first out past a byte budget.
+
+    Keys start with the planner's view (dataset version, filter state and
+    mode), so every session looking at the same view shares one entry, and
+    entries of superseded versions age out. Results are computed outside the
+    lock; two sessions missing the same key at once both compute it.
+    """
+
+    def __init__(self, max_bytes: int = AGGREGATE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = _result_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def get_or_compute(self, key, compute):
+        """The cached result for `key`, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+
+class QueryPlanner:
+    """Answers one filter selection's aggregations by the cheapest access path.
+
+    Paths: `scan` filters the full frame column by column, `index` combines
+    bitmaps, `rollup` sums cube cells, `sample` reweights the stratified
+    sample (only when approximate answers are allowed) and `parallel` reads
+    the selection's one pass of a data.parallel.PartitionedAggregator over
+    worker processes (free once that pass has run). Each request is
+    costed from row counts and cube sizes, run on the cheapest path, and
+    recorded with its timing in `log`. A `live` store
+    (data.incremental.IncrementalAggregates) answers every grouping its
+    rollups cover, on the `live` path, whatever the costs: its rollups
+    include batches newer than `frame`, so give it only to planners of the
+    unfiltered view. Filtered rows are materialised once
+    and reused by later row-based requests. With a shared `cache` and the
+    `view` the planner answers, groupings (and anything passed to `memo`)
+    are computed once per view across sessions. With a `disk` store and the
+    `dataset` fingerprint, groupings (and `memo` results asked to persist)
+    also survive restarts; only exact planners should be given one.
+    """
+
+    def __init__(self, frame: pd.DataFrame, filters: dict, index: BitmapIndex = None, cube: RollupCube = None,
+                 sample: pd.DataFrame = None, approximate: bool = False, cache: AggregateCache = None,
+                 view: str = None, parallel=None, disk=None, dataset: str = None, live=None):
+        self.frame_all = frame
+        self.filters = filters
+        self.index = index
+        self.cube = cube
+        self.sample = sample if approximate else None
+        self.parallel = parallel
+        self.cache = cache if view is not None else None
+        self.view = view
+        # Live answers are newer than the dataset fingerprint, so they are never persisted
+        self.disk = disk if dataset is not None and live is None else None
+        self.dataset = dataset
+        self.live = live
+        self.log = []
+        self._rows = None
+        self._rows_path = None
+
+    # ── Costs
+    def _materialise_costs(self) -> dict:
+        n = len(self.frame_all)
+        selected = self.index.estimate_rows(self.filters) if self.index is not None else n
+        predicates = len(active_predicates(self.filters))
+        costs = {"scan": n * predicates * _COST_PREDICATE + selected * _COST_GATHER}
+        if self.index is not None:
+            costs["index"] = n * (predicates + 1) * _COST_BITMAP + selected * _COST_GATHER
+        return costs
+
+    def costs(self, keys: list) -> dict:
+        """Estimated cost of answering a grouping by `keys` on each feasible path."""
+        group = len(keys) * _COST_GROUP
+        if self._rows is not None:
+            costs = {self._rows_path: len(self._rows) * group}
+        else:
+            selected = self.index.estimate_rows(self.filters) if self.index is not None else len(self.frame_all)
+            costs = {path: cost + selected * group for path, cost in self._materialise_costs().items()}
+        if self.cube is not None:
+            name = self.cube.cube_for(keys)
+            if name is not None:
+                cells = self.cube.cells(name)
+                costs["rollup"] = cells * len(active_predicates(self.filters)) * _COST_PREDICATE + cells * group
+        if self.sample is not None:
+            costs["sample"] = len(self.sample) * (group + 2 * _COST_GROUP)
+        if self.parallel is not None and self.parallel.covers(keys):
+            if self.parallel.has(self.filters):
+                costs["parallel"] = 0.0
+            else:
+                selected = self.index.estimate_rows(self.filters) if self.index is not None else len(self.frame_all)
+                scan = len(self.frame_all) * len(active_predicates(self.filters)) * _COST_PREDICATE
+                per_worker = (scan + selected * _COST_GROUP * self.parallel.groupings) / self.parallel.workers
+                costs["parallel"] = per_worker + len(self.parallel.store.partitions) * _COST_TASK
+        if self.live is not None and self.live.covers(keys):
+            costs["live"] = 0.0
+        return costs
+
+    # ── Execution
+    def _record(self, label: str, keys: list, path: str, costs: dict, started: float, rows_out: int):
+        entry = {
+            "chart": label,
+            "keys": " × ".join(keys),
+            "path": path,
+            "cost": costs.get(path, 0.0),
+            "alternatives": ", ".join(f"{p} {c:,.0f}" for p, c in sorted(costs.items(), key=lambda kv: kv[1])),
+            "rows_out": rows_out,
+            "ms": (time.perf_counter() - started) * 1000,
+        }
+        self.log.append(entry)
+        logger.info("plan %(chart)s [%(keys)s] via %(path)s in %(ms).1f ms (%(alternatives)s)", entry)
+
+    def rows(self) -> pd.DataFrame:
+        """The filtered transactions, materialised once by the cheaper of scan and index."""
+        if self._rows is None:
+            started = time.perf_counter()
+            costs = self._materialise_costs()
+            path = min(costs, key=costs.get)
+            if path == "index":
+                self._rows = self.frame_all.iloc[self.index.positions(self.filters)]
+            else:
+                self._rows = apply_filters(self.frame_all, self.filters)
+            self._rows_path = path
+            self._record("filtered rows", [], path, costs, started, len(self._rows))
+        return self._rows
+
+    def frame(self) -> pd.DataFrame:
+        """Rows behind approximate-or-exact answers: the filtered sample when one is in use, else rows()."""
+        return self.sample if self.sample is not None else self.rows()
+
+    def _persisted(self, key):
+        """The result stored on disk for this selection and `key`, also cached in memory; None if absent."""
+        if self.disk is None:
+            return None
+        value = self.disk.get(self.dataset, (sorted(self.filters.items()), *key))
+        if value is not None and self.cache is not None:
+            self.cache.put((self.view, *key), value)
+        return value
+
+    def _persist(self, key, value):
+        if self.disk is not None:
+            self.disk.put(self.dataset, (sorted(self.filters.items()), *key), value)
+
+    def memo(self, key, compute, persist: bool = False):
+        """`compute()`, shared through the aggregate cache under this view and `key` when there is one.
+
+        With `persist`, the result (a frame or a dict) is also read from and written to the disk store.
+        """
+        if not persist:
+            return compute() if self.cache is None else self.cache.get_or_compute((self.view, *key), compute)
+        value = self.cache.get((self.view, *key)) if self.cache is not None else None
+        if value is None:
+            value = self._persisted(key)
+        if value is None:
+            value = compute()
+            if self.cache is not None:
+                self.cache.put((self.view, *key), value)
+            self._persist(key, value)
+        return value
+
+    def groups(self, keys, fraud_only: bool = False, label: str = "") -> pd.DataFrame:
+        """Per-group totals, fraud, fraud amount, rate and rate_err, as analytics.sampling.group_estimates."""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        key = ("groups", tuple(keys), fraud_only)
+        started = time.perf_counter()
+        cached = self.cache.get((self.view, *key)) if self.cache is not None else None
+        if cached is not None:
+            self._record(label, keys, "cache", {}, started, len(cached))
+            return cached.copy()
+        stored = self._persisted(key)
+        if stored is not None:
+            self._record(label, keys, "disk", {}, started, len(stored))
+            return stored.copy()
+        costs = self.costs(keys)
+        path = "live" if "live" in costs else min(costs, key=costs.get)
+        started = time.perf_counter()
+        if path == "live":
+            result = self.live.groups(keys, fraud_only)
+        elif path == "rollup":
+            result = self.cube.groups(keys, self.filters, fraud_only)
+        elif path == "parallel":
+            result = self.parallel.groups(keys, self.filters, fraud_only)
+        else:
+            rows = self.sample if path == "sample" else self.rows()
+            result = group_estimates(rows[rows["is_fraud"] == 1] if fraud_only else rows, keys)
+        self._record(label, keys, path, costs, started, len(result))
+        if self.cache is not None:
+            self.cache.put((self.view, *key), result.copy())
+        self._persist(key, result)
+        return result
+
+    def plan_table(self) -> pd.DataFrame:
+        """The plans chosen so far, one row per request."""
+        return pd.DataFrame(self.log, columns=["chart", "keys", "path", "cost", "alternatives", "rows_out", "ms"])
+
+
+class ComparisonQuery:
+    """Baseline and comparison answers for the same grouping from one aggregation pass.
+
+    Every row (or rollup cell) in either selection gets a side code: bit 0
+    for the baseline, bit 1 for the comparison, so rows in both selections
+    are counted once. A single groupby over the keys plus that code gives
+    both sides; each side then sums the codes that include it. The union
+    of the two selections is found once per cube and once for the rows,
+    then reused by every grouping. Groupings a rollup cube covers are
+    answered from its cells, the rest from the rows. A `day` key groups by
+    day number.
+    """
+
+    SIDES = ("baseline", "comparison")
+
+    def __init__(self, frame: pd.DataFrame, baseline: dict, comparison: dict, cube: RollupCube = None):
+        self.frame_all = frame
+        self.filters = {"baseline": baseline, "comparison": comparison}
+        self.cube = cube
+        self.labels = {side: selection_label(filters) for side, filters in self.filters.items()}
+        self.log = []
+        self._cells = {}
+        self._union = None
+
+    def _side_codes(self, table: pd.DataFrame, day: np.ndarray) -> np.ndarray:
+        return (selection_mask(table, self.filters["baseline"], day).astype(np.int8)
+                | selection_mask(table, self.filters["comparison"], day).astype(np.int8) << 1)
+
+    def _cube_cells(self, name: str) -> pd.DataFrame:
+        """Cells of one cube in either selection, with their side code."""
+        if name not in self._cells:
+            table = self.cube.tables[name]
+            codes = self._side_codes(table, table["day"].to_numpy())
+            self._cells[name] = table[codes > 0].assign(_side=codes[codes > 0])
+        return self._cells[name]
+
+    def _union_rows(self) -> pd.DataFrame:
+        """Rows in either selection with their day number, side code and the totals they add."""
+        if self._union is None:
+            day = _days(self.frame_all["timestamp"].to_numpy())
+            codes = self._side_codes(self.frame_all, day)
+            keep = codes > 0
+            rows = self.frame_all[keep]
+            fraud = rows["is_fraud"].to_numpy() == 1
+            amount = rows["amount"].to_numpy(dtype=float)
+            self._union = rows.assign(
+                day=day[keep], _side=codes[keep], total=np.int64(1), fraud=fraud.astype(np.int64),
+                fraud_amount=np.where(fraud, amount, 0.0),
+            )
+        return self._union
+
+    def _aggregate(self, keys: list, fraud_only: bool) -> tuple:
+        """Group index, {side: summed _COMPARE_VALUES per group} from one groupby, and the path used.
+
+        Each side's value columns are the cell values masked by that side's
+        bit, so both sides are summed by the same groupby.
+        """
+        name = self.cube.cube_for(keys) if self.cube is not None else None
+        if name is not None:
+            cells, path = self.cube.with_calendar(self._cube_cells(name), keys), "rollup"
+        else:
+            cells, path = self._union_rows(), "scan"
+        if fraud_only:
+            cells = cells[cells["fraud"] > 0]
+        values = cells[_COMPARE_VALUES].to_numpy(dtype=float)
+        codes = cells["_side"].to_numpy()
+        wide = np.hstack([values * ((codes >> bit) & 1)[:, None] for bit in range(len(self.SIDES))])
+        if keys:
+            table = pd.DataFrame(wide, index=cells.index).groupby([cells[k] for k in keys], observed=True).sum()
+            index, sums = table.index, table.to_numpy()
+        else:
+            index, sums = pd.RangeIndex(1), wide.sum(axis=0, keepdims=True)
+        width = len(_COMPARE_VALUES)
+        return index, {side: sums[:, i * width:(i + 1) * width] for i, side in enumerate(self.SIDES)}, path
+
+    def _record(self, label: str, keys: list, path: str, started: float, rows_out: int):
+        entry = {
+            "chart": label,
+            "keys": " × ".join(keys),
+            "path": f"{path} (compare)",
+            "cost": 0.0,
+            "alternatives": "",
+            "rows_out": rows_out,
+            "ms": (time.perf_counter() - started) * 1000,
+        }
+        self.log.append(entry)
+        logger.info("plan %(chart)s [%(keys)s] via %(path)s in %(ms).1f ms", entry)
+
+    def groups(self, keys, fraud_only: bool = False, label: str = "") -> dict:
+        """{side: per-group totals in the shape of group_estimates} for both selections."""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        started = time.perf_counter()
+        index, sums, path = self._aggregate(keys, fraud_only)
+        result = {}
+        for side, block in sums.items():
+            # Groups only the other selection reaches have no transactions on this side
+            present = block[:, 0] > 0
+            total, fraud = block[present, 0].round(), block[present, 1].round()
+            result[side] = pd.DataFrame({
+                "total": total.astype(np.int64),
+                "fraud": fraud.astype(np.int64),
+                "fraud_amount": block[present, 2],
+                "rate": fraud / total * 100,
+                "rate_err": 0.0,
+            }, index=index[present])
+        self._record(label, keys, path, started, sum(len(part) for part in result.values()))
+        return result
+
+    def deltas(self, keys, label: str = "") -> pd.DataFrame:
+        """Both sides per group side by side, with comparison minus baseline for rate (points) and fraud.
+
+        `rate_delta` is NaN for groups with no transactions on one side: a
+        missing rate is not a 0% rate.
+        """
+        sides = self.groups(keys, label=label)
+        joined = sides["baseline"].join(sides["comparison"], how="outer", lsuffix="_baseline", rsuffix="_comparison")
+        for column in ["total", "fraud", "fraud_amount"]:
+            joined[[f"{column}_baseline", f"{column}_comparison"]] = (
+                joined[[f"{column}_baseline", f"{column}_comparison"]].fillna(0)
+            )
+        both = (joined["total_baseline"] > 0) & (joined["total_comparison"] > 0)
+        joined["rate_delta"] = (joined["rate_comparison"] - joined["rate_baseline"]).where(both)
+        joined["fraud_delta"] = joined["fraud_comparison"] - joined["fraud_baseline"]
+        return joined.drop(columns=["rate_err_baseline", "rate_err_comparison"])
+
+    def aligned_weeks(self, label: str = "") -> dict:
+        """{side: weekly totals and rate}, indexed by week since that selection's start date (from 1)."""
+        result = {}
+        for side, daily in self.groups("day", label=label).items():
+            first, _ = _day_range(self.filters[side])
+            weekly = daily.groupby((daily.index.to_numpy() - first) // 7 + 1)[["total", "fraud"]].sum()
+            weekly["rate"] = weekly["fraud"] / weekly["total"] * 100
+            result[side] = weekly.rename_axis("week")
+        return result
+
+    def stats(self) -> dict:
+        """{side: KPI totals in the shape of compute_stats} for both selections."""
+        started = time.perf_counter()
+        _, sums, path = self._aggregate([], fraud_only=False)
+        result = {}
+        for side, block in sums.items():
+            total, fraud, fraud_amount, amount = block[0]
+            total, fraud = int(round(total)), int(round(fraud))
+            result[side] = {
+                "total_transactions": total,
+                "fraud_count": fraud,
+                "fraud_rate": fraud / total * 100 if total else 0.0,
+                "fraud_amount": float(fraud_amount),
+                "avg_fraud_amount": float(fraud_amount / fraud) if fraud else float("nan"),
+                "total_amount": float(amount),
+                "legitimate_count": total - fraud,
+            }
+        self._record("comparison KPIs", [], path, started, len(self.SIDES))
+        return result
+
+    def plan_table(self) -> pd.DataFrame:
+        return pd.DataFrame(self.log, columns=["chart", "keys", "path", "cost", "alternatives", "rows_out", "ms"])
+
+
+def grouped(source, keys, label: str = "", fraud_only: bool = False) -> pd.DataFrame:
+    """`group_estimates` over a frame, or the planner's cheapest answer when `source` is a QueryPlanner."""
+    if isinstance(source, QueryPlanner):
+        return source.groups(keys, fraud_only=fraud_only, label=label)
+    rows = source[source["is_fraud"] == 1] if fraud_only else source
+    return group_estimates(rows, keys)
+
+
+def source_rows(source) -> pd.DataFrame:
+    """Transaction rows behind `source`: the frame itself, or the planner's rows (or sample)."""
+    return source.frame() if isinstance(source, QueryPlanner) else source
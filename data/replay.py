@@ -0,0 +1,201 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.incremental import IncrementalAggregates
+
+# Trailing windows shown in the live KPI row, in seconds
+LIVE_WINDOWS = {
+    "Last Hour": 3_600,
+    "Last 24h": 86_400,
+    "Last 7 Days": 604_800,
+}
+
+# Replay speed-up factors offered in the UI (simulated seconds per wall second)
+REPLAY_SPEEDS = {
+    "1 hour / sec": 3_600,
+    "1 day / sec": 86_400,
+    "1 week / sec": 604_800,
+}
+
+_BUCKET_SECONDS = 60
+_TICK_SECONDS = 0.2
+
+
+def _epoch_seconds(timestamps: pd.Series) -> np.ndarray:
+    return timestamps.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+class SlidingWindowKPIs:
+    """Trailing-window KPIs kept in a ring buffer of per-minute buckets.
+
+    One ring covers the longest window. Each window keeps a running sum that
+    new rows are added to and expired buckets are subtracted from as the
+    clock moves, so neither ingest nor reads ever rescan history.
+    """
+
+    def __init__(self, windows: dict = None, bucket_seconds: int = _BUCKET_SECONDS):
+        windows = windows or LIVE_WINDOWS
+        self.bucket_seconds = bucket_seconds
+        self.spans = {label: max(1, seconds // bucket_seconds) for label, seconds in windows.items()}
+        self.size = max(self.spans.values())
+        # Columns: transactions, fraud, amount, fraud amount
+        self._ring = np.zeros((self.size, 4))
+        self._sums = {label: np.zeros(4) for label in self.spans}
+        self._head = None
+
+    def advance(self, epoch_seconds: int):
+        """Move the window clock forward, expiring buckets that fall out of each window."""
+        bucket = int(epoch_seconds) // self.bucket_seconds
+        if self._head is None:
+            self._head = bucket
+            return
+        if bucket <= self._head:
+            return
+
+        for label, span in self.spans.items():
+            if bucket - self._head >= span:
+                self._sums[label][:] = 0
+            else:
+                leaving = np.arange(self._head - span + 1, bucket - span + 1) % self.size
+                self._sums[label] -= self._ring[leaving].sum(axis=0)
+
+        expired = np.arange(max(self._head + 1, bucket - self.size + 1), bucket + 1) % self.size
+        self._ring[expired] = 0
+        self._head = bucket
+
+    def ingest(self, epoch_seconds: np.ndarray, amount: np.ndarray, is_fraud: np.ndarray):
+        """Add a batch of transactions; rows older than the longest window are ignored."""
+        if len(epoch_seconds) == 0:
+            return
+        self.advance(epoch_seconds.max())
+
+        buckets = epoch_seconds // self.bucket_seconds
+        live = buckets > self._head - self.size
+        buckets = buckets[live]
+        fraud = is_fraud[live].astype(float)
+        values = np.column_stack([np.ones(len(buckets)), fraud, amount[live], amount[live] * fraud])
+
+        slots = buckets % self.size
+        for col in range(4):
+            self._ring[:, col] += np.bincount(slots, weights=values[:, col], minlength=self.size)
+        for label, span in self.spans.items():
+            self._sums[label] += values[buckets > self._head - span].sum(axis=0)
+
+    def kpis(self) -> dict:
+        """Per-window transaction count, fraud count, fraud rate and amounts."""
+        result = {}
+        for label, (total, fraud, amount, fraud_amount) in self._sums.items():
+            total = int(round(total))
+            fraud = int(round(fraud))
+            result[label] = {
+                "total": total,
+                "fraud": fraud,
+                "fraud_rate": fraud / total * 100 if total else 0.0,
+                "amount": float(amount),
+                "fraud_amount": float(fraud_amount),
+            }
+        return result
+
+
+class StreamReplayer:
+    """Feeds transactions into the live store as a time-ordered stream.
+
+    A background thread maps wall-clock time onto simulated time at the
+    chosen speed-up and, every tick, hands the rows that have come due to
+    the sliding windows and to the store's incremental append.
+    """
+
+    def __init__(self, store: IncrementalAggregates):
+        self.store = store
+        self.windows = SlidingWindowKPIs()
+        self.speedup = 0
+        self.sim_time = None
+        self.ingested = 0
+        self._source = None
+        # History taken aside by a replay that emptied the store, until it finishes or stops
+        self._saved = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def progress(self) -> float:
+        return self.ingested / len(self._source) if self._source is not None and len(self._source) else 0.0
+
+    def start(self, source: pd.DataFrame, speedup: float, reset_store: bool = False):
+        """Start streaming `source` at `speedup` simulated seconds per wall second.
+
+        With `reset_store` the store is emptied first so the dashboard fills
+        up as the replay progresses (used when replaying the base dataset);
+        stopping before the end puts the history back.
+        """
+        self.stop()
+        self.load(source, reset_store)
+        self.speedup = speedup
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stream-replay", daemon=True)
+        self._thread.start()
+
+    def load(self, source: pd.DataFrame, reset_store: bool = False):
+        """Queue `source` for replay without starting the clock; drive it with `step`."""
+        self._source = source.sort_values("timestamp", kind="stable").reset_index(drop=True)
+        self._epochs = _epoch_seconds(self._source["timestamp"])
+        self.windows = SlidingWindowKPIs()
+        self.sim_time = int(self._epochs[0]) if len(self._epochs) else None
+        self.ingested = 0
+        if reset_store:
+            if self._saved is None:
+                self._saved = self.store.frame()
+            self.store.reset(self._source.iloc[:0])
+
+    def stop(self):
+        """Stop streaming; a replay that emptied the store and has not finished restores its history."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._saved is not None:
+            self.store.reset(self._saved)
+            self._saved = None
+
+    def step(self, sim_time: int):
+        """Ingest every row with a timestamp up to `sim_time` (epoch seconds)."""
+        end = int(np.searchsorted(self._epochs, sim_time, side="right"))
+        if end > self.ingested:
+            batch = self._source.iloc[self.ingested:end]
+            self.windows.ingest(
+                self._epochs[self.ingested:end],
+                batch["amount"].to_numpy(dtype=float),
+                batch["is_fraud"].to_numpy(),
+            )
+            self.store.append(batch)
+            self.ingested = end
+            if end == len(self._source):
+                # Every row is back in the store, so there is nothing left to restore
+                self._saved = None
+        self.windows.advance(sim_time)
+        self.sim_time = sim_time
+
+    def _run(self):
+        wall_start = time.monotonic()
+        sim_start = self.sim_time
+        while not self._stop.is_set() and self.ingested < len(self._source):
+            elapsed = time.monotonic() - wall_start
+            self.step(sim_start + int(elapsed * self.speedup))
+            self._stop.wait(_TICK_SECONDS)
+
+
+def shift_to_follow(source: pd.DataFrame, last_timestamp: pd.Timestamp) -> pd.DataFrame:
+    """Move a generated dataset in time so it starts right after `last_timestamp`.
+
+    IDs are dropped so the store numbers the rows after its own.
+    """
+    shifted = source.drop(columns=["transaction_id"]).copy()
+    shifted["timestamp"] = shifted["timestamp"] + (last_timestamp - shifted["timestamp"].min()) + pd.Timedelta(seconds=1)
+    return shifted
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import resource
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Setting this appends every filter selection sessions move to, one JSON line each
+USAGE_LOG_ENV = "DASHBOARD_USAGE_LOG"
+# Warm-up budget: wall seconds from start, and MB of process RSS growth (0 seconds disables it)
+WARMUP_SECONDS_ENV = "DASHBOARD_WARMUP_SECONDS"
+WARMUP_MB_ENV = "DASHBOARD_WARMUP_MB"
+WARMUP_SECONDS = 120.0
+WARMUP_MB = 512.0
+
+# Most frequent logged selections warmed, and the log lines they are counted over
+WARMUP_VIEWS = 5
+USAGE_HISTORY = 50_000
+
+_DATE_KEYS = ("start_date", "end_date")
+_IDLE_POLL_SECONDS = 0.05
+
+# Reruns in progress across all sessions; background warm-up and prefetch wait for zero
+_active = 0
+_idle = threading.Condition()
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process, in MB (peak RSS where /proc is unavailable)."""
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        return int(statm.read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+@contextmanager
+def serving():
+    """Mark a session's rerun as in progress for the duration of the `with` block."""
+    global _active
+    with _idle:
+        _active += 1
+    try:
+        yield
+    finally:
+        with _idle:
+            _active -= 1
+            _idle.notify_all()
+
+
+def wait_idle(deadline: float) -> bool:
+    """Block until no rerun is in progress; False if `deadline` (monotonic) passes first."""
+    with _idle:
+        while _active:
+            if time.monotonic() >= deadline:
+                return False
+            _idle.wait(_IDLE_POLL_SECONDS)
+    return True
+
+
+class UsageLog:
+    """Filter selections sessions moved to, appended as JSON lines, so warm-up can learn the popular ones."""
+
+    def __init__(self, path: str = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "UsageLog":
+        return cls(os.environ.get(USAGE_LOG_ENV))
+
+    def record(self, filters: dict):
+        if self.path is None:
+            return
+        line = json.dumps({"ts": time.time(), "filters": filters}, default=str, sort_keys=True)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as log:
+                log.write(line + "\n")
+
+    def popular(self, k: int = WARMUP_VIEWS, history: int = USAGE_HISTORY) -> list:
+        """The `k` most frequent selections among the last `history` lines, most frequent first."""
+        if self.path is None or not self.path.exists():
+            return []
+        with self._lock, self.path.open() as log:
+            lines = deque(log, maxlen=history)
+        counts = Counter()
+        for line in lines:
+            try:
+                counts[json.dumps(json.loads(line)["filters"], sort_keys=True)] += 1
+            except (ValueError, KeyError):
+                continue
+        selections = []
+        for encoded, _ in counts.most_common(k):
+            filters = json.loads(encoded)
+            for key in _DATE_KEYS:
+                filters[key] = date.fromisoformat(filters[key])
+            selections.append(filters)
+        return selections
+
+
+class WarmUp:
+    """Runs (label, callable) steps in order on a background thread, within a time and a memory budget.
+
+    Each step starts only while no session is mid-rerun (see `serving`), so
+    warm-up fills idle time and a session waits at most for the step already
+    in flight. Warm-up stops before the first step that would start past the
+    time budget or after RSS has grown by more than the memory budget. A
+    failing step is logged and skipped.
+    """
+
+    def __init__(self, seconds: float = WARMUP_SECONDS, memory_mb: float = WARMUP_MB):
+        self.seconds = seconds
+        self.memory_mb = memory_mb
+        self.state = "idle"
+        self.steps = []
+        self._thread = None
+
+    @classmethod
+    def from_env(cls) -> "WarmUp":
+        return cls(float(os.environ.get(WARMUP_SECONDS_ENV, WARMUP_SECONDS)),
+                   float(os.environ.get(WARMUP_MB_ENV, WARMUP_MB)))
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, steps: list) -> "WarmUp":
+        if self.seconds <= 0:
+            self.state = "disabled"
+            return self
+        self.state = "running"
+        self._thread = threading.Thread(target=self._run, args=(steps,), name="cache-warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def join(self, timeout: float = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, steps: list):
+        began = time.monotonic()
+        deadline = began + self.seconds
+        baseline = rss_mb()
+        for label, step in steps:
+            if not wait_idle(deadline) or time.monotonic() >= deadline:
+                self.state = "stopped: time budget"
+                break
+            if rss_mb() - baseline > self.memory_mb:
+                self.state = "stopped: memory budget"
+                break
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception:
+                logger.exception("warm-up step %s failed", label)
+                continue
+            self.steps.append({"step": label, "ms": (time.perf_counter() - started) * 1000})
+        else:
+            self.state = "done"
+        logger.info("warm-up %s after %d steps in %.1f s (RSS +%.0f MB)",
+                    self.state, len(self.steps), time.monotonic() - began, rss_mb() - baseline)
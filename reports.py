@@ -0,0 +1,295 @@
+"""Headless batch report renderer: every dashboard tab for each filter combination, as static HTML.
+
+No Streamlit server runs. Each worker process loads the dataset once and
+builds what the dashboard would: the enriched frame, bitmap index, rollup
+cube, travel pairs and fraud model. It then renders combinations through the
+same tab functions, with their streamlit calls captured into HTML (see
+components/capture.py); widgets keep their default values. Groupings and
+KPI totals go through the query planner, so they share the dashboard's
+on-disk aggregate store.
+
+By default the combinations are each card network (and all cards) times each
+fraud type (and all types) over the full date range. --combinations reads
+filter selections from a JSON-lines file instead, one object per line with
+any of start_date, end_date, fraud_type, card_type and channel; keys left
+out mean no restriction.
+
+Plotly's JavaScript is written once, to plotly.min.js beside the reports, and
+every report loads it from there, so a copied directory works offline.
+--inline-js embeds it in each report instead, for single-file reports. An
+index.html links every report.
+
+Usage: python reports.py [--out reports] [--workers 4] [--tabs overview trends ...] [--combinations FILE]
+"""
+import argparse
+import html
+import importlib
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from itertools import product
+from multiprocessing import get_context
+from pathlib import Path
+
+from plotly.offline import get_plotlyjs
+
+from analytics.bursts import add_burst_features
+from analytics.model import LogisticFraudModel
+from analytics.sampling import estimate_stats
+from analytics.travel import add_travel_features, impossible_travel_pairs
+from analytics.velocity import add_velocity_features
+from components.capture import capture_page, inline_fragments
+from components.styles import COLORS
+from data.generate_data import CARD_TYPES, FRAUD_TYPES, generate_fraud_dataset
+from data.incremental import IncrementalAggregates
+from data.persist import DiskAggregateStore
+from data.query import FILTER_COLUMNS, AggregateCache, BitmapIndex, QueryPlanner, RollupCube, selection_label
+
+logger = logging.getLogger(__name__)
+
+# Report sections in dashboard order, by tabs/ module
+REPORT_TABS = {
+    "overview": "Executive Overview",
+    "trends": "Temporal Trends",
+    "geography": "Geographic Analysis",
+    "segments": "Customer Segments",
+    "transactions": "Transaction Explorer",
+    "model": "Model Scores",
+}
+# Transactions the dashboard generates at start-up
+DATASET_ROWS = 50_000
+PLOTLY_JS = "plotly.min.js"
+
+_DATE_KEYS = ("start_date", "end_date")
+
+_CSS = f"""
+body {{ font-family: Inter, -apple-system, "Segoe UI", sans-serif; color: {COLORS['text_primary']};
+       background: {COLORS['white']}; margin: 0; }}
+main {{ max-width: 1400px; margin: 0 auto; padding: 1.5rem 2rem 3rem; }}
+nav {{ display: flex; gap: 1.25rem; flex-wrap: wrap; padding: 0.75rem 0; margin-bottom: 1rem;
+      border-bottom: 1px solid {COLORS['border']}; font-size: 0.85rem; font-weight: 600; }}
+nav a, td a {{ color: {COLORS['accent_blue']}; text-decoration: none; }}
+section {{ padding: 1.5rem 0 2rem; border-bottom: 1px solid {COLORS['border']}; }}
+details summary {{ cursor: pointer; font-weight: 600; margin: 0.5rem 0; }}
+table.report-table {{ border-collapse: collapse; width: 100%; font-size: 0.75rem; }}
+table.report-table th {{ position: sticky; top: 0; background: {COLORS['surface']}; text-align: left; }}
+table.report-table th, table.report-table td {{ padding: 0.3rem 0.6rem; border-bottom: 1px solid {COLORS['border']};
+                                                white-space: nowrap; }}
+.meta {{ font-size: 0.78rem; color: {COLORS['text_secondary']}; }}
+"""
+
+_DOCUMENT = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>{css}</style>
+{head}
+</head>
+<body>
+<main>
+<div style="font-size:1.9rem;font-weight:800;letter-spacing:-0.04em;">Fraud &amp; Risk Analytics</div>
+<div class="meta">{subtitle}</div>
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+# ── Worker Processes
+class _Worker:
+    """Per-process dataset and the shared structures every combination's planner reads."""
+
+    def __init__(self, rows: int, tabs: list, inline_js: bool):
+        self.store = IncrementalAggregates(generate_fraud_dataset(n_transactions=rows))
+        self.dataset = self.store.fingerprint(self.store.version)
+        # Velocity windows and bursts need the full history, as in the dashboard
+        self.frame = add_burst_features(add_travel_features(add_velocity_features(self.store.frame())))
+        self.index = BitmapIndex(self.frame)
+        self.cube = RollupCube(self.frame)
+        self.cache = AggregateCache()
+        self.disk = DiskAggregateStore.from_env()
+        self.travel_pairs = impossible_travel_pairs(self.frame) if "geography" in tabs else None
+        self.model = LogisticFraudModel().fit(self.frame) if "model" in tabs else None
+        self.defaults = {
+            "start_date": self.frame["timestamp"].min().date(),
+            "end_date": self.frame["timestamp"].max().date(),
+            **{key: everything for key, (_, everything) in FILTER_COLUMNS.items()},
+        }
+        self.renderers = {name: getattr(importlib.import_module(f"tabs.{name}"), f"render_{name}") for name in tabs}
+        self.plotly = (f"<script>{get_plotlyjs()}</script>" if inline_js
+                       else f'<script src="{PLOTLY_JS}" charset="utf-8"></script>')
+
+
+_worker = None
+
+
+def _init_worker(rows: int, tabs: list, inline_js: bool):
+    global _worker
+    from streamlit import logger
+    logger.set_log_level("error")
+    # Before the tab modules load, so the model tab's threshold explorer renders
+    inline_fragments()
+    _worker = _Worker(rows, tabs, inline_js)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def render_report(selection: dict, out_dir: str) -> dict:
+    """Write one combination's report and return its file name, label and timings."""
+    started = time.perf_counter()
+    worker = _worker
+    filters = {**worker.defaults, **selection}
+    for key in _DATE_KEYS:
+        if isinstance(filters[key], str):
+            filters[key] = date.fromisoformat(filters[key])
+    label = selection_label(filters)
+    view = f"{worker.dataset}|{sorted(filters.items())}"
+    planner = QueryPlanner(worker.frame, filters, worker.index, worker.cube, cache=worker.cache, view=view,
+                           disk=worker.disk, dataset=worker.dataset)
+    rows = planner.rows()
+
+    sections = []
+    figures = 0
+    failed = []
+    if len(rows) == 0:
+        sections.append(("empty", "No Data", "<p>No transactions match this selection.</p>"))
+    else:
+        # Filters only ever drop rows, so the full view's totals are the live store's
+        if len(rows) == len(worker.frame):
+            stats, state_data = worker.store.stats(), worker.store.state_table()
+        else:
+            stats, state_data = planner.memo(("stats",), lambda: estimate_stats(rows), persist=True), None
+        stats = {**stats, **worker.store.sketch_summary(filters)}
+        tab_args = {
+            "overview": lambda: (rows, stats, None, planner),
+            "trends": lambda: (rows, stats, view, planner),
+            "geography": lambda: (rows, stats, state_data, worker.travel_pairs, planner),
+            "segments": lambda: (rows, stats, view, planner),
+            "transactions": lambda: (rows, stats),
+            "model": lambda: (rows, stats, worker.model, view),
+        }
+        for name, render in worker.renderers.items():
+            # One tab failing on an unusual selection leaves the rest of the report intact
+            try:
+                with capture_page() as page:
+                    render(*tab_args[name]())
+            except Exception as error:
+                logger.exception("%s tab failed for %s", name, label)
+                failed.append(name)
+                content = (f'<div style="color:{COLORS["fraud_red"]};">{REPORT_TABS[name]} could not be rendered '
+                           f"for this selection: {html.escape(repr(error))}</div>")
+            else:
+                content = page.html()
+                figures += page.figures
+            sections.append((name, REPORT_TABS[name], content))
+
+    nav = "".join(f'<a href="#{anchor}">{title}</a>' for anchor, title, _ in sections)
+    body = f"<nav>{nav}</nav>" + "".join(
+        f'<section id="{anchor}">{content}</section>' for anchor, _, content in sections
+    )
+    generated = datetime.now().strftime("%Y-%m-%d %H:%M")
+    document = _DOCUMENT.format(
+        title=html.escape(f"Fraud report · {label}"), css=_CSS, head=worker.plotly, body=body,
+        subtitle=f"{html.escape(label)} · {len(rows):,} transactions · generated {generated}",
+    )
+    path = Path(out_dir) / f"{_slug(label)}.html"
+    path.write_text(document, encoding="utf-8")
+    return {"file": path.name, "label": label, "rows": len(rows), "figures": figures, "failed": failed,
+            "bytes": path.stat().st_size, "seconds": time.perf_counter() - started}
+
+
+# ── Combinations
+def default_combinations(start: str = None, end: str = None) -> list:
+    """Every card network (and all cards) times every fraud type (and all types)."""
+    dates = {key: value for key, value in zip(_DATE_KEYS, (start, end)) if value}
+    return [
+        {**dates, "card_type": card, "fraud_type": fraud}
+        for card, fraud in product(["All Cards"] + CARD_TYPES, ["All Types"] + FRAUD_TYPES)
+    ]
+
+
+def read_combinations(path: str, start: str = None, end: str = None) -> list:
+    """Filter selections from a JSON-lines file; --start and --end fill in missing dates."""
+    dates = {key: value for key, value in zip(_DATE_KEYS, (start, end)) if value}
+    selections = []
+    for line in Path(path).read_text().splitlines():
+        if line.strip():
+            selections.append({**dates, **json.loads(line)})
+    return selections
+
+
+def index_document(results: list, total_seconds: float, workers: int) -> str:
+    rows = "".join(
+        f'<tr><td><a href="{result["file"]}">{html.escape(result["label"])}</a></td>'
+        f'<td>{result["rows"]:,}</td><td>{result["figures"]}</td><td>{result["seconds"]:.1f} s</td>'
+        f'<td>{", ".join(REPORT_TABS[name] for name in result["failed"])}</td></tr>'
+        for result in results
+    )
+    table = (
+        '<table class="report-table" style="margin-top:1rem;">'
+        "<tr><th>Selection</th><th>Transactions</th><th>Figures</th><th>Render time</th><th>Failed tabs</th></tr>"
+        f"{rows}</table>"
+    )
+    generated = datetime.now().strftime("%Y-%m-%d %H:%M")
+    return _DOCUMENT.format(
+        title="Fraud reports", css=_CSS, head="", body=table,
+        subtitle=f"{len(results)} reports · generated {generated} in {total_seconds:.1f} s on {workers} processes",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="reports", help="directory the reports are written to")
+    parser.add_argument("--combinations", help="JSON-lines file of filter selections (default: cards × fraud types)")
+    parser.add_argument("--start", help="first day, YYYY-MM-DD, where a selection sets none (default: the data's)")
+    parser.add_argument("--end", help="last day, YYYY-MM-DD, where a selection sets none (default: the data's)")
+    parser.add_argument("--tabs", nargs="+", choices=list(REPORT_TABS), default=list(REPORT_TABS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="rendering processes")
+    parser.add_argument("--rows", type=int, default=DATASET_ROWS, help="transactions generated")
+    parser.add_argument("--inline-js", action="store_true", help="embed Plotly's JavaScript in every report")
+    args = parser.parse_args()
+
+    if args.combinations:
+        selections = read_combinations(args.combinations, args.start, args.end)
+    else:
+        selections = default_combinations(args.start, args.end)
+    # Identical selections would only overwrite each other's report
+    selections = list({json.dumps(s, sort_keys=True): s for s in selections}.values())
+    tabs = [name for name in REPORT_TABS if name in args.tabs]
+    workers = max(1, min(args.workers, len(selections)))
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    if not args.inline_js:
+        (out / PLOTLY_JS).write_text(get_plotlyjs(), encoding="utf-8")
+
+    started = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=_init_worker,
+                             initargs=(args.rows, tabs, args.inline_js)) as pool:
+        futures = {pool.submit(render_report, selection, str(out)): i for i, selection in enumerate(selections)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            failed = f"  failed: {', '.join(result['failed'])}" if result["failed"] else ""
+            print(f"{result['label']:<52} {result['figures']:>3} figures {result['bytes'] / 2**20:6.1f} MB "
+                  f"{result['seconds']:6.1f} s{failed}")
+    total = time.perf_counter() - started
+    ordered = [results[i] for i in sorted(results)]
+    (out / "index.html").write_text(index_document(ordered, total, workers), encoding="utf-8")
+
+    rendering = sum(result["seconds"] for result in ordered)
+    print(f"\n{len(ordered)} reports in {total:.1f} s on {workers} processes "
+          f"({rendering:.1f} s rendering, {total - rendering / workers:.1f} s worker start-up and overhead)")
+    print(f"open {out / 'index.html'}")
+
+
+if __name__ == "__main__":
+    main()
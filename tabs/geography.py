@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
-from components.charts import us_choropleth, top_cities_bar
+from analytics.travel import MAX_SPEED_KMH, MIN_DISTANCE_KM
+from data.query import ComparisonQuery, QueryPlanner, apply_filters, grouped
+from components.charts import state_delta_map, top_cities_bar, us_choropleth
 from components.kpi_cards import (
     render_mini_kpi_row,
     render_page_header,
@@ -13,24 +15,93 @@ _DISPLAY_COLS = ["state", "state_name", "fraud", "total", "rate", "fraud_amount"
 _DISPLAY_HEADERS = ["Code", "State", "Fraud Events", "Total Tx", "Fraud Rate %", "Fraud Amount ($)"]
 _TOP_STATES = 15
 
+_TRAVEL_COLS = ["card_id", "from", "to", "km", "hours", "kmh", "is_fraud"]
+_TRAVEL_HEADERS = ["Card", "From", "To", "Distance (km)", "Gap (min)", "Speed (km/h)", "Fraud"]
+_TOP_LEGS = 15
+_TOP_MOVERS = 10
+_MOVER_COLS = ["state_name", "rate_baseline", "rate_comparison", "rate_delta", "fraud_delta"]
+_MOVER_HEADERS = ["State", "Baseline %", "Comparison %", "Δ Rate (pts)", "Δ Fraud Events"]
 
-def render_geography(df: pd.DataFrame, stats: dict):
-    """Render the Geographic Analysis tab."""
+
+def _render_comparison(compare: ComparisonQuery):
+    """State fraud-rate differences between the two selections, mapped and ranked."""
+    col1, col2 = st.columns([1.6, 1], gap="large")
+    with col1:
+        render_section_header(
+            "Δ Fraud Rate by State",
+            f"{compare.labels['comparison']} minus {compare.labels['baseline']}",
+        )
+        st.plotly_chart(
+            state_delta_map(compare),
+            use_container_width=True,
+            config=PLOTLY_CONFIG,
+            key="geo_compare_map",
+        )
+    with col2:
+        render_section_header("Biggest Movers", "States with the largest fraud-rate change, in percentage points")
+        movers = compare.deltas(["state", "state_name"], "state movers").reset_index().dropna(subset=["rate_delta"])
+        movers = movers.reindex(movers["rate_delta"].abs().sort_values(ascending=False).index).head(_TOP_MOVERS)
+        display = movers[_MOVER_COLS].round(2)
+        display.columns = _MOVER_HEADERS
+        st.dataframe(display, use_container_width=True, height=400, hide_index=True)
+    st.markdown("<div style='margin-top:1.5rem'></div>", unsafe_allow_html=True)
+
+
+def _view_legs(source, travel_pairs: pd.DataFrame) -> pd.DataFrame:
+    """Travel legs arriving at a row of the view.
+
+    With a planner only the legs' arriving rows are filtered, so the legs
+    stay exact without the view's rows being materialised.
+    """
+    if isinstance(source, QueryPlanner):
+        rows = apply_filters(source.frame_all.loc[travel_pairs.index.unique()], source.filters)
+    else:
+        rows = source
+    return travel_pairs[travel_pairs.index.isin(rows.index[rows["impossible_travel"].to_numpy()])]
+
+
+def _state_map(source, travel_legs: pd.DataFrame = None):
+    """The state choropleth; with a planner, the travel-layer map is shared per view like the plain one."""
+    if travel_legs is None or not isinstance(source, QueryPlanner):
+        return us_choropleth(source, travel_legs)
+    return source.memo(("figure", "us_choropleth", "travel"), lambda: us_choropleth(source, travel_legs))
+
+
+def prefetch_geography(query: QueryPlanner, travel_pairs: pd.DataFrame = None):
+    """Build this tab's state table, map and city chart into the planner's shared cache, without rendering."""
+    grouped(query, ["state", "state_name"], "state table")
+    _state_map(query, None if travel_pairs is None else _view_legs(query, travel_pairs))
+    top_cities_bar(query, n=10)
+
+
+def render_geography(df: pd.DataFrame, stats: dict, state_data: pd.DataFrame = None,
+                     travel_pairs: pd.DataFrame = None, query: QueryPlanner = None,
+                     compare: ComparisonQuery = None):
+    """Render the Geographic Analysis tab.
+
+    `state_data` may carry a precomputed state table (e.g. from the live
+    store); otherwise it is aggregated from `df`. `travel_pairs` holds the
+    impossible-travel legs of the full dataset, indexed by arriving row; the
+    legs arriving at a row of the view are drawn on the map. When `query` is
+    given, the map, city chart and legs are answered through it, so `df`
+    may be the weighted sample. With `compare`,
+    a state-level comparison leads the tab.
+    """
+    source = df if query is None else query
     render_page_header(
         "Geographic Analysis",
         "Where is fraud concentrated? State and city-level distribution across the US.",
     )
 
-    state_data = df.groupby(["state", "state_name"]).agg(
-        total=("is_fraud", "count"),
-        fraud=("is_fraud", "sum"),
-        fraud_amount=("amount", lambda x: x[df.loc[x.index, "is_fraud"] == 1].sum()),
-    ).reset_index()
-    state_data["rate"] = state_data["fraud"] / state_data["total"] * 100
+    if compare is not None:
+        _render_comparison(compare)
+
+    if state_data is None:
+        state_data = grouped(source, ["state", "state_name"], "state table").reset_index()
 
     top_state = state_data.sort_values("rate", ascending=False).iloc[0]
     top_state_volume = state_data.sort_values("fraud", ascending=False).iloc[0]
-    most_states = df["state"].nunique()
+    most_states = len(state_data)
     avg_state_rate = state_data["rate"].mean()
 
     render_mini_kpi_row([
@@ -42,13 +113,19 @@ def render_geography(df: pd.DataFrame, stats: dict):
 
     st.markdown("<div style='margin-top:1.5rem'></div>", unsafe_allow_html=True)
 
+    if travel_pairs is not None:
+        travel_pairs = _view_legs(source, travel_pairs)
+
     # ── Choropleth (full width)
     render_section_header(
         "Fraud Rate by State",
         "Hover over a state for fraud rate, count, and amount. Darker = higher risk.",
     )
+    show_travel = travel_pairs is not None and st.toggle(
+        f"Show impossible travel ({len(travel_pairs):,} legs)", value=True, key="geo_travel_layer",
+    )
     st.plotly_chart(
-        us_choropleth(df),
+        _state_map(source, travel_pairs if show_travel else None),
         use_container_width=True,
         config={**PLOTLY_CONFIG, "scrollZoom": False},
         key="geo_choropleth",
@@ -65,7 +142,7 @@ def render_geography(df: pd.DataFrame, stats: dict):
             "Absolute fraud event count by city",
         )
         st.plotly_chart(
-            top_cities_bar(df, n=10),
+            top_cities_bar(source, n=10),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="geo_cities_bar",
@@ -94,6 +171,24 @@ def render_geography(df: pd.DataFrame, stats: dict):
             hide_index=True,
         )
 
+    if travel_pairs is not None and len(travel_pairs):
+        st.markdown("<div style='margin-top:1rem'></div>", unsafe_allow_html=True)
+        render_section_header(
+            "Impossible Travel",
+            f"Fastest of {len(travel_pairs):,} consecutive same-card transactions more than "
+            f"{MIN_DISTANCE_KM:,.0f} km apart at over {MAX_SPEED_KMH:,.0f} km/h",
+        )
+        legs = travel_pairs.head(_TOP_LEGS).assign(
+            **{"from": travel_pairs["from_city"] + ", " + travel_pairs["from_state"],
+               "to": travel_pairs["to_city"] + ", " + travel_pairs["to_state"]}
+        )[_TRAVEL_COLS].copy()
+        legs.columns = _TRAVEL_HEADERS
+        legs["Distance (km)"] = legs["Distance (km)"].round(0).astype(int)
+        legs["Gap (min)"] = (legs["Gap (min)"] * 60).round(1)
+        legs["Speed (km/h)"] = legs["Speed (km/h)"].apply(lambda x: f"{x:,.0f}")
+        legs["Fraud"] = legs["Fraud"].map({1: "Yes", 0: "No"})
+        st.dataframe(legs.reset_index(drop=True), use_container_width=True, hide_index=True)
+
     high_risk_states = state_data[state_data["rate"] > state_data["rate"].mean() + state_data["rate"].std()]
 
     render_insight_box("Geographic Insights", [
@@ -101,4 +196,6 @@ def render_geography(df: pd.DataFrame, stats: dict):
         f'<strong>{top_state_volume["state_name"]}</strong> has the highest absolute fraud volume ({top_state_volume["fraud"]:,} events)',
         f'{len(high_risk_states)} states exceed one standard deviation above the mean fraud rate',
         f'Average fraud rate across all states: {avg_state_rate:.2f}%',
-    ])
+    ] + ([
+        f'{len(travel_pairs):,} impossible-travel legs, {travel_pairs["is_fraud"].mean():.0%} touching a fraudulent transaction'
+    ] if travel_pairs is not None and len(travel_pairs) else []))
@@ -0,0 +1,149 @@
+import streamlit as st
+import pandas as pd
+from analytics.model import LogisticFraudModel, roc_auc
+from analytics.scoring import score_transactions
+from analytics.thresholds import ThresholdCurve
+from components.charts import score_distribution, pr_roc_curves
+from components.kpi_cards import (
+    render_mini_kpi_row,
+    render_page_header,
+    render_section_header,
+    render_insight_box,
+)
+from components.styles import COLORS, PLOTLY_CONFIG
+
+_SCORE_SOURCES = ["Model score", "Rule score"]
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _threshold_curve(view_key: str, source: str, _scores, _is_fraud, _amount) -> ThresholdCurve:
+    """Sorted cumulative counts, built once per dataset version, filter state and score source."""
+    return ThresholdCurve(_scores, _is_fraud, _amount)
+
+
+@st.fragment
+def _render_threshold_explorer(scored: pd.DataFrame, view_key: str):
+    """Threshold slider with live precision/recall; slider moves rerun only this fragment."""
+    c1, c2, c3 = st.columns([1, 2.4, 1], gap="medium")
+    with c1:
+        source = st.selectbox("Score", _SCORE_SOURCES, key="thr_source")
+    column = "fraud_score" if source == "Model score" else "risk_score"
+    curve = _threshold_curve(
+        view_key, source,
+        scored[column].to_numpy(), scored["is_fraud"].to_numpy(), scored["amount"].to_numpy(),
+    )
+    top = float(curve.scores[0]) if len(curve.scores) else 1.0
+    with c2:
+        threshold = st.slider(
+            "Alert threshold", min_value=0.0, max_value=round(top, 4),
+            value=round(top / 2, 4), step=round(top / 500, 6) or 0.0001, format="%.4f",
+            key=f"thr_value_{source}",
+        )
+    with c3:
+        review_cost = st.number_input(
+            "Review cost per false alert ($)", min_value=0.0, value=25.0, step=5.0, key="thr_review_cost",
+        )
+
+    result = curve.at(threshold, review_cost)
+    render_mini_kpi_row([
+        {"label": "Alerts",            "value": f"{result['alerts']:,}",                  "color": COLORS["chart_1"]},
+        {"label": "Precision",         "value": f"{result['precision']:.1%}" if result["alerts"] else "—",
+         "color": COLORS["chart_2"]},
+        {"label": "Recall",            "value": f"{result['recall']:.1%}",                "color": COLORS["chart_2"]},
+        {"label": "Fraud $ Caught",    "value": f"${result['caught_fraud_amount']:,.0f}", "color": COLORS["safe_green"]},
+        {"label": "False-Positive Cost", "value": f"${result['false_positive_cost']:,.0f}", "color": COLORS["fraud_red"]},
+    ])
+
+    points = curve.curve()
+    current = {
+        "precision": result["precision"] if result["alerts"] else 1.0,
+        "recall": result["recall"],
+        "fpr": result["false_positives"] / max(curve.n_legit, 1),
+    }
+    st.plotly_chart(
+        pr_roc_curves(points, current),
+        use_container_width=True,
+        config=PLOTLY_CONFIG,
+        key="model_pr_roc",
+    )
+
+
+def render_model(df: pd.DataFrame, stats: dict, model: LogisticFraudModel, view_key: str):
+    """Render the Model Scores tab.
+
+    `view_key` identifies the dataset version and filter state, so the
+    threshold explorer sorts scores once per view. Quality metrics, the
+    score distribution and the threshold explorer use the view's rows from
+    the model's held-out period; only when the view has none are they in-sample.
+    """
+    render_page_header(
+        "Model Scores",
+        "How well does an in-process logistic model separate fraud from legitimate traffic?",
+    )
+
+    if model.train_fraud == 0:
+        st.info(
+            "The training data has no fraud labels yet, so every transaction scores near the base rate. "
+            "Scores become informative once labelled fraud arrives."
+        )
+
+    scored, throughput = model.score(df)
+    scored["risk_score"] = score_transactions(scored)
+    held_out = model.holdout_mask(scored)
+    if held_out.any():
+        evaluated, basis = scored[held_out], "Held-Out"
+        st.caption(
+            f"Quality metrics use the {len(evaluated):,} transactions of this view from "
+            f"{model.holdout_start:%Y-%m-%d} on: the latest {model.holdout:.0%} of the history, "
+            "kept out of training."
+        )
+    else:
+        evaluated, basis = scored, "In-Sample"
+        st.caption(
+            "This view has no transactions from the held-out period, so quality metrics are in-sample: "
+            "measured on rows the model was trained on, and optimistic."
+        )
+    fraud_scores = evaluated.loc[evaluated["is_fraud"] == 1, "fraud_score"]
+    legit_scores = evaluated.loc[evaluated["is_fraud"] == 0, "fraud_score"]
+    auc = roc_auc(evaluated["fraud_score"].to_numpy(), evaluated["is_fraud"].to_numpy())
+    lift = fraud_scores.mean() / legit_scores.mean() if len(fraud_scores) and len(legit_scores) else 0
+
+    render_mini_kpi_row([
+        {"label": f"ROC AUC · {basis}", "value": f"{auc:.3f}" if auc == auc else "—", "color": COLORS["chart_1"]},
+        {"label": "Avg Score · Fraud", "value": f"{fraud_scores.mean():.3f}",     "color": COLORS["fraud_red"]},
+        {"label": "Avg Score · Legit", "value": f"{legit_scores.mean():.3f}",     "color": COLORS["safe_green"]},
+        {"label": "Scoring Speed",     "value": f"{throughput / 1e6:.1f}M tx/s",  "color": COLORS["chart_2"]},
+    ])
+
+    st.markdown("<div style='margin-top:1.5rem'></div>", unsafe_allow_html=True)
+
+    render_section_header(
+        "Score Distribution",
+        "Share of each class by model score. Better models push the red mass to the right.",
+    )
+    st.plotly_chart(
+        score_distribution(evaluated),
+        use_container_width=True,
+        config=PLOTLY_CONFIG,
+        key="model_score_dist",
+    )
+
+    st.markdown("<div style='margin-top:1rem'></div>", unsafe_allow_html=True)
+
+    render_section_header(
+        "Threshold Explorer",
+        "Drag the threshold to trade alert volume against fraud caught and review cost.",
+    )
+    _render_threshold_explorer(evaluated, f"{view_key}|{basis}")
+
+    render_insight_box("Model Notes", [
+        f'Trained on <strong>{model.train_rows:,}</strong> transactions'
+        f'{f" before {model.holdout_start:%Y-%m-%d}" if model.holdout_start is not None else ""} '
+        f'in {model.train_seconds:.2f}s '
+        f'({model.epochs} epochs, mini-batches of {model.batch_size:,})',
+        f'Fraudulent transactions score <strong>{lift:.2f}×</strong> higher than legitimate ones on average '
+        f'({basis.lower()})',
+        f'Scored {len(scored):,} filtered transactions at {throughput:,.0f} per second',
+        'Features: merchant category, channel, card, age group and hour (one-hot), '
+        'state (target-encoded) and log amount',
+    ])
@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 from components.kpi_cards import (
+    render_amount_kpis,
+    render_comparison_kpis,
     render_executive_kpis,
+    render_live_kpi_row,
     render_page_header,
     render_section_header,
     render_insight_box,
@@ -11,19 +14,124 @@ from components.charts import (
     fraud_by_category_bar,
     monthly_fraud_trend,
     fraud_type_breakdown,
+    rate_delta_bar,
 )
 from components.styles import COLORS, PLOTLY_CONFIG
+from data.generate_data import generate_fraud_dataset
+from data.query import ComparisonQuery, QueryPlanner, grouped
+from data.replay import REPLAY_SPEEDS, StreamReplayer, shift_to_follow
 
+_LIVE_TICK_SECONDS = 1
+_GENERATED_BATCH = 10_000
 
-def render_overview(df: pd.DataFrame, stats: dict):
-    """Render the Executive Overview tab."""
+
+@st.fragment(run_every=_LIVE_TICK_SECONDS)
+def _render_live_windows(replayer: StreamReplayer):
+    """Live KPI row; reads the running window sums only, never the history."""
+    if replayer.sim_time is None:
+        return
+    clock = pd.Timestamp(replayer.sim_time, unit="s").strftime("%b %d %H:%M")
+    render_live_kpi_row(replayer.windows.kpis(), clock)
+    status = "streaming" if replayer.running else "stopped"
+    st.caption(f"Replay {status} · {replayer.ingested:,} transactions ingested ({replayer.progress:.0%})")
+
+
+def _render_replay_controls(replayer: StreamReplayer):
+    """Source, speed and start/stop controls for the stream replay."""
+    with st.expander("Live Replay", expanded=replayer.sim_time is not None):
+        c1, c2, c3, c4 = st.columns([1.4, 1.4, 0.6, 0.6], gap="small")
+        with c1:
+            source = st.selectbox(
+                "Source", ["Dataset", "Newly generated"], key="replay_source",
+                help="Dataset replays the year from an empty store, and Stop puts the full "
+                     "history back; newly generated transactions are appended after the latest one.",
+            )
+        with c2:
+            speed = st.selectbox("Speed", list(REPLAY_SPEEDS), index=2, key="replay_speed")
+        with c3:
+            st.markdown("<div style='margin-top:1.75rem'></div>", unsafe_allow_html=True)
+            start = st.button("Start", key="replay_start", use_container_width=True)
+        with c4:
+            st.markdown("<div style='margin-top:1.75rem'></div>", unsafe_allow_html=True)
+            stop = st.button("Stop", key="replay_stop", use_container_width=True)
+
+        if stop:
+            replayer.stop()
+        if start:
+            if source == "Dataset":
+                replayer.start(replayer.store.frame(), REPLAY_SPEEDS[speed], reset_store=True)
+            else:
+                last = replayer.store.frame()["timestamp"].max()
+                batch = shift_to_follow(generate_fraud_dataset(n_transactions=_GENERATED_BATCH, seed=None), last)
+                replayer.start(batch, REPLAY_SPEEDS[speed])
+
+        _render_live_windows(replayer)
+
+
+def _render_comparison(compare: ComparisonQuery):
+    """KPI deltas and per-category and per-channel rate differences between the two selections."""
+    render_section_header(
+        "Comparison vs Baseline",
+        f"{compare.labels['comparison']} against {compare.labels['baseline']}",
+    )
+    render_comparison_kpis(compare.stats(), compare.labels)
+
+    col1, col2 = st.columns([1.6, 1], gap="large")
+    with col1:
+        render_section_header("Δ Fraud Rate by Category", "Comparison minus baseline, in percentage points")
+        st.plotly_chart(
+            rate_delta_bar(compare, "merchant_category"),
+            use_container_width=True,
+            config=PLOTLY_CONFIG,
+            key="overview_compare_category",
+        )
+    with col2:
+        render_section_header("Δ Fraud Rate by Channel", "Comparison minus baseline, in percentage points")
+        st.plotly_chart(
+            rate_delta_bar(compare, "transaction_channel"),
+            use_container_width=True,
+            config=PLOTLY_CONFIG,
+            key="overview_compare_channel",
+        )
+    st.markdown("<div style='margin-top:1.5rem'></div>", unsafe_allow_html=True)
+
+
+def prefetch_overview(query: QueryPlanner):
+    """Build this tab's figures and signal groupings into the planner's shared cache, without rendering."""
+    for chart in (fraud_donut, fraud_by_category_bar, monthly_fraud_trend, fraud_type_breakdown):
+        chart(query)
+    for column in ("merchant_category", "transaction_channel", "hour"):
+        grouped(query, column, "key signals", fraud_only=True)
+
+
+def render_overview(df: pd.DataFrame, stats: dict, replayer: StreamReplayer = None,
+                    query: QueryPlanner = None, compare: ComparisonQuery = None):
+    """Render the Executive Overview tab.
+
+    When `query` is given, charts and signals are answered through it
+    (cheapest access path, or the weighted sample in approximate mode).
+    With `compare`, a comparison section leads the tab and the rest shows
+    the baseline selection.
+    """
+    source = df if query is None else query
     render_page_header(
         "Executive Overview",
         "Comprehensive fraud intelligence · 50,000 transactions · 2023",
     )
 
+    if compare is not None:
+        _render_comparison(compare)
+
     render_executive_kpis(stats)
 
+    if "amount_p50" in stats:
+        st.markdown("<div style='margin-top:0.75rem'></div>", unsafe_allow_html=True)
+        render_amount_kpis(stats)
+        st.caption("Percentiles within 1% and distinct counts within about 2%, merged from per-day sketches.")
+
+    if replayer is not None:
+        _render_replay_controls(replayer)
+
     st.markdown("<div style='margin-top:1.5rem'></div>", unsafe_allow_html=True)
 
     # ── Row 1: Donut + Category Bar
@@ -35,22 +143,21 @@ def render_overview(df: pd.DataFrame, stats: dict):
             "Fraud vs legitimate distribution",
         )
         st.plotly_chart(
-            fraud_donut(df),
+            fraud_donut(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="overview_donut",
         )
 
-        fraud_df = df[df["is_fraud"] == 1]
-        top_cat = fraud_df["merchant_category"].mode()[0]
-        top_channel = fraud_df["transaction_channel"].mode()[0]
-        peak_hour = int(fraud_df["hour"].mode()[0])
+        top_cat = grouped(source, "merchant_category", "key signals", fraud_only=True)["fraud"].idxmax()
+        top_channel = grouped(source, "transaction_channel", "key signals", fraud_only=True)["fraud"].idxmax()
+        peak_hour = int(grouped(source, "hour", "key signals", fraud_only=True)["fraud"].idxmax())
 
         render_insight_box("Key Signals", [
             f'Highest fraud category: <strong>{top_cat}</strong>',
             f'Riskiest channel: <strong>{top_channel}</strong>',
             f'Peak fraud hour: <strong>{peak_hour:02d}:00 – {peak_hour + 1:02d}:00</strong>',
-            f'{df["state"].nunique()} states with active fraud',
+            f'{len(grouped(source, ["state", "state_name"], "state table"))} states with active fraud',
         ])
 
     with col_right:
@@ -59,7 +166,7 @@ def render_overview(df: pd.DataFrame, stats: dict):
             "Fraud count colored by rate intensity",
         )
         st.plotly_chart(
-            fraud_by_category_bar(df),
+            fraud_by_category_bar(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="overview_category_bar",
@@ -76,7 +183,7 @@ def render_overview(df: pd.DataFrame, stats: dict):
             "Transaction volume (bars) vs fraud count (line)",
         )
         st.plotly_chart(
-            monthly_fraud_trend(df),
+            monthly_fraud_trend(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="overview_monthly_trend",
@@ -88,7 +195,7 @@ def render_overview(df: pd.DataFrame, stats: dict):
             "Incidents by fraud classification",
         )
         st.plotly_chart(
-            fraud_type_breakdown(df),
+            fraud_type_breakdown(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="overview_fraud_type",
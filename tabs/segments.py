@@ -1,11 +1,16 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+from analytics.drivers import MIN_SUPPORT, find_drivers
+from analytics.rings import RING_ENTITIES, find_rings
+from analytics.sampling import is_sample
 from components.charts import (
     age_group_chart,
     card_type_donut,
     channel_fraud_bar,
     fraud_type_breakdown,
     amount_distribution,
+    rate_delta_bar,
 )
 from components.kpi_cards import (
     render_mini_kpi_row,
@@ -14,21 +19,190 @@ from components.kpi_cards import (
     render_insight_box,
 )
 from components.styles import COLORS, PLOTLY_CONFIG
+from data.query import ComparisonQuery, QueryPlanner, grouped, source_rows
 
+_RING_ROW_LIMIT = 25
+_RING_CARD_PREVIEW = 8
+_RING_COLS = [
+    "cards", "transactions", "fraud", "fraud_density", "fraud_amount",
+    "locations", "start", "end", "card_ids",
+]
+_RING_HEADERS = [
+    "Cards", "Linked Tx", "Fraud Tx", "Fraud Density %", "Fraud Amount ($)",
+    "Cities", "First Seen", "Last Seen", "Card IDs",
+]
 
-def render_segments(df: pd.DataFrame, stats: dict):
-    """Render the Customer Segments tab."""
+
+_COMPARE_SEGMENTS = {
+    "age_group": "Δ Fraud Rate by Age Group",
+    "card_type": "Δ Fraud Rate by Card Type",
+    "transaction_channel": "Δ Fraud Rate by Channel",
+}
+
+_DRIVER_ORDERS = {"2- and 3-way": (2, 3), "2-way": (2,), "3-way": (3,)}
+_DRIVER_ROW_LIMIT = 200
+_DRIVER_COLS = ["dimensions", "segment", "transactions", "fraud", "rate", "ci_low", "ci_high", "lift", "gain"]
+_DRIVER_HEADERS = ["Dimensions", "Segment", "Transactions", "Fraud", "Fraud Rate %",
+                   "CI Low %", "CI High %", "Lift", "Gain vs Parent"]
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _risk_drivers(view_key: str, orders: tuple, min_support: int, _df: pd.DataFrame) -> pd.DataFrame:
+    """Driver table for one dataset version, filter state and setting."""
+    return find_drivers(_df, orders, min_support)
+
+
+def _render_risk_drivers(df: pd.DataFrame, view_key: str):
+    render_section_header(
+        "Risk Drivers",
+        "Riskiest combinations of state, category, channel, card, age and hour, ranked by the "
+        "lower bound of their 95% confidence interval — click column headers to sort",
+    )
+    c1, c2 = st.columns([1, 1], gap="medium")
+    with c1:
+        order_label = st.selectbox("Combinations", list(_DRIVER_ORDERS), key="drivers_order")
+    with c2:
+        min_support = st.number_input(
+            "Minimum transactions per segment", min_value=10, value=MIN_SUPPORT, step=50, key="drivers_min_support",
+        )
+    drivers = _risk_drivers(view_key, _DRIVER_ORDERS[order_label], int(min_support), df)
+    if len(drivers) == 0:
+        st.info("No segment combination meets the minimum support.")
+        return
+
+    display = drivers.head(_DRIVER_ROW_LIMIT)[_DRIVER_COLS].copy()
+    for col in ("rate", "ci_low", "ci_high"):
+        display[col] = (display[col] * 100).round(2)
+    display["lift"] = display["lift"].round(2)
+    display["gain"] = display["gain"].round(2)
+    display.columns = _DRIVER_HEADERS
+    st.dataframe(
+        display,
+        use_container_width=True,
+        height=400,
+        hide_index=True,
+        column_config={
+            "Lift": st.column_config.NumberColumn("Lift", help="Segment fraud rate over the overall rate", format="%.2f×"),
+            "Gain vs Parent": st.column_config.NumberColumn(
+                "Gain vs Parent", format="%.2f×",
+                help="Fraud rate over the riskiest segment with one dimension fewer; above 1 means the combination adds risk",
+            ),
+        },
+    )
+    st.markdown(
+        f'<div style="font-size:0.75rem;color:{COLORS["text_muted"]};margin-top:0.4rem;">'
+        f'{len(drivers):,} segments with at least {int(min_support):,} transactions'
+        f'{f", top {_DRIVER_ROW_LIMIT} shown" if len(drivers) > _DRIVER_ROW_LIMIT else ""}</div>',
+        unsafe_allow_html=True,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _fraud_rings(view_key: str, entity: str, _rows) -> pd.DataFrame:
+    """Rings for one view and linking entity; `_rows()` gives the exact rows and runs only on a miss."""
+    return find_rings(_rows(), entity)
+
+
+def _render_fraud_rings(rows, view_key: str):
+    render_section_header(
+        "Fraud Rings",
+        "Cards linked through shared merchants or cities in the same 10 minutes, "
+        "ranked by the fraud density of the linking transactions",
+    )
+    entity = st.selectbox("Link cards by", list(RING_ENTITIES), key="ring_entity")
+    rings = _fraud_rings(view_key, entity, rows)
+
+    dense = rings[rings["fraud_density"] >= 0.5]
+    render_mini_kpi_row([
+        {"label": "Rings (3+ cards)",     "value": f"{len(rings):,}",                   "color": COLORS["chart_1"]},
+        {"label": "Cards in Rings",       "value": f"{int(rings['cards'].sum()):,}",    "color": COLORS["chart_2"]},
+        {"label": "Fraud-Dense Rings",    "value": f"{len(dense):,}",                   "color": COLORS["fraud_red"]},
+        {"label": "Fraud $ in Dense Rings", "value": f"${dense['fraud_amount'].sum():,.0f}", "color": COLORS["fraud_red"]},
+    ])
+    if len(rings) == 0:
+        return
+
+    display = rings.head(_RING_ROW_LIMIT)[_RING_COLS].copy()
+    display["fraud_density"] = (display["fraud_density"] * 100).round(1)
+    display["fraud_amount"] = display["fraud_amount"].apply(lambda x: f"${x:,.0f}")
+    display["start"] = display["start"].dt.strftime("%Y-%m-%d %H:%M")
+    display["end"] = display["end"].dt.strftime("%Y-%m-%d %H:%M")
+    display["card_ids"] = display["card_ids"].apply(
+        lambda ids: ", ".join(ids[:_RING_CARD_PREVIEW]) + (f" +{len(ids) - _RING_CARD_PREVIEW}" if len(ids) > _RING_CARD_PREVIEW else "")
+    )
+    display.columns = _RING_HEADERS
+    st.dataframe(display, use_container_width=True, height=360, hide_index=True)
+
+
+def _weighted_mean_amount(df: pd.DataFrame) -> float:
+    """Mean amount, weighting sampled rows by their sample weight."""
+    weights = df["sample_weight"] if is_sample(df) else None
+    return float(np.average(df["amount"], weights=weights)) if len(df) else float("nan")
+
+
+def _render_comparison(compare: ComparisonQuery):
+    """Fraud-rate differences per age group, card type and channel between the two selections."""
+    render_section_header(
+        "Segments: Comparison vs Baseline",
+        f"{compare.labels['comparison']} minus {compare.labels['baseline']}, in percentage points",
+    )
+    columns = st.columns(3, gap="large")
+    for col, (column, title) in zip(columns, _COMPARE_SEGMENTS.items()):
+        with col:
+            st.caption(title)
+            st.plotly_chart(
+                rate_delta_bar(compare, column, height=260),
+                use_container_width=True,
+                config=PLOTLY_CONFIG,
+                key=f"segments_compare_{column}",
+            )
+    st.markdown("<div style='margin-top:1.5rem'></div>", unsafe_allow_html=True)
+
+
+def prefetch_segments(query: QueryPlanner, view_key: str = None):
+    """Build this tab's figures, groupings and (given `view_key`) default drivers and exact-view rings into the caches."""
+    for chart in (age_group_chart, card_type_donut, channel_fraud_bar, fraud_type_breakdown, amount_distribution):
+        chart(query)
+    grouped(query, "age_group", "segment KPIs")
+    grouped(query, "card_type", "segment KPIs", fraud_only=True)
+    grouped(query, "transaction_channel", "segment KPIs", fraud_only=True)
+    grouped(query, "transaction_channel", "segment insights")
+    if view_key is not None:
+        _risk_drivers(view_key, next(iter(_DRIVER_ORDERS.values())), MIN_SUPPORT, query.frame())
+        # Rings need the exact rows, which an approximate view builds only when the section is shown
+        if query.sample is None:
+            _fraud_rings(view_key, next(iter(RING_ENTITIES)), query.rows)
+
+
+def render_segments(df: pd.DataFrame, stats: dict, view_key: str = None, query: QueryPlanner = None,
+                    compare: ComparisonQuery = None):
+    """Render the Customer Segments tab.
+
+    `view_key` identifies the dataset version and filter state; when given,
+    the risk-driver and fraud-ring sections are shown and computed once per view.
+    Charts and insights are answered through `query` when given, and
+    drivers use `df` (the weighted sample in approximate mode). Rings need
+    every row, so they use the exact rows, built only when not cached. With `compare`, per-segment rate
+    differences lead the tab.
+    """
+    source = df if query is None else query
     render_page_header(
         "Customer Segments",
         "Who is most targeted? Break down fraud risk by demographics, card type, and channel.",
     )
 
-    fraud_df = df[df["is_fraud"] == 1]
+    if compare is not None:
+        _render_comparison(compare)
+
+    rows = source_rows(source)
+    fraud_df = rows[rows["is_fraud"] == 1]
 
-    age_rates = df.groupby("age_group").apply(lambda g: g["is_fraud"].sum() / len(g) * 100)
+    age_rates = grouped(source, "age_group", "segment KPIs")["rate"]
     top_age = age_rates.idxmax()
-    top_card = fraud_df["card_type"].mode()[0] if len(fraud_df) > 0 else "N/A"
-    top_channel = fraud_df["transaction_channel"].mode()[0] if len(fraud_df) > 0 else "N/A"
+    card_fraud = grouped(source, "card_type", "segment KPIs", fraud_only=True)["fraud"]
+    channel_fraud = grouped(source, "transaction_channel", "segment KPIs", fraud_only=True)["fraud"]
+    top_card = card_fraud.idxmax() if len(card_fraud) > 0 else "N/A"
+    top_channel = channel_fraud.idxmax() if len(channel_fraud) > 0 else "N/A"
 
     render_mini_kpi_row([
         {"label": "Highest Risk Age",   "value": top_age,     "color": COLORS["fraud_red"]},
@@ -48,7 +222,7 @@ def render_segments(df: pd.DataFrame, stats: dict):
             "Fraud count (bars) and fraud rate (line) by customer age",
         )
         st.plotly_chart(
-            age_group_chart(df),
+            age_group_chart(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="seg_age_chart",
@@ -60,7 +234,7 @@ def render_segments(df: pd.DataFrame, stats: dict):
             "Share of fraudulent transactions per card network",
         )
         st.plotly_chart(
-            card_type_donut(df),
+            card_type_donut(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="seg_card_donut",
@@ -77,7 +251,7 @@ def render_segments(df: pd.DataFrame, stats: dict):
             "Online and phone channels carry the highest risk",
         )
         st.plotly_chart(
-            channel_fraud_bar(df),
+            channel_fraud_bar(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="seg_channel_bar",
@@ -89,7 +263,7 @@ def render_segments(df: pd.DataFrame, stats: dict):
             "Card Not Present and Account Takeover dominate",
         )
         st.plotly_chart(
-            fraud_type_breakdown(df),
+            fraud_type_breakdown(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="seg_fraud_type",
@@ -103,21 +277,31 @@ def render_segments(df: pd.DataFrame, stats: dict):
         "Fraudulent transactions cluster at higher amounts. Capped at $1,000.",
     )
     st.plotly_chart(
-        amount_distribution(df),
+        amount_distribution(source),
         use_container_width=True,
         config=PLOTLY_CONFIG,
         key="seg_amount_dist",
     )
 
-    online_rate = df[df["transaction_channel"] == "Online"]["is_fraud"].mean() * 100
-    instore_rate = df[df["transaction_channel"] == "In-Store"]["is_fraud"].mean() * 100
+    if view_key is not None:
+        st.markdown("<div style='margin-top:1rem'></div>", unsafe_allow_html=True)
+        _render_risk_drivers(df, view_key)
+        st.markdown("<div style='margin-top:1rem'></div>", unsafe_allow_html=True)
+        _render_fraud_rings(lambda: df if query is None else query.rows(), view_key)
+
+    channel_rates = grouped(source, "transaction_channel", "segment insights")["rate"]
+    online_rate = channel_rates.get("Online", float("nan"))
+    instore_rate = channel_rates.get("In-Store", float("nan"))
     online_vs_instore = online_rate / instore_rate if instore_rate > 0 else 0
-    avg_fraud_amount = fraud_df["amount"].mean() if len(fraud_df) > 0 else 0
-    avg_legit_amount = df[df["is_fraud"] == 0]["amount"].mean()
+    avg_fraud_amount = _weighted_mean_amount(fraud_df) if len(fraud_df) > 0 else 0
+    avg_legit_amount = _weighted_mean_amount(rows[rows["is_fraud"] == 0])
 
     render_insight_box("Segment Insights", [
         f'Online transactions are <strong>{online_vs_instore:.1f}×</strong> more likely fraudulent than in-store',
         f'Age group <strong>{top_age}</strong> has the highest fraud rate at {age_rates[top_age]:.2f}%',
         f'Avg fraud transaction (${avg_fraud_amount:.0f}) is {avg_fraud_amount / avg_legit_amount:.1f}× the avg legitimate (${avg_legit_amount:.0f})',
         'Card Not Present fraud accounts for the largest share of attack types',
-    ])
+    ] + ([
+        f'Fraud amounts: median <strong>${stats["fraud_amount_p50"]:,.0f}</strong>, '
+        f'p95 ${stats["fraud_amount_p95"]:,.0f}, p99 ${stats["fraud_amount_p99"]:,.0f}',
+    ] if "fraud_amount_p50" in stats else []))
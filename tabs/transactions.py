@@ -1,18 +1,33 @@
 import streamlit as st
 import pandas as pd
-from components.kpi_cards import render_page_header
+from analytics.bursts import BURST_WINDOW_SECONDS, AMOUNT_TOLERANCE, burst_table
+from analytics.scoring import apply_rules
+from components.kpi_cards import render_page_header, render_section_header
+from components.profiler import span
 from components.styles import COLORS
 
 _TABLE_ROW_LIMIT = 500
 _DISPLAY_COLS = [
-    "transaction_id", "timestamp", "amount", "merchant_category",
+    "transaction_id", "card_id", "timestamp", "amount", "merchant_category",
     "transaction_channel", "card_type", "city", "state",
-    "age_group", "is_fraud", "fraud_type",
+    "age_group", "is_fraud", "fraud_type", "risk_score",
+    "card_tx_1h", "card_tx_24h", "card_amount_24h", "card_cities_24h",
 ]
 _DISPLAY_HEADERS = [
-    "Transaction ID", "Timestamp", "Amount", "Category",
+    "Transaction ID", "Card", "Timestamp", "Amount", "Category",
     "Channel", "Card Type", "City", "State",
-    "Age Group", "Status", "Fraud Type",
+    "Age Group", "Status", "Fraud Type", "Risk Score",
+    "Card Tx 1h", "Card Tx 24h", "Card $ 24h", "Cities 24h",
+]
+
+_BURST_ROW_LIMIT = 50
+_BURST_COLS = [
+    "city", "state", "merchant_category", "start", "span_minutes", "size",
+    "cards", "median_amount", "total_amount", "fraud", "transaction_ids",
+]
+_BURST_HEADERS = [
+    "City", "State", "Category", "Start", "Span (min)", "Transactions",
+    "Cards", "Median Amount", "Total Amount", "Fraud", "Member Transaction IDs",
 ]
 
 _METRIC_CARD = (
@@ -53,7 +68,7 @@ def render_transactions(df: pd.DataFrame, stats: dict):
         st.markdown(f'<div style="{_FILTER_LABEL}">Show</div>', unsafe_allow_html=True)
         fraud_filter = st.selectbox(
             "show_filter",
-            ["All Transactions", "Fraud Only", "Legitimate Only"],
+            ["All Transactions", "Fraud Only", "Legitimate Only", "Rule-Flagged Only", "Burst Members Only"],
             label_visibility="collapsed",
             key="tx_fraud_filter",
         )
@@ -89,36 +104,42 @@ def render_transactions(df: pd.DataFrame, stats: dict):
 
     search_term = st.text_input(
         "search_bar",
-        placeholder="Search by Transaction ID, city, or state...",
+        placeholder="Search by Transaction ID, card, city, or state...",
         label_visibility="collapsed",
         key="tx_search",
     )
 
-    # ── Apply filters
-    filtered = df.copy()
-
-    if fraud_filter == "Fraud Only":
-        filtered = filtered[filtered["is_fraud"] == 1]
-    elif fraud_filter == "Legitimate Only":
-        filtered = filtered[filtered["is_fraud"] == 0]
-
-    if cat_filter != "All":
-        filtered = filtered[filtered["merchant_category"] == cat_filter]
-
-    if ch_filter != "All":
-        filtered = filtered[filtered["transaction_channel"] == ch_filter]
-
-    if min_amount > 0:
-        filtered = filtered[filtered["amount"] >= min_amount]
-
-    if search_term:
-        mask = (
-            filtered["transaction_id"].str.contains(search_term, case=False, na=False)
-            | filtered["city"].str.contains(search_term, case=False, na=False)
-            | filtered["state"].str.contains(search_term, case=False, na=False)
-            | filtered["state_name"].str.contains(search_term, case=False, na=False)
-        )
-        filtered = filtered[mask]
+    # ── Apply filters (rule scoring is vectorized, so score before filtering)
+    with span("explorer · filter"):
+        filtered = apply_rules(df)
+
+        if fraud_filter == "Fraud Only":
+            filtered = filtered[filtered["is_fraud"] == 1]
+        elif fraud_filter == "Legitimate Only":
+            filtered = filtered[filtered["is_fraud"] == 0]
+        elif fraud_filter == "Rule-Flagged Only":
+            filtered = filtered[filtered["flagged"]]
+        elif fraud_filter == "Burst Members Only":
+            filtered = filtered[filtered["burst_id"] >= 0]
+
+        if cat_filter != "All":
+            filtered = filtered[filtered["merchant_category"] == cat_filter]
+
+        if ch_filter != "All":
+            filtered = filtered[filtered["transaction_channel"] == ch_filter]
+
+        if min_amount > 0:
+            filtered = filtered[filtered["amount"] >= min_amount]
+
+        if search_term:
+            mask = (
+                filtered["transaction_id"].str.contains(search_term, case=False, na=False)
+                | filtered["card_id"].str.contains(search_term, case=False, na=False)
+                | filtered["city"].str.contains(search_term, case=False, na=False)
+                | filtered["state"].str.contains(search_term, case=False, na=False)
+                | filtered["state_name"].str.contains(search_term, case=False, na=False)
+            )
+            filtered = filtered[mask]
 
     # ── Summary metrics
     total_shown = len(filtered)
@@ -139,12 +160,15 @@ def render_transactions(df: pd.DataFrame, stats: dict):
     st.markdown("<div style='margin-top:1rem'></div>", unsafe_allow_html=True)
 
     # ── Display table (formatted copy, separate from CSV export)
-    display_df = filtered[_DISPLAY_COLS].copy()
-    display_df["timestamp"] = display_df["timestamp"].dt.strftime("%Y-%m-%d %H:%M")
-    display_df["amount"] = display_df["amount"].apply(lambda x: f"${x:,.2f}")
-    display_df["is_fraud"] = display_df["is_fraud"].map({0: "Legitimate", 1: "FRAUD"})
-    display_df["fraud_type"] = display_df["fraud_type"].fillna("—")
-    display_df.columns = _DISPLAY_HEADERS
+    with span("explorer · table"):
+        display_df = filtered[_DISPLAY_COLS].copy()
+        display_df["timestamp"] = display_df["timestamp"].dt.strftime("%Y-%m-%d %H:%M")
+        display_df["amount"] = display_df["amount"].apply(lambda x: f"${x:,.2f}")
+        display_df["is_fraud"] = display_df["is_fraud"].map({0: "Legitimate", 1: "FRAUD"})
+        display_df["fraud_type"] = display_df["fraud_type"].fillna("—")
+        display_df["risk_score"] = display_df["risk_score"].round(3)
+        display_df["card_amount_24h"] = display_df["card_amount_24h"].apply(lambda x: f"${x:,.2f}")
+        display_df.columns = _DISPLAY_HEADERS
 
     st.dataframe(
         display_df.head(_TABLE_ROW_LIMIT),
@@ -154,6 +178,18 @@ def render_transactions(df: pd.DataFrame, stats: dict):
         column_config={
             "Status": st.column_config.TextColumn("Status", help="FRAUD or Legitimate"),
             "Amount": st.column_config.TextColumn("Amount"),
+            "Risk Score": st.column_config.NumberColumn(
+                "Risk Score", help="Rule-engine fraud probability estimate", format="%.3f",
+            ),
+            "Card Tx 1h": st.column_config.NumberColumn(
+                "Card Tx 1h", help="Transactions on this card in the hour up to and including this one",
+            ),
+            "Card Tx 24h": st.column_config.NumberColumn(
+                "Card Tx 24h", help="Transactions on this card in the 24 hours up to and including this one",
+            ),
+            "Cities 24h": st.column_config.NumberColumn(
+                "Cities 24h", help="Distinct cities this card was used in over the last 24 hours",
+            ),
         },
     )
 
@@ -164,11 +200,30 @@ def render_transactions(df: pd.DataFrame, stats: dict):
             unsafe_allow_html=True,
         )
 
+    # ── Bursts among the filtered rows, largest first
+    bursts = burst_table(filtered)
+    if len(bursts):
+        st.markdown("<div style='margin-top:1rem'></div>", unsafe_allow_html=True)
+        render_section_header(
+            "Transaction Bursts",
+            f"{len(bursts):,} runs of {AMOUNT_TOLERANCE:.0%}-similar amounts at one city and category, "
+            f"each within {BURST_WINDOW_SECONDS // 60} minutes of the last — typical of card testing and split purchases",
+        )
+        burst_df = bursts.head(_BURST_ROW_LIMIT)[_BURST_COLS].copy()
+        burst_df["start"] = burst_df["start"].dt.strftime("%Y-%m-%d %H:%M")
+        burst_df["span_minutes"] = burst_df["span_minutes"].round(1)
+        burst_df["median_amount"] = burst_df["median_amount"].apply(lambda x: f"${x:,.2f}")
+        burst_df["total_amount"] = burst_df["total_amount"].apply(lambda x: f"${x:,.2f}")
+        burst_df["transaction_ids"] = burst_df["transaction_ids"].str.join(", ")
+        burst_df.columns = _BURST_HEADERS
+        st.dataframe(burst_df, use_container_width=True, height=320, hide_index=True)
+
     # ── Export (raw datetime formatted separately for CSV)
     st.markdown("<div style='margin-top:1rem'></div>", unsafe_allow_html=True)
-    csv_export = filtered[_DISPLAY_COLS].copy()
-    csv_export["timestamp"] = csv_export["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
-    csv_bytes = csv_export.to_csv(index=False).encode("utf-8")
+    with span("explorer · csv"):
+        csv_export = filtered[_DISPLAY_COLS].copy()
+        csv_export["timestamp"] = csv_export["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        csv_bytes = csv_export.to_csv(index=False).encode("utf-8")
 
     col_btn, col_info = st.columns([1, 3])
     with col_btn:
@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
+from analytics.anomalies import what_changed
 from components.charts import (
+    comparison_trend,
     hourly_heatmap,
     day_of_week_bar,
     weekly_trend,
     quarterly_comparison,
+    rate_overlay,
 )
 from components.kpi_cards import (
     render_mini_kpi_row,
@@ -13,20 +16,93 @@ from components.kpi_cards import (
     render_insight_box,
 )
 from components.styles import COLORS, PLOTLY_CONFIG
+from data.query import ComparisonQuery, QueryPlanner, grouped
 
+_CHANGE_ITEMS = 5
 
-def render_trends(df: pd.DataFrame, stats: dict):
-    """Render the Temporal Trends tab."""
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _what_changed(view_key: str, _df: pd.DataFrame) -> pd.DataFrame:
+    """Week-over-week movers for one dataset version and filter state."""
+    return what_changed(_df)
+
+
+def _change_items(changes: pd.DataFrame) -> list:
+    """Insight bullets for the top movers from analytics.anomalies.what_changed."""
+    items = []
+    for row in changes.head(_CHANGE_ITEMS).itertuples(index=False):
+        direction = "up" if row.z > 0 else "down"
+        color = COLORS["fraud_red"] if row.z > 0 else COLORS["safe_green"]
+        alarm = f', sustained drift since {row.alarm_since:%b %d}' if row.alarm else ''
+        items.append(
+            f'<strong>{row.dimension} · {row.segment}</strong> fraud rate '
+            f'<span style="color:{color};font-weight:700;">{direction}</span> to {row.week_rate:.2%} '
+            f'vs {row.baseline_rate:.2%} baseline ({row.week_fraud:,} of {row.week_tx:,} tx, z = {row.z:+.1f}{alarm})'
+        )
+    return items or ["No segment moved more than two standard deviations from its baseline this week"]
+
+
+def _render_comparison(compare: ComparisonQuery):
+    """Weekly and hour-of-day fraud rates of both selections, overlaid."""
+    col1, col2 = st.columns([1.4, 1], gap="large")
+    with col1:
+        render_section_header(
+            "Weekly Fraud Rate: Comparison vs Baseline",
+            "Each selection aligned on weeks since its own start date",
+        )
+        st.plotly_chart(
+            comparison_trend(compare),
+            use_container_width=True,
+            config=PLOTLY_CONFIG,
+            key="trends_compare_weekly",
+        )
+    with col2:
+        render_section_header("Hourly Fraud Rate", "Hour-of-day profile of both selections")
+        st.plotly_chart(
+            rate_overlay(compare, "hour", "Hour of Day"),
+            use_container_width=True,
+            config=PLOTLY_CONFIG,
+            key="trends_compare_hourly",
+        )
+    st.markdown("<div style='margin-top:1.5rem'></div>", unsafe_allow_html=True)
+
+
+def prefetch_trends(query: QueryPlanner, view_key: str = None):
+    """Build this tab's figures, peak groupings and (given `view_key`) movers into the caches, without rendering."""
+    for chart in (hourly_heatmap, day_of_week_bar, weekly_trend, quarterly_comparison):
+        chart(query)
+    for column in ("hour", "day_of_week", "month_name", "quarter"):
+        grouped(query, column, "peak KPIs", fraud_only=True)
+    grouped(query, "quarter", "temporal insights")
+    if view_key is not None:
+        _what_changed(view_key, query.frame())
+
+
+def render_trends(df: pd.DataFrame, stats: dict, view_key: str = None, query: QueryPlanner = None,
+                  compare: ComparisonQuery = None):
+    """Render the Temporal Trends tab.
+
+    Charts and peaks are answered through `query` when given; the
+    week-over-week anomaly check runs on `df` (the filtered rows, or the
+    weighted sample in approximate mode), once per view when `view_key`
+    (dataset version, filter state and mode) is given. With
+    `compare`, overlaid comparison trends lead the tab.
+    """
+    source = df if query is None else query
     render_page_header(
         "Temporal Trends",
         "When does fraud happen? Identify time-based patterns and seasonal anomalies.",
     )
 
-    fraud_df = df[df["is_fraud"] == 1]
-    peak_hour = int(fraud_df["hour"].mode()[0])
-    peak_day = fraud_df["day_of_week"].mode()[0][:3]
-    peak_month = fraud_df["month_name"].mode()[0]
-    peak_quarter = f"Q{int(fraud_df['quarter'].mode()[0])}"
+    if compare is not None:
+        _render_comparison(compare)
+
+    by_hour = grouped(source, "hour", "peak KPIs", fraud_only=True)["fraud"]
+    by_day = grouped(source, "day_of_week", "peak KPIs", fraud_only=True)["fraud"]
+    peak_hour = int(by_hour.idxmax())
+    peak_day = by_day.idxmax()[:3]
+    peak_month = grouped(source, "month_name", "peak KPIs", fraud_only=True)["fraud"].idxmax()
+    peak_quarter = f"Q{int(grouped(source, 'quarter', 'peak KPIs', fraud_only=True)['fraud'].idxmax())}"
 
     render_mini_kpi_row([
         {"label": "Peak Hour",    "value": f"{peak_hour:02d}:00", "color": COLORS["fraud_red"]},
@@ -46,7 +122,7 @@ def render_trends(df: pd.DataFrame, stats: dict):
             "Darker cells = higher fraud concentration. Fraud peaks late-night.",
         )
         st.plotly_chart(
-            hourly_heatmap(df),
+            hourly_heatmap(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="trends_heatmap",
@@ -58,7 +134,7 @@ def render_trends(df: pd.DataFrame, stats: dict):
             "Highlighted bar = highest risk day",
         )
         st.plotly_chart(
-            day_of_week_bar(df),
+            day_of_week_bar(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="trends_dow_bar",
@@ -75,7 +151,7 @@ def render_trends(df: pd.DataFrame, stats: dict):
             "Weekly fraud rate with 4-week rolling average",
         )
         st.plotly_chart(
-            weekly_trend(df),
+            weekly_trend(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="trends_weekly",
@@ -87,28 +163,32 @@ def render_trends(df: pd.DataFrame, stats: dict):
             "Fraud count and rate across quarters",
         )
         st.plotly_chart(
-            quarterly_comparison(df),
+            quarterly_comparison(source),
             use_container_width=True,
             config=PLOTLY_CONFIG,
             key="trends_qoq",
         )
 
+    fraud_total = by_hour.sum()
     night_pct = (
-        len(fraud_df[(fraud_df["hour"] >= 22) | (fraud_df["hour"] <= 4)]) / len(fraud_df) * 100
-        if len(fraud_df) > 0 else 0
+        by_hour[(by_hour.index >= 22) | (by_hour.index <= 4)].sum() / fraud_total * 100
+        if fraud_total > 0 else 0
     )
     weekend_pct = (
-        len(fraud_df[fraud_df["day_of_week"].isin(["Saturday", "Sunday"])]) / len(fraud_df) * 100
-        if len(fraud_df) > 0 else 0
+        by_day[by_day.index.isin(["Saturday", "Sunday"])].sum() / fraud_total * 100
+        if fraud_total > 0 else 0
     )
-    q_rates = df.groupby("quarter").apply(lambda g: g["is_fraud"].sum() / len(g) * 100)
+    q_rates = grouped(source, "quarter", "temporal insights")["rate"]
     q4_vs_q1 = float(q_rates.get(4, 0)) - float(q_rates.get(1, 0))
-    peak_count = len(fraud_df[fraud_df["hour"] == peak_hour])
+    peak_count = by_hour[peak_hour]
     direction = "higher" if q4_vs_q1 > 0 else "lower"
 
+    changes = what_changed(df) if view_key is None else _what_changed(view_key, df)
+    render_insight_box("What Changed This Week", _change_items(changes))
+
     render_insight_box("Temporal Insights", [
         f'{night_pct:.1f}% of all fraud occurs between 10 PM and 4 AM',
         f'Weekends account for {weekend_pct:.1f}% of fraud events',
         f'Q4 fraud rate is {abs(q4_vs_q1):.2f}% {direction} than Q1',
-        f'Peak hour {peak_hour:02d}:00 recorded {peak_count:,} fraud events',
+        f'Peak hour {peak_hour:02d}:00 recorded {peak_count:,.0f} fraud events',
     ])